@@ -0,0 +1,325 @@
+"""Scaling benchmarks of the hot paths of the wrapper, run against the in-memory c4d / redshift stand-in of StandIn,
+so they run on any machine with Python 3, without Cinema 4D.
+
+Each case does an amount of work proportional to the number of nodes of the material (e.g create N shaders, search a port on N nodes),
+it's timed at many sizes and the scaling exponent is fitted on a log-log scale: ~1 is linear, ~2 is quadratic.
+The run fails if an exponent is higher than the stored baseline plus a tolerance, which catch quadratic behaviour
+whatever the speed of the machine.
+
+Usage::
+
+    python Benchmark/RunBenchmark.py                  # compare with Benchmark/Baseline.json
+    python Benchmark/RunBenchmark.py --update         # store the results as the new baseline
+    python Benchmark/RunBenchmark.py --sizes 10 100 1000 --cases CreateShader SetColor
+"""
+import gc
+import os
+import sys
+import json
+import math
+import time
+import argparse
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The stand-in have to be found before a real c4d module, and the wrapper is imported from the repository
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, 'StandIn'))
+sys.path.insert(1, os.path.dirname(BENCHMARK_DIR))
+
+import c4d  # noqa: E402
+import redshift  # noqa: E402
+from RedshiftWrapper.Redshift import Redshift  # noqa: E402
+from RedshiftWrapper.MetaName import MetaName  # noqa: E402
+
+DEFAULT_SIZES = (10, 100, 1000, 10000)
+DEFAULT_BASELINE = os.path.join(BENCHMARK_DIR, 'Baseline.json')
+
+# Shader types created by the benchmarks, in turn
+SHADER_TYPES = (MetaName.TexSampler, MetaName.UtFresnel, MetaName.MathAdd, MetaName.ColorCorrection)
+
+
+def CreateMaterial(size, exposePorts=False):
+    """Create a Redshift material with size shaders.
+
+    :param size: Number of shaders to create.
+    :type size: int
+    :param exposePorts: True to expose the Input 1 and Out Color ports of each shader.
+    :type exposePorts: Bool
+    :return: (wrapper set on the material, created nodes)
+    :rtype: tuple
+    """
+    rs = Redshift()
+    rs.SetMat(c4d.BaseMaterial(redshift.Mrsmaterial))
+
+    nodes = list()
+    with rs.Transaction():
+        for index in range(size):
+            node = rs.CreateShader(SHADER_TYPES[index % len(SHADER_TYPES)], x=index, y=0)
+            if exposePorts:
+                node.ExposeParameter('Input 1', c4d.GV_PORT_INPUT)
+                node.ExposeParameter('Out Color', c4d.GV_PORT_OUTPUT)
+            nodes.append(node)
+    return rs, nodes
+
+
+def CreateChain(size):
+    """Create a Redshift material with a chain of size identical shaders, the worst case of graph hashing.
+
+    :param size: Number of shaders in the chain.
+    :type size: int
+    :return: The wrapper set on the material.
+    :rtype: :class:`.Redshift`
+    """
+    rs = Redshift()
+    rs.SetMat(c4d.BaseMaterial(redshift.Mrsmaterial))
+
+    nodes = list()
+    with rs.Transaction():
+        for index in range(size):
+            node = rs.CreateShader(MetaName.MathAdd, x=index, y=0)
+            node.ExposeParameter('Input 1', c4d.GV_PORT_INPUT)
+            node.ExposeParameter('Out Color', c4d.GV_PORT_OUTPUT)
+            nodes.append(node)
+    rs.CreateConnections([(src, 'Out Color', dest, 'Input 1') for src, dest in zip(nodes, nodes[1:])])
+    return rs
+
+
+def SetupGetAllNodes(size):
+    """Get all nodes of a material of size shaders."""
+    rs, nodes = CreateMaterial(size)
+    return rs.GetAllNodes
+
+
+def SetupSearchPort(size):
+    """Search a port by name on each node of a material of size shaders."""
+    rs, nodes = CreateMaterial(size, exposePorts=True)
+
+    def Run():
+        for node in nodes:
+            node.SearchPort('Out Color', c4d.GV_PORT_OUTPUT)
+    return Run
+
+
+def SetupCreateShader(size):
+    """Create size shaders in an empty material."""
+    rs, nodes = CreateMaterial(0)
+
+    def Run():
+        for index in range(size):
+            rs.CreateShader(SHADER_TYPES[index % len(SHADER_TYPES)], x=index, y=0)
+    return Run
+
+
+def SetupCreateConnection(size):
+    """Connect size shaders in a chain."""
+    rs, nodes = CreateMaterial(size, exposePorts=True)
+
+    def Run():
+        for src, dest in zip(nodes, nodes[1:]):
+            rs.CreateConnection(src, dest, 'Out Color', 'Input 1')
+    return Run
+
+
+def SetupTestProperty(size):
+    """Check size metaclass names, known and unknown."""
+    rs, nodes = CreateMaterial(0)
+    names = [SHADER_TYPES[index % len(SHADER_TYPES)] if index % 2 else 'Unknown{0}'.format(index % 7) for index in range(size)]
+
+    def Run():
+        for name in names:
+            rs._TestProperty(name)
+    return Run
+
+
+def SetupSetColor(size):
+    """Set the default color of each node of a material of size shaders."""
+    rs, nodes = CreateMaterial(size)
+
+    def Run():
+        for node in nodes:
+            node.SetColor()
+    return Run
+
+
+def SetupGetGraphHash(size):
+    """Hash a chain of size identical shaders."""
+    graph = CreateChain(size).ExportGraph()
+
+    def Run():
+        Redshift._HashGraph(graph)
+    return Run
+
+
+def SetupIsSameGraph(size):
+    """Compare a chain of size identical shaders with itself, node keys in reverse order."""
+    graph = CreateChain(size).ExportGraph()
+    keys = dict((key, 'n{0}'.format(len(graph['nodes']) - 1 - index)) for index, key in enumerate(graph['nodes']))
+    other = {'nodes': dict((keys[key], nodeSpec) for key, nodeSpec in graph['nodes'].items()),
+             'connections': [[keys[srcKey], srcPort, keys[destKey], destPort] for srcKey, srcPort, destKey, destPort in graph['connections']]}
+
+    def Run():
+        if not Redshift._IsSameGraph(graph, other):
+            raise AssertionError('a graph is not the same as itself')
+    return Run
+
+
+CASES = {
+    'GetAllNodes': SetupGetAllNodes,
+    'SearchPort': SetupSearchPort,
+    'CreateShader': SetupCreateShader,
+    'CreateConnection': SetupCreateConnection,
+    '_TestProperty': SetupTestProperty,
+    'SetColor': SetupSetColor,
+    'GetGraphHash': SetupGetGraphHash,
+    'IsSameGraph': SetupIsSameGraph,
+}
+
+
+def Measure(setup, size, repeat):
+    """Get the best time of a case at a size, each repeat have its own material.
+    The garbage collector is disabled while timing, like timeit does.
+
+    :param setup: Function called with size and returning the function to time.
+    :type setup: function
+    :param size: Number of nodes.
+    :type size: int
+    :param repeat: Number of runs.
+    :type repeat: int
+    :return: Best time in seconds.
+    :rtype: float
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        run = setup(size)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+        finally:
+            gc.enable()
+    return best
+
+
+def FitExponent(times, fitFrom):
+    """Fit time = a * size ^ exponent by least squares on a log-log scale.
+
+    :param times: Size => time in seconds.
+    :type times: dict
+    :param fitFrom: Smallest size used, small sizes are dominated by constant costs.
+    :type fitFrom: int
+    :return: The exponent, None if there are less than 2 sizes.
+    :rtype: float or None
+    """
+    points = [(math.log(size), math.log(max(seconds, 1e-9))) for size, seconds in sorted(times.items()) if size >= fitFrom]
+    if len(points) < 2:
+        return None
+
+    meanX = sum(x for x, y in points) / len(points)
+    meanY = sum(y for x, y in points) / len(points)
+    variance = sum((x - meanX) ** 2 for x, y in points)
+    return sum((x - meanX) * (y - meanY) for x, y in points) / variance
+
+
+def Run(cases, sizes, repeat, fitFrom):
+    """Measure all cases at all sizes.
+
+    :return: Case => {"exponent": float, "seconds": {size: float}}
+    :rtype: dict
+    """
+    results = dict()
+    for name in cases:
+        times = dict()
+        for size in sizes:
+            times[size] = Measure(CASES[name], size, repeat)
+        exponent = FitExponent(times, fitFrom)
+        results[name] = {'exponent': None if exponent is None else round(exponent, 3),
+                         'seconds': dict((str(size), round(seconds, 7)) for size, seconds in times.items())}
+    return results
+
+
+def Compare(results, baseline, tolerance):
+    """Compare results with a baseline.
+
+    :param results: Returned by :func:`Run`.
+    :type results: dict
+    :param baseline: Stored baseline.
+    :type baseline: dict
+    :param tolerance: How much an exponent can exceed its baseline.
+    :type tolerance: float
+    :return: Message for each regression.
+    :rtype: list of str
+    """
+    regressions = list()
+    for name, result in sorted(results.items()):
+        expected = baseline.get('cases', dict()).get(name, dict()).get('exponent')
+        exponent = result['exponent']
+        if expected is None or exponent is None:
+            continue
+        if exponent > expected + tolerance:
+            regressions.append('{0}: scaling exponent {1:.2f}, baseline {2:.2f} (+{3:.2f} allowed)'.format(name, exponent, expected, tolerance))
+    return regressions
+
+
+def PrintResults(results, sizes, baseline):
+    header = '{0:<18}'.format('case') + ''.join('{0:>12}'.format(size) for size in sizes) + '{0:>10}{1:>10}'.format('exponent', 'baseline')
+    print(header)
+    print('-' * len(header))
+    for name, result in sorted(results.items()):
+        expected = baseline.get('cases', dict()).get(name, dict()).get('exponent') if baseline else None
+        line = '{0:<18}'.format(name)
+        line += ''.join('{0:>10.3f}ms'.format(result['seconds'][str(size)] * 1000.0) for size in sizes)
+        line += '{0:>10}'.format('-' if result['exponent'] is None else '{0:.2f}'.format(result['exponent']))
+        line += '{0:>10}'.format('-' if expected is None else '{0:.2f}'.format(expected))
+        print(line)
+
+
+def Main(argv=None):
+    parser = argparse.ArgumentParser(description='Scaling benchmarks of the Redshift wrapper against the in-memory c4d stand-in.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='numbers of nodes to measure')
+    parser.add_argument('--cases', nargs='+', choices=sorted(CASES), default=sorted(CASES), help='cases to run')
+    parser.add_argument('--repeat', type=int, default=5, help='runs per case and size, the best one is kept')
+    parser.add_argument('--fit-from', type=int, default=100, help='smallest size used to fit the scaling exponent')
+    parser.add_argument('--tolerance', type=float, default=None, help='how much an exponent can exceed its baseline, default from the baseline file')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help='baseline JSON file')
+    parser.add_argument('--update', action='store_true', help='store the results as the new baseline instead of comparing')
+    parser.add_argument('--output', help='also write the results to this JSON file')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as baselineFile:
+            baseline = json.load(baselineFile)
+
+    tolerance = args.tolerance
+    if tolerance is None:
+        tolerance = baseline.get('tolerance', 0.3) if baseline else 0.3
+
+    results = Run(args.cases, args.sizes, args.repeat, args.fit_from)
+    PrintResults(results, args.sizes, baseline)
+
+    report = {'sizes': args.sizes, 'fitFrom': args.fit_from, 'tolerance': tolerance, 'cases': results}
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as outputFile:
+            json.dump(report, outputFile, indent=2, sort_keys=True)
+
+    if args.update:
+        with open(args.baseline, 'w', encoding='utf-8') as baselineFile:
+            json.dump(report, baselineFile, indent=2, sort_keys=True)
+            baselineFile.write('\n')
+        print('baseline written to {0}'.format(args.baseline))
+        return 0
+
+    if baseline is None:
+        print('no baseline at {0}, run with --update to create it'.format(args.baseline))
+        return 1
+
+    regressions = Compare(results, baseline, tolerance)
+    for regression in regressions:
+        print('REGRESSION ' + regression)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(Main())
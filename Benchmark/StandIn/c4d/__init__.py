@@ -0,0 +1,349 @@
+"""In-memory stand-in of the part of the c4d module used by the wrapper, to run benchmarks without Cinema 4D.
+
+Only the behaviour the wrapper relies on is reproduced (node trees, ports, connections, parameters, dirty checksums and undos),
+with the same complexity as Cinema 4D for each call (e.g GetNext and Remove are O(1)), so the benchmarks measure the wrapper.
+"""
+import zlib
+import itertools
+
+GV_PORT_INPUT = 1
+GV_PORT_OUTPUT = 2
+ID_GVBASE_COLOR = 1003
+ID_GVBASE_NAME = 1004
+GV_REDSHIFT_SHADER_META_CLASSNAME = 4000
+ID_OPERATOR_CONST = 400001120
+GV_CONST_VALUE = 1000
+DIRTYFLAGS_DATA = 1
+DIRTYFLAGS_CHILDREN = 4
+DIRTYFLAGS_ALL = -1
+DESCFLAGS_DESC_0 = 0
+DESC_NAME = 1
+DESC_IDENT = 2
+DESC_DEFAULT = 3
+DESC_SHORT_NAME = 4
+Ttexture = 5616
+TEXTURETAG_MATERIAL = 1010
+UNDOTYPE_NEW = 1
+UNDOTYPE_CHANGE = 2
+UNDOTYPE_DELETE = 3
+UNDOTYPE_CHANGE_SMALL = 4
+UNDOTYPE_DELETEOBJ = 5
+NOTOK = -1
+
+# Shared by all objects, so a checksum made of dirty counts changes whenever one of them changes
+_dirtyCounter = itertools.count(1)
+
+# Number of c4d.EventAdd() calls
+eventCount = 0
+
+
+def EventAdd(flags=0):
+    global eventCount
+    eventCount += 1
+
+
+def CallCommand(id, subid=0):
+    """Only the Redshift "new material" command (1036759) is supported, it insert a material in the active document."""
+    import redshift
+    if id == 1036759:
+        mat = BaseMaterial(redshift.Mrsmaterial)
+        mat.SetName('RS Material')
+        documents.GetActiveDocument().InsertMaterial(mat)
+
+
+def __getattr__(name):
+    # Redshift symbols (c4d.REDSHIFT_SHADER_FRESNEL_USER_CURVE, ...) get a stable ID computed from their name
+    if name.startswith('REDSHIFT_'):
+        return 10000 + zlib.crc32(name.encode('utf-8')) % 1000000
+    raise AttributeError('module c4d has no attribute {0}'.format(name))
+
+
+class Vector(object):
+    __slots__ = ('x', 'y', 'z')
+
+    def __init__(self, x=0.0, y=None, z=None):
+        if isinstance(x, Vector):
+            x, y, z = x.x, x.y, x.z
+        elif y is None and z is None:
+            y = z = x
+        self.x, self.y, self.z = float(x), float(y or 0.0), float(z or 0.0)
+
+    def __eq__(self, other):
+        return isinstance(other, Vector) and self.x == other.x and self.y == other.y and self.z == other.z
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __add__(self, other):
+        return Vector(self.x + other.x, self.y + other.y, self.z + other.z)
+
+    def __sub__(self, other):
+        return Vector(self.x - other.x, self.y - other.y, self.z - other.z)
+
+    def __mul__(self, other):
+        if isinstance(other, Vector):
+            return Vector(self.x * other.x, self.y * other.y, self.z * other.z)
+        return Vector(self.x * other, self.y * other, self.z * other)
+
+    def __neg__(self):
+        return Vector(-self.x, -self.y, -self.z)
+
+    def __repr__(self):
+        return 'Vector({0}, {1}, {2})'.format(self.x, self.y, self.z)
+
+
+class DescLevel(object):
+    __slots__ = ('id', 'dtype', 'creator')
+
+    def __init__(self, id, dtype=0, creator=0):
+        self.id, self.dtype, self.creator = id, dtype, creator
+
+    def __eq__(self, other):
+        return isinstance(other, DescLevel) and other.id == self.id
+
+    def __hash__(self):
+        return hash(self.id)
+
+
+class DescID(object):
+    __slots__ = ('_levels',)
+
+    def __init__(self, *levels):
+        self._levels = tuple(level if isinstance(level, DescLevel) else DescLevel(level) for level in levels)
+
+    def __getitem__(self, index):
+        return self._levels[index]
+
+    def GetDepth(self):
+        return len(self._levels)
+
+    def __eq__(self, other):
+        return isinstance(other, DescID) and other._levels == self._levels
+
+    def __hash__(self):
+        return hash(self._levels)
+
+    def __repr__(self):
+        return 'DescID{0}'.format(tuple(level.id for level in self._levels))
+
+
+def _Key(key):
+    """Key of a parameter in a BaseContainer, an int for a DescID of one level."""
+    if isinstance(key, DescID):
+        if key.GetDepth() == 1:
+            return key[0].id
+        return tuple(level.id for level in key._levels)
+    return key
+
+
+class BaseContainer(dict):
+    def GetContainerInstance(self, id):
+        return self.setdefault(id, BaseContainer())
+
+    def GetFloat(self, id, preset=0.0):
+        return self.get(id, preset)
+
+    def GetString(self, id, preset=''):
+        value = self.get(id)
+        return value if isinstance(value, str) else preset
+
+    def GetData(self, id):
+        return self.get(id)
+
+
+class C4DAtom(object):
+    def __init__(self, type=0):
+        self._type = type
+        self._data = BaseContainer()
+        self._alive = True
+        self._dirty = next(_dirtyCounter)
+
+    def IsAlive(self):
+        return self._alive
+
+    def GetType(self):
+        return self._type
+
+    def IsInstanceOf(self, type):
+        return self._type == type
+
+    def GetDirty(self, flags):
+        return self._dirty
+
+    def SetDirty(self, flags=0):
+        self._dirty = next(_dirtyCounter)
+
+    def _CheckAlive(self):
+        if not self._alive:
+            raise ReferenceError('the object is not alive')
+
+    def __getitem__(self, key):
+        self._CheckAlive()
+        value = self._data.get(_Key(key))
+        return Vector(value) if isinstance(value, Vector) else value
+
+    def __setitem__(self, key, value):
+        self._CheckAlive()
+        self._data[_Key(key)] = Vector(value) if isinstance(value, Vector) else value
+        self.SetDirty()
+
+    def GetDataInstance(self):
+        return self._data
+
+
+class GeListNode(C4DAtom):
+    """Doubly linked tree, like Cinema 4D lists all navigation and insertion calls are O(1)."""
+
+    def __init__(self, type=0):
+        C4DAtom.__init__(self, type)
+        self._up = self._pred = self._next = self._down = self._downLast = None
+
+    def GetUp(self):
+        return self._up
+
+    def GetPred(self):
+        return self._pred
+
+    def GetNext(self):
+        return self._next
+
+    def GetDown(self):
+        return self._down
+
+    def GetDownLast(self):
+        return self._downLast
+
+    def GetChildren(self):
+        children = list()
+        child = self._down
+        while child is not None:
+            children.append(child)
+            child = child._next
+        return children
+
+    def _Link(self, parent, pred, next):
+        self._up, self._pred, self._next = parent, pred, next
+        if pred is None:
+            parent._down = self
+        else:
+            pred._next = self
+        if next is None:
+            parent._downLast = self
+        else:
+            next._pred = self
+
+    def InsertUnder(self, parent):
+        self._Unlink()
+        self._Link(parent, None, parent._down)
+
+    def InsertUnderLast(self, parent):
+        self._Unlink()
+        self._Link(parent, parent._downLast, None)
+
+    def InsertBefore(self, other):
+        self._Unlink()
+        self._Link(other._up, other._pred, other)
+
+    def InsertAfter(self, other):
+        self._Unlink()
+        self._Link(other._up, other, other._next)
+
+    def Remove(self):
+        self._Unlink()
+
+    def _Unlink(self):
+        parent = self._up
+        if parent is None:
+            return
+        if self._pred is None:
+            parent._down = self._next
+        else:
+            self._pred._next = self._next
+        if self._next is None:
+            parent._downLast = self._pred
+        else:
+            self._next._pred = self._pred
+        self._up = self._pred = self._next = None
+        parent.SetDirty()
+
+
+class BaseList2D(GeListNode):
+    def __init__(self, type=0):
+        GeListNode.__init__(self, type)
+        self._name = ''
+
+    def GetName(self):
+        return self._name
+
+    def SetName(self, name):
+        self._name = name
+        self.SetDirty()
+
+
+class BaseMaterial(BaseList2D):
+    """A material, Redshift materials own a GvNodeMaster with a Material node connected to an Output node."""
+
+    def __init__(self, type):
+        import redshift
+        from c4d.modules.graphview import GvNodeMaster
+
+        BaseList2D.__init__(self, type)
+        self._name = 'Mat'
+        self._gvMaster = None
+        if type != redshift.Mrsmaterial:
+            return
+
+        self._gvMaster = GvNodeMaster(self)
+        root = self._gvMaster.GetRoot()
+        material = self._gvMaster.CreateNode(root, redshift.GVrsshader, None, 100, 100)
+        material[GV_REDSHIFT_SHADER_META_CLASSNAME] = 'Material'
+        material.SetName('RS Material')
+        output = self._gvMaster.CreateNode(root, 1036746, None, 300, 100)
+        output.SetName('Output')
+        material.AddPort(GV_PORT_OUTPUT, DescID(DescLevel(5000))).Connect(output.AddPort(GV_PORT_INPUT, DescID(DescLevel(5001))))
+
+    def GetDirty(self, flags):
+        if self._gvMaster is None:
+            return self._dirty
+        return self._dirty + self._gvMaster._dirty
+
+    def GetClone(self, flags=0):
+        clone = BaseMaterial.__new__(BaseMaterial)
+        BaseList2D.__init__(clone, self._type)
+        clone._name = self._name
+        clone._data = BaseContainer(self._data)
+        clone._gvMaster = self._gvMaster._Clone(clone) if self._gvMaster is not None else None
+        return clone
+
+
+class BaseTag(BaseList2D):
+    pass
+
+
+class TextureTag(BaseTag):
+    def __init__(self):
+        BaseTag.__init__(self, Ttexture)
+
+
+class BaseObject(BaseList2D):
+    def __init__(self, type=5100):
+        BaseList2D.__init__(self, type)
+        self._tags = list()
+
+    def GetTags(self):
+        return list(self._tags)
+
+    def GetFirstTag(self):
+        return self._tags[0] if self._tags else None
+
+    def InsertTag(self, tag):
+        self._tags.insert(0, tag)
+
+
+from c4d import documents  # noqa: E402
+from c4d import modules  # noqa: E402
+from c4d.modules import graphview  # noqa: E402
+
+BaseDocument = documents.BaseDocument
@@ -0,0 +1,80 @@
+import c4d
+
+
+class BaseDocument(c4d.BaseList2D):
+    """A document, materials and objects are children of hidden roots like in Cinema 4D. Undos are only counted."""
+
+    def __init__(self):
+        c4d.BaseList2D.__init__(self, 110059)
+        self._materials = c4d.GeListNode()
+        self._objects = c4d.GeListNode()
+        self._undoDepth = 0
+        self._undos = list()
+        self._path = ''
+
+    def InsertMaterial(self, mat, pred=None, checknames=False):
+        if pred is None:
+            mat.InsertUnder(self._materials)
+        else:
+            mat.InsertAfter(pred)
+
+    def GetFirstMaterial(self):
+        return self._materials.GetDown()
+
+    def GetMaterials(self):
+        return self._materials.GetChildren()
+
+    def InsertObject(self, op, parent=None, pred=None, checknames=False):
+        if pred is not None:
+            op.InsertAfter(pred)
+        else:
+            op.InsertUnder(parent if parent is not None else self._objects)
+
+    def GetFirstObject(self):
+        return self._objects.GetDown()
+
+    def StartUndo(self):
+        self._undoDepth += 1
+        return True
+
+    def EndUndo(self):
+        self._undoDepth -= 1
+        return True
+
+    def AddUndo(self, type, data):
+        self._undos.append((type, data))
+        return True
+
+    def GetDocumentPath(self):
+        return self._path
+
+
+_activeDocument = None
+_documents = list()
+
+
+def GetActiveDocument():
+    global _activeDocument
+    if _activeDocument is None:
+        _activeDocument = BaseDocument()
+        _documents.append(_activeDocument)
+    return _activeDocument
+
+
+def InsertBaseDocument(doc):
+    if doc not in _documents:
+        _documents.append(doc)
+
+
+def SetActiveDocument(doc):
+    global _activeDocument
+    InsertBaseDocument(doc)
+    _activeDocument = doc
+
+
+def KillDocument(doc):
+    global _activeDocument
+    if doc in _documents:
+        _documents.remove(doc)
+    if doc is _activeDocument:
+        _activeDocument = _documents[-1] if _documents else None
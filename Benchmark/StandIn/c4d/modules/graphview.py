@@ -0,0 +1,283 @@
+import c4d
+
+ID_OPERATOR_OUTPUT = 1036746
+ID_GV_GROUP = 1001102
+ID_GV_VIEW_DATA = 1001
+ID_GV_VIEW_POSITION = 1000
+
+
+class GvPort(object):
+    """A port of a GvNode, an input have at most one connection."""
+
+    def __init__(self, node, io, mainID, name):
+        self._node = node
+        self._io = io
+        self._mainID = mainID
+        self._name = name
+        self._links = list()
+
+    def GetName(self, node):
+        return self._name
+
+    def GetNode(self):
+        return self._node
+
+    def GetMainID(self):
+        return self._mainID
+
+    def GetSubID(self):
+        return 0
+
+    def GetIO(self):
+        return self._io
+
+    def IsIncomingConnected(self):
+        return self._io == c4d.GV_PORT_INPUT and bool(self._links)
+
+    def GetNrOfConnections(self):
+        return len(self._links)
+
+    def GetDestination(self):
+        if self._io != c4d.GV_PORT_OUTPUT:
+            return list()
+        return list(self._links)
+
+    def Connect(self, port):
+        if self._io != c4d.GV_PORT_OUTPUT or port._io != c4d.GV_PORT_INPUT or port._links:
+            return False
+        self._links.append(port)
+        port._links.append(self)
+        self._node.SetDirty()
+        return True
+
+    def Remove(self):
+        for port in self._links:
+            port._links.remove(self)
+        self._links = list()
+        self._node.SetDirty()
+        return True
+
+
+class _Description(object):
+    def __init__(self, entries):
+        self._entries = entries
+
+    def __iter__(self):
+        return iter(self._entries)
+
+
+# Metaclass name => parameters, (ID, name, identifier, default) computed once per metaclass
+_parameters = dict()
+
+
+def _GetParameters(gvNode):
+    """Get the parameters of a GvNode: Redshift shaders have Input 1, Input 2, Color, Weight and Out Color,
+    TextureSampler also have Tex0 (see _FILE_CHANNELS), Xpresso constant nodes have Value and Out, Output nodes have Surface."""
+    import redshift
+    if gvNode._type == redshift.GVrsshader:
+        metaclass = gvNode._data.get(c4d.GV_REDSHIFT_SHADER_META_CLASSNAME) or ''
+        parameters = _parameters.get(metaclass)
+        if parameters is None:
+            parameters = list()
+            for name in ('Input 1', 'Input 2', 'Input', 'Color', 'Weight'):
+                identifier = 'REDSHIFT_SHADER_{0}_{1}'.format(metaclass.upper(), name.upper().replace(' ', ''))
+                default = c4d.Vector(0.5) if name == 'Color' else 0.0
+                parameters.append((getattr(c4d, identifier), name, identifier, default))
+            if metaclass == 'TextureSampler':
+                parameters.append((c4d.REDSHIFT_SHADER_TEXTURESAMPLER_TEX0, 'Image', 'REDSHIFT_SHADER_TEXTURESAMPLER_TEX0', None))
+            parameters.append((5000, 'Out Color', 'REDSHIFT_SHADER_OUT', c4d.Vector(0.0)))
+            _parameters[metaclass] = parameters
+        return parameters
+
+    if gvNode._operatorID == c4d.ID_OPERATOR_CONST:
+        return [(c4d.GV_CONST_VALUE, 'Value', 'GV_CONST_VALUE', 0.0), (5002, 'Out', 'OUT', 0.0)]
+    if gvNode._operatorID == ID_OPERATOR_OUTPUT:
+        return [(5001, 'Surface', 'SURFACE', None)]
+    return list()
+
+
+def _FileChannels():
+    """Sub-channels of a Redshift file parameter (Tex0) => default. Like in Cinema 4D the parameter itself can't be read
+    from Python, only its sub-channels through a DescID of two levels."""
+    return {c4d.REDSHIFT_FILE_PATH: '', c4d.REDSHIFT_FILE_LAYER: 0, c4d.REDSHIFT_FILE_COLORSPACE: ''}
+
+
+class GvNode(c4d.BaseList2D):
+    def __init__(self, gvMaster, operatorID):
+        import redshift
+        c4d.BaseList2D.__init__(self, redshift.GVrsshader if operatorID == redshift.GVrsshader else operatorID)
+        self._gvMaster = gvMaster
+        self._operatorID = operatorID
+        self._inPorts = list()
+        self._outPorts = list()
+        self._name = 'Node'
+        self._data[c4d.ID_GVBASE_COLOR] = c4d.Vector(0.38, 0.384, 0.392)
+
+    def SetDirty(self, flags=0):
+        c4d.BaseList2D.SetDirty(self)
+        if self._gvMaster is not None:
+            self._gvMaster.SetDirty()
+
+    def __getitem__(self, key):
+        self._CheckAlive()
+        key = c4d._Key(key)
+        if key == c4d.ID_GVBASE_NAME:
+            return self._name
+        if key == c4d.REDSHIFT_SHADER_TEXTURESAMPLER_TEX0:
+            raise AttributeError('Parameter value not accessible (object unknown in Python)')
+        if isinstance(key, tuple) and key not in self._data:
+            if len(key) == 2 and key[0] == c4d.REDSHIFT_SHADER_TEXTURESAMPLER_TEX0:
+                return _FileChannels().get(key[1])
+            return None
+        if key not in self._data:
+            for parameterID, name, identifier, default in _GetParameters(self):
+                if parameterID == key:
+                    return c4d.Vector(default) if isinstance(default, c4d.Vector) else default
+            return None
+        return c4d.C4DAtom.__getitem__(self, key)
+
+    def __setitem__(self, key, value):
+        if c4d._Key(key) == c4d.ID_GVBASE_NAME:
+            self.SetName(value)
+            return
+        c4d.C4DAtom.__setitem__(self, key, value)
+
+    def GetOperatorID(self):
+        return self._operatorID
+
+    def GetNodeMaster(self):
+        return self._gvMaster
+
+    def GetInPorts(self):
+        return list(self._inPorts)
+
+    def GetOutPorts(self):
+        return list(self._outPorts)
+
+    def GetInPortCount(self):
+        return len(self._inPorts)
+
+    def GetOutPortCount(self):
+        return len(self._outPorts)
+
+    def GetInPort(self, index):
+        return self._inPorts[index] if 0 <= index < len(self._inPorts) else None
+
+    def GetOutPort(self, index):
+        return self._outPorts[index] if 0 <= index < len(self._outPorts) else None
+
+    def GetInPortFirstMainID(self, id):
+        for port in self._inPorts:
+            if port._mainID == id:
+                return port
+        return None
+
+    def GetOutPortFirstMainID(self, id):
+        for port in self._outPorts:
+            if port._mainID == id:
+                return port
+        return None
+
+    def AddPortIsOK(self, io, id):
+        return True
+
+    def AddPort(self, io, id, flag=0, message=False):
+        mainID = id[0].id if isinstance(id, c4d.DescID) else id
+        name = 'Port {0}'.format(mainID)
+        for parameterID, parameterName, identifier, default in _GetParameters(self):
+            if parameterID == mainID:
+                name = parameterName
+                break
+
+        port = GvPort(self, io, mainID, name)
+        (self._inPorts if io == c4d.GV_PORT_INPUT else self._outPorts).append(port)
+        self.SetDirty()
+        return port
+
+    def RemovePort(self, port, message=True):
+        port.Remove()
+        (self._inPorts if port._io == c4d.GV_PORT_INPUT else self._outPorts).remove(port)
+        self.SetDirty()
+        return True
+
+    def GetDescription(self, flags):
+        entries = list()
+        for parameterID, name, identifier, default in _GetParameters(self):
+            bc = c4d.BaseContainer({c4d.DESC_NAME: name, c4d.DESC_SHORT_NAME: name, c4d.DESC_IDENT: identifier, c4d.DESC_DEFAULT: default})
+            entries.append((bc, c4d.DescID(c4d.DescLevel(parameterID)), c4d.DescID()))
+        return _Description(entries)
+
+    def Remove(self):
+        for port in self._inPorts + self._outPorts:
+            port.Remove()
+        child = self._down
+        while child is not None:
+            nextChild = child._next
+            child.Remove()
+            child = nextChild
+
+        c4d.BaseList2D.Remove(self)
+        self._alive = False
+        if self._gvMaster is not None:
+            self._gvMaster.SetDirty()
+
+
+class GvNodeMaster(c4d.BaseList2D):
+    """Node master of a material, undos are only counted."""
+
+    def __init__(self, owner):
+        c4d.BaseList2D.__init__(self, 1001101)
+        self._owner = owner
+        self._root = GvNode(self, ID_GV_GROUP)
+        self._root._name = 'Shader Group'
+        self.undoCount = 0
+
+    def GetRoot(self):
+        return self._root
+
+    def GetOwner(self):
+        return self._owner
+
+    def AddUndo(self):
+        self.undoCount += 1
+        return True
+
+    def CreateNode(self, parent, id, insert=None, x=-1, y=-1):
+        gvNode = GvNode(self, id)
+        if insert is None:
+            gvNode.InsertUnderLast(parent)
+        else:
+            gvNode.InsertBefore(insert)
+
+        position = gvNode.GetDataInstance().GetContainerInstance(ID_GV_VIEW_DATA).GetContainerInstance(ID_GV_VIEW_POSITION)
+        position[100], position[101] = float(x), float(y)
+        self.SetDirty()
+        return gvNode
+
+    def _Clone(self, owner):
+        """Copy all nodes, ports and connections for BaseMaterial.GetClone."""
+        clone = GvNodeMaster(owner)
+        clones = dict()
+        stack = [(self._root, clone._root)]
+        while stack:
+            source, parent = stack.pop()
+            child = source._down
+            while child is not None:
+                copy = clone.CreateNode(parent, child._operatorID)
+                copy._type = child._type
+                copy._name = child._name
+                copy._data = c4d.BaseContainer((key, c4d.Vector(value) if isinstance(value, c4d.Vector) else value)
+                                               for key, value in child._data.items())
+                copy._data[ID_GV_VIEW_DATA] = c4d.BaseContainer((key, c4d.BaseContainer(value)) for key, value in child._data.get(ID_GV_VIEW_DATA, dict()).items())
+                copy._inPorts = [GvPort(copy, port._io, port._mainID, port._name) for port in child._inPorts]
+                copy._outPorts = [GvPort(copy, port._io, port._mainID, port._name) for port in child._outPorts]
+                clones[child] = copy
+                stack.append((child, copy))
+                child = child._next
+
+        for source, copy in clones.items():
+            for index, port in enumerate(source._outPorts):
+                for destination in port._links:
+                    destinationNode = destination._node
+                    copy._outPorts[index].Connect(clones[destinationNode]._inPorts[destinationNode._inPorts.index(destination)])
+        return clone
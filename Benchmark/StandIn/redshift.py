@@ -0,0 +1,18 @@
+"""In-memory stand-in of the redshift module, see the c4d stand-in."""
+import c4d
+
+Mrsmaterial = 1036224
+GVrsshader = 1036227
+
+
+def GetRSMaterialNodeMaster(mat):
+    """Get the GvNodeMaster of a Redshift material.
+
+    :param mat: The material.
+    :type mat: c4d.BaseMaterial
+    :return: The node master or None.
+    :rtype: c4d.modules.graphview.GvNodeMaster or None
+    """
+    if not isinstance(mat, c4d.BaseMaterial):
+        return None
+    return mat._gvMaster
@@ -20,14 +20,8 @@ def main():
     rs.CreateConnection(ConstNode, FresnelNode, 0, 0)
 
     #Get default material node and output node
-    listNode = rs.GetAllNodes()
-    MatNode = None
-    OutPutNode = None
-    for node in listNode:
-        if node.GetType() == "Output":
-            OutPutNode = node
-        elif node.GetType() == "Material":
-            MatNode = node
+    MatNode = rs.FindFirst("Material")
+    OutPutNode = rs.FindFirst("Output")
 
     if not MatNode or not OutPutNode:
         return
@@ -5,14 +5,7 @@ def main():
     rs = Redshift()
     if rs is False: return
 
-    #Assign Material
-    rs.SetMat(doc.GetFirstMaterial())
-
-    #Get all node and assign color
-    listNode = rs.GetAllNodes()
-    for node in listNode:
-        node.SetColor()
-
-    c4d.EventAdd()
+    #Assign default color to all nodes of the first material, nodes that already have it are skipped
+    rs.RecolorAll(doc.GetFirstMaterial())
 if __name__=='__main__':
     main()
\ No newline at end of file
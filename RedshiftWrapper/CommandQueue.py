@@ -0,0 +1,329 @@
+import time
+import queue
+import threading
+import c4d
+from concurrent.futures import Future
+
+from .Node import Node
+from .NodeSnapshot import NodeSnapshot
+from .Transaction import Transaction
+
+
+class Handle(object):
+    """Symbolic reference to a node of a :class:`.CommandBatch`, usable in the following commands of the batch before the node exists.
+
+    :member _node: (:class:`.Node`) The node, once the command that returns it has been applied.
+    """
+    __slots__ = ('_node',)
+
+    def __init__(self):
+        self._node = None
+
+    def __repr__(self):
+        return 'Handle({0})'.format(self._node)
+
+    def GetNode(self):
+        """Get the node referenced.
+
+        :return: The node, None if the command that create or find it is not yet applied.
+        :rtype: :class:`.Node` or None
+        """
+        return self._node
+
+
+class CommandBatch(object):
+    """Wrapper operations recorded from any thread, to be applied later on the main thread by a :class:`.CommandQueue`.
+    Methods creating or finding a node return a :class:`.Handle`, accepted as node by all commands of the same batch.
+
+    Example::
+
+        batch = CommandBatch(mat)
+        fresnel = batch.CreateShader("Fresnel", x=200, y=500)
+        batch.SetParameter(fresnel, "REDSHIFT_SHADER_FRESNEL_USER_CURVE", 0.5)
+        batch.CreateConnection(fresnel, batch.FindFirst("Material"), 0, "Diffuse Color")
+        future = commandQueue.Submit(batch)
+
+    :member _mat: (c4d.BaseMaterial) The material to act on, None for the material the wrapper of the queue is set on.
+    :member _commands: (list) (method, args, kwargs, Handle or None) for each command.
+    :member _lock: (threading.Lock) Protect :member:`._commands`, so many threads can record in the same batch.
+    """
+
+    def __init__(self, mat=None):
+        """Initialization of the batch
+
+        :param mat: The material to act on, None for the material the wrapper of the queue is set on when the batch is applied.
+        :type mat: c4d.BaseMaterial
+        """
+        if not isinstance(mat, c4d.BaseMaterial) and mat is not None:
+            raise TypeError('mat is not a c4d.BaseMaterial')
+
+        self._mat = mat
+        self._commands = list()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._commands)
+
+    def _Record(self, method, args, kwargs, returnHandle=False):
+        """Record a command.
+
+        :param method: Name of the method of :class:`.Redshift` (or a function called with the wrapper first).
+        :type method: str or function
+        :return: The handle of the node returned by the command or None.
+        :rtype: :class:`.Handle` or None
+        """
+        handle = Handle() if returnHandle else None
+        with self._lock:
+            self._commands.append((method, args, kwargs, handle))
+        return handle
+
+    def GetMaterial(self):
+        """Get the material to act on.
+
+        :return: The material or None for the material the wrapper of the queue is set on.
+        :rtype: c4d.BaseMaterial or None
+        """
+        return self._mat
+
+    def GetCommands(self):
+        """Get a copy of the recorded commands.
+
+        :return: (method, args, kwargs, Handle or None) for each command.
+        :rtype: list of tuple
+        """
+        with self._lock:
+            return list(self._commands)
+
+    def CreateShader(self, shaderType, x=-1, y=-1, NodeBefore=None):
+        """Record :meth:`.Redshift.CreateShader`.
+
+        :return: The handle of the created node.
+        :rtype: :class:`.Handle`
+        """
+        return self._Record('CreateShader', (shaderType, x, y, NodeBefore), dict(), True)
+
+    def FindFirst(self, type=None, name=None):
+        """Record :meth:`.Redshift.FindFirst`.
+
+        :return: The handle of the found node.
+        :rtype: :class:`.Handle`
+        """
+        return self._Record('FindFirst', (type, name), dict(), True)
+
+    def RemoveShader(self, node):
+        """Record :meth:`.Redshift.RemoveShader`."""
+        self._Record('RemoveShader', (node,), dict())
+
+    def CreateConnection(self, SrcNode, DestNode, SrcParameter=None, DestParameter=None):
+        """Record :meth:`.Redshift.CreateConnection`."""
+        self._Record('CreateConnection', (SrcNode, DestNode, SrcParameter, DestParameter), dict())
+
+    def RemoveConnection(self, port, node=None, portType=None):
+        """Record :meth:`.Redshift.RemoveConnection`."""
+        self._Record('RemoveConnection', (port, node, portType), dict())
+
+    def SetParameter(self, node, parameterID, value):
+        """Record a change of a parameter of a node.
+
+        :param node: The node.
+        :type node: :class:`.Node` or :class:`.Handle`
+        :param parameterID: ID, DescID, identifier / name of the parameter.
+        :type parameterID: int, c4d.DescID or str
+        :param value: The value, list or tuple of 3 numbers are set as c4d.Vector.
+        """
+        self._Record(_SetParameter, (node, parameterID, value), dict())
+
+    def SetName(self, node, name):
+        """Record :meth:`.Node.SetName`."""
+        self._Record(lambda rs, node, name: node.SetName(name), (node, name), dict())
+
+    def ExposeParameter(self, node, parameterID, portType):
+        """Record :meth:`.Node.ExposeParameter`."""
+        self._Record(lambda rs, node, parameterID, portType: node.ExposeParameter(parameterID, portType),
+                     (node, parameterID, portType), dict())
+
+    def Call(self, fn, *args, **kwargs):
+        """Record any function, called with the wrapper of the queue then args, handles in args are replaced by nodes.
+
+        :param fn: The function.
+        :type fn: function
+        """
+        if not callable(fn):
+            raise TypeError('fn is not callable')
+        self._Record(fn, args, kwargs)
+
+
+def _SetParameter(rs, node, parameterID, value):
+    node[rs._ResolveParameter(node, parameterID)] = rs._ConvertValue(value)
+
+
+def _Resolve(value):
+    """Replace a handle by its node."""
+    if isinstance(value, Handle):
+        if value._node is None:
+            raise ValueError('{0} is used before its node is created'.format(value))
+        return value._node
+    return value
+
+
+class CommandQueue(object):
+    """Apply :class:`.CommandBatch` submitted from any thread, on the main thread, within a time budget per :meth:`.Drain`.
+
+    A batch can be split over many drains, commands applied in a drain are grouped in one :class:`.Transaction`
+    and a batch gets only one undo per GvNodeMaster, whatever the number of drains.
+    The future returned by :meth:`.Submit` is resolved once all commands of the batch are applied, with the result of each command,
+    or with the exception of the failing command.
+
+    A failing batch is rolled back: nodes it created are removed, and existing nodes given to its commands get back their name,
+    color, ports, connections and the parameters set with :meth:`.CommandBatch.SetParameter`, see :class:`.NodeSnapshot`.
+    Existing nodes removed by the batch and parameters changed by functions given to :meth:`.CommandBatch.Call` are not restored.
+
+    :member _rs: (:class:`.Redshift`) The wrapper used to apply commands, the material it's set on is kept.
+    :member _queue: (queue.Queue) (batch, future) waiting to be applied.
+    :member _current: (list) [batch, future, commands, results, created nodes, :class:`.NodeSnapshot`, GvNodeMaster with an undo]
+        of the batch being applied or None.
+    """
+
+    def __init__(self, rs, maxSize=0):
+        """Initialization of the queue
+
+        :param rs: The wrapper used to apply commands.
+        :type rs: :class:`.Redshift`
+        :param maxSize: Maximum number of batches waiting, :meth:`.Submit` block when it's reached. 0 for no limit.
+        :type maxSize: int
+        """
+        self._rs = rs
+        self._queue = queue.Queue(maxSize)
+        self._current = None
+
+    def Submit(self, batch, block=True, timeout=None):
+        """Queue a batch, can be called from any thread. Commands recorded in the batch after this call are ignored.
+
+        :param batch: The batch.
+        :type batch: :class:`.CommandBatch`
+        :param block: True to wait while the queue is full, otherwise queue.Full is raised.
+        :type block: Bool
+        :param timeout: Maximum time to wait in seconds, None to wait as long as needed.
+        :type timeout: float or None
+        :return: Resolved with the list of results of the commands once the batch is applied.
+        :rtype: concurrent.futures.Future
+        """
+        if not isinstance(batch, CommandBatch):
+            raise TypeError('batch is not a CommandBatch')
+
+        future = Future()
+        self._queue.put((batch, future, batch.GetCommands()), block, timeout)
+        return future
+
+    def GetPending(self):
+        """Get the number of batches waiting or being applied.
+
+        :return: Number of batches.
+        :rtype: int
+        """
+        return self._queue.qsize() + (self._current is not None)
+
+    def _Next(self):
+        """Get the next batch to apply, skipping cancelled ones.
+
+        :return: True if there is a batch to apply.
+        :rtype: Bool
+        """
+        while self._current is None:
+            try:
+                batch, future, commands = self._queue.get_nowait()
+            except queue.Empty:
+                return False
+
+            if future.set_running_or_notify_cancel():
+                self._current = [batch, future, commands, list(), list(), NodeSnapshot(self._rs), set()]
+        return True
+
+    def _ApplyCommand(self, command, created, snapshot):
+        """Apply a command, with the wrapper set on the material of the batch. Existing nodes it's given are recorded in snapshot before."""
+        method, args, kwargs, handle = command
+        args = [_Resolve(arg) for arg in args]
+        kwargs = dict((key, _Resolve(value)) for key, value in kwargs.items())
+
+        for arg in args + list(kwargs.values()):
+            if isinstance(arg, c4d.modules.graphview.GvPort):
+                arg = Node(arg.GetNode(), self._rs.doUndo)
+            if isinstance(arg, Node) and arg not in created and arg.IsAlive():
+                descIDs = [self._rs._ResolveParameter(arg, args[1])] if method is _SetParameter else ()
+                snapshot.Add(arg, descIDs)
+
+        if isinstance(method, str):
+            result = getattr(self._rs, method)(*args, **kwargs)
+        else:
+            result = method(self._rs, *args, **kwargs)
+
+        if handle is not None:
+            if not result:
+                raise ValueError('{0}{1} returned no node'.format(method, tuple(args)))
+            handle._node = result
+            if method == 'CreateShader':
+                created.append(result)
+        return result
+
+    def Drain(self, budget=0.01):
+        """Apply queued commands until the time budget is spent, must be called from the main thread (e.g in a timer).
+        At least one command is applied if any.
+
+        :param budget: Time budget in seconds.
+        :type budget: float
+        :return: Number of commands applied.
+        :rtype: int
+        """
+        rs = self._rs
+        count = 0
+        end = time.perf_counter() + budget
+
+        with Transaction(rs.doUndo):
+            while self._Next():
+                batch, future, commands, results, created, snapshot, gvMasters = self._current
+                previousMat, previousGvMaster, previousNodeIndex = rs._mat, rs._gvMaster, rs._nodeIndex
+
+                # Continue the undo recorded by the previous drains of the batch
+                changed = Transaction.GetChanged()
+                Transaction.MarkChanged(gvMasters)
+                try:
+                    if batch.GetMaterial() is not None:
+                        rs.SetMat(batch.GetMaterial())
+
+                    while len(results) < len(commands):
+                        results.append(self._ApplyCommand(commands[len(results)], created, snapshot))
+                        count += 1
+                        if time.perf_counter() >= end:
+                            break
+
+                except Exception as error:
+                    for node in created:
+                        if node.IsAlive():
+                            Transaction.AddUndo(node.GetNode().GetNodeMaster(), rs.doUndo)
+                            node._RemoveGvNode()
+                    rs._nodeIndex = None
+                    snapshot.Restore()
+                    self._current = None
+                    future.set_exception(error)
+
+                finally:
+                    gvMasters.update(Transaction.GetChanged() - changed)
+                    if batch.GetMaterial() is not None:
+                        rs._mat, rs._gvMaster, rs._nodeIndex = previousMat, previousGvMaster, previousNodeIndex
+
+                if self._current is not None and len(results) == len(commands):
+                    self._current = None
+                    future.set_result(results)
+
+                if time.perf_counter() >= end:
+                    break
+
+        return count
+
+    def DrainAll(self):
+        """Apply all queued commands now, whatever the time it takes.
+
+        :return: Number of commands applied.
+        :rtype: int
+        """
+        return self.Drain(float('inf'))
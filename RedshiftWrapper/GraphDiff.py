@@ -0,0 +1,407 @@
+import json
+import c4d
+
+from .Node import Node
+from .NodeSnapshot import NodeSnapshot
+from .Transaction import Transaction
+
+# Prefix of the key of nodes added by a patch, the other keys are the ones of Redshift.ExportGraph for the patched material
+NEW_NODE_PREFIX = 'new:'
+
+# Operation of a patch => keys it needs
+OPERATIONS = {
+    'disconnect': ('src', 'srcPort', 'dst', 'dstPort'),
+    'removeNode': ('node',),
+    'addNode': ('node', 'type'),
+    'setName': ('node', 'name'),
+    'setColor': ('node', 'color'),
+    'setParam': ('node', 'param', 'value'),
+    'expose': ('node', 'port', 'portType'),
+    'unexpose': ('node', 'port', 'portType'),
+    'connect': ('src', 'srcPort', 'dst', 'dstPort'),
+}
+
+PORT_TYPES = {'input': c4d.GV_PORT_INPUT, 'output': c4d.GV_PORT_OUTPUT}
+
+
+class GraphDiff(object):
+    """Compute and apply the edits that turn the graph of a material into another one, so only what changed is touched.
+
+    A patch is a JSON compatible dict::
+
+        {
+            "material": "name of the material the patch was computed for",
+            "dirty": dirty checksum of this material when the patch was computed,
+            "ops": [
+                {"op": "disconnect", "src": "n2", "srcPort": 1001, "dst": "n0", "dstPort": 2002},
+                {"op": "removeNode", "node": "n3"},
+                {"op": "addNode", "node": "new:n5", "type": "Fresnel", "name": "Fresnel", "x": 0, "y": 0},
+                {"op": "setName", "node": "n1", "name": "Roughness"},
+                {"op": "setColor", "node": "n1", "color": [1.0, 0.0, 0.0]},
+                {"op": "setParam", "node": "n1", "param": "1234", "value": 0.5},
+                {"op": "expose", "node": "new:n5", "port": 1001, "portType": "output"},
+                {"op": "unexpose", "node": "n1", "port": 1005, "portType": "input"},
+                {"op": "connect", "src": "new:n5", "srcPort": 1001, "dst": "n0", "dstPort": 2002}
+            ]
+        }
+
+    Nodes are matched by type and name, then by type only for the ones left (a renamed node is a setName, not a remove and an add).
+    Node positions are not compared, so the layout made by artists is kept.
+    A setParam with a None value sets the parameter back to its default value.
+
+    A patch is applied entirely or not at all: all operations are checked before the first change, and if applying fails
+    added nodes are removed and changed nodes are restored with a :class:`.NodeSnapshot`. Removed nodes can't be restored,
+    so they are removed once all other operations succeeded.
+
+    Use :meth:`.Redshift.Diff` and :meth:`.Redshift.ApplyPatch` rather than this class directly.
+
+    :member _rs: (:class:`.Redshift`) The wrapper set on the material to diff or patch.
+    """
+
+    def __init__(self, rs):
+        """Initialization of the diff
+
+        :param rs: The wrapper set on the material to diff or patch.
+        :type rs: :class:`.Redshift`
+        """
+        self._rs = rs
+
+    def _GetTargetGraph(self, target):
+        """Get the description of a target.
+
+        :param target: A Redshift material, or a description returned by :meth:`.Redshift.ExportGraph` or its JSON string.
+        :type target: c4d.BaseMaterial, dict or str
+        :return: The description.
+        :rtype: dict
+        :raises: TypeError, ValueError
+        """
+        if isinstance(target, c4d.BaseMaterial):
+            rs = self._rs.__class__()
+            rs.SetMat(target)
+            return rs.ExportGraph()
+
+        if isinstance(target, str):
+            target = json.loads(target)
+        if not isinstance(target, dict):
+            raise TypeError('target is not a material or a graph description')
+
+        # Ports and parameters are compared by ID, like ExportGraph write them
+        self._rs._CheckGraphSpec(target)
+        for key, nodeSpec in target.get('nodes', dict()).items():
+            for paramID in nodeSpec.get('params', dict()):
+                if not self._rs._IsParamKey(paramID):
+                    raise ValueError('node {0} parameter {1} is not an ID'.format(key, paramID))
+            for portKey in ('inputs', 'outputs'):
+                if not all(isinstance(port, int) for port in nodeSpec.get(portKey, ())):
+                    raise ValueError('node {0} {1} are not IDs'.format(key, portKey))
+
+        for connection in target.get('connections', list()):
+            if isinstance(connection, dict):
+                connection = (connection.get('src'), connection.get('srcPort'), connection.get('dst'), connection.get('dstPort'))
+            if not isinstance(connection[1], dict) or not isinstance(connection[3], dict):
+                raise ValueError('connection {0} ports are not {{"id": main ID}}'.format(connection))
+
+        return target
+
+    @staticmethod
+    def _GetEdges(graph, keys):
+        """Get connections of a description as a set.
+
+        :param graph: The description.
+        :type graph: dict
+        :param keys: Key in the description => key in the patch.
+        :type keys: dict
+        :return: (src key, src port ID, dst key, dst port ID) for each connection.
+        :rtype: set of tuple
+        """
+        edges = set()
+        for connection in graph.get('connections', list()):
+            if isinstance(connection, dict):
+                connection = (connection.get('src'), connection.get('srcPort'), connection.get('dst'), connection.get('dstPort'))
+            srcKey, srcPort, dstKey, dstPort = connection
+            edges.add((keys[srcKey], srcPort['id'], keys[dstKey], dstPort['id']))
+        return edges
+
+    @staticmethod
+    def _MatchNodes(currentNodes, targetNodes):
+        """Match nodes of the target with nodes of the material, by type and name then by type only.
+
+        :param currentNodes: Key => description of the nodes of the material.
+        :type currentNodes: dict
+        :param targetNodes: Key => description of the nodes of the target.
+        :type targetNodes: dict
+        :return: Target key => current key, only for matched nodes.
+        :rtype: dict
+        """
+        matches = dict()
+        for GetSignature in (lambda nodeSpec: (nodeSpec['type'], nodeSpec.get('name')), lambda nodeSpec: nodeSpec['type']):
+            available = dict()
+            matched = set(matches.values())
+            for key in sorted(currentNodes, key=lambda key: int(key[1:])):
+                if key not in matched:
+                    available.setdefault(GetSignature(currentNodes[key]), list()).append(key)
+
+            for key in sorted(targetNodes):
+                if key in matches:
+                    continue
+                candidates = available.get(GetSignature(targetNodes[key]))
+                if candidates:
+                    matches[key] = candidates.pop(0)
+        return matches
+
+    def Diff(self, target):
+        """Compute the patch that turn the material into the target.
+
+        :param target: A Redshift material, or a description returned by :meth:`.Redshift.ExportGraph` or its JSON string.
+        :type target: c4d.BaseMaterial, dict or str
+        :return: The patch, see :class:`.GraphDiff`.
+        :rtype: dict
+        :raises: TypeError, ValueError
+        """
+        rs = self._rs
+        targetGraph = self._GetTargetGraph(target)
+        currentGraph = rs.ExportGraph()
+        currentNodes = currentGraph['nodes']
+        targetNodes = targetGraph.get('nodes', dict())
+
+        matches = self._MatchNodes(currentNodes, targetNodes)
+        keys = dict((key, matches.get(key, NEW_NODE_PREFIX + key)) for key in targetNodes)
+
+        ops = list()
+
+        # Disconnect first, so removed nodes and ports are free
+        currentEdges = self._GetEdges(currentGraph, dict((key, key) for key in currentNodes))
+        targetEdges = self._GetEdges(targetGraph, keys)
+        for srcKey, srcPort, dstKey, dstPort in sorted(currentEdges - targetEdges):
+            ops.append({'op': 'disconnect', 'src': srcKey, 'srcPort': srcPort, 'dst': dstKey, 'dstPort': dstPort})
+
+        matched = set(matches.values())
+        for key in sorted(currentNodes, key=lambda key: int(key[1:])):
+            if key not in matched:
+                ops.append({'op': 'removeNode', 'node': key})
+
+        for targetKey in sorted(targetNodes):
+            targetSpec = targetNodes[targetKey]
+            key = keys[targetKey]
+            currentSpec = currentNodes.get(key)
+
+            if currentSpec is None:
+                op = {'op': 'addNode', 'node': key, 'type': targetSpec['type']}
+                for specKey in ('name', 'x', 'y'):
+                    if specKey in targetSpec:
+                        op[specKey] = targetSpec[specKey]
+                ops.append(op)
+                currentSpec = {'params': dict(), 'inputs': list(), 'outputs': list()}
+            elif targetSpec.get('name', currentSpec['name']) != currentSpec['name']:
+                ops.append({'op': 'setName', 'node': key, 'name': targetSpec['name']})
+
+            if targetSpec.get('color') is not None and targetSpec['color'] != currentSpec.get('color'):
+                ops.append({'op': 'setColor', 'node': key, 'color': targetSpec['color']})
+
+            currentParams = currentSpec.get('params', dict())
+            targetParams = targetSpec.get('params', dict())
+            for paramID in sorted(set(currentParams) | set(targetParams),
+                                  key=lambda paramID: [int(levelID) for levelID in paramID.split('.')]):
+                value = targetParams.get(paramID)
+                if value != currentParams.get(paramID):
+                    ops.append({'op': 'setParam', 'node': key, 'param': paramID, 'value': value})
+
+            for portKey, portType in (('inputs', 'input'), ('outputs', 'output')):
+                currentPorts = set(currentSpec.get(portKey, ()))
+                targetPorts = set(targetSpec.get(portKey, ()))
+                for port in sorted(targetPorts - currentPorts):
+                    ops.append({'op': 'expose', 'node': key, 'port': port, 'portType': portType})
+                for port in sorted(currentPorts - targetPorts):
+                    ops.append({'op': 'unexpose', 'node': key, 'port': port, 'portType': portType})
+
+        for srcKey, srcPort, dstKey, dstPort in sorted(targetEdges - currentEdges):
+            ops.append({'op': 'connect', 'src': srcKey, 'srcPort': srcPort, 'dst': dstKey, 'dstPort': dstPort})
+
+        return {'material': rs._mat.GetName(), 'dirty': rs._mat.GetDirty(c4d.DIRTYFLAGS_ALL), 'ops': ops}
+
+    def _GetPort(self, nodes, key, port, portType):
+        """Get the GvPort of a node of a patch.
+
+        :raises: ValueError if the port doesn't exist.
+        """
+        gvPort = nodes[key].GetPortByMainID(port, portType)
+        if gvPort is None:
+            raise ValueError('node {0} have no port {1}'.format(key, port))
+        return gvPort
+
+    def _CheckOps(self, ops, nodes):
+        """Check all operations of a patch before the first change: known operations with all their keys,
+        nodes that exist when the operation is applied, and for nodes of the material, parameters and ports that exist.
+        Ports and parameters of added nodes are only known once created.
+
+        :param ops: The operations of the patch.
+        :type ops: list of dict
+        :param nodes: Patch key => Node, for the nodes of the material.
+        :type nodes: dict of :class:`.Node`
+        :return: Node => DescIDs of the parameters set, for each node of the material the patch use.
+        :rtype: dict
+        :raises: ValueError
+        """
+        rs = self._rs
+        keys = set(nodes)
+        ports = dict()
+        used = dict()
+
+        def GetNode(key):
+            if key not in keys:
+                raise ValueError('node {0} doesn\'t exist'.format(key))
+            node = nodes.get(key)
+            if node is not None:
+                used.setdefault(node, list())
+            return node
+
+        def GetPorts(key, portType):
+            if (key, portType) not in ports:
+                ports[(key, portType)] = set(gvPort.GetMainID() for gvPort in nodes[key]._GetGvPorts(portType))
+            return ports[(key, portType)]
+
+        def CheckPort(key, port, portType):
+            if GetNode(key) is not None and port not in GetPorts(key, portType):
+                raise ValueError('node {0} have no port {1}'.format(key, port))
+
+        for op in ops:
+            kind = op.get('op') if isinstance(op, dict) else None
+            if kind not in OPERATIONS:
+                raise ValueError('unknown patch operation {0}'.format(kind))
+            for opKey in OPERATIONS[kind]:
+                if opKey not in op:
+                    raise ValueError('patch operation {0} have no {1}'.format(kind, opKey))
+
+            if kind == 'disconnect' or kind == 'connect':
+                CheckPort(op['src'], op['srcPort'], c4d.GV_PORT_OUTPUT)
+                CheckPort(op['dst'], op['dstPort'], c4d.GV_PORT_INPUT)
+
+            elif kind == 'removeNode':
+                GetNode(op['node'])
+                keys.remove(op['node'])
+
+            elif kind == 'addNode':
+                if op['node'] in keys:
+                    raise ValueError('node {0} already exist'.format(op['node']))
+                keys.add(op['node'])
+
+            elif kind == 'setParam':
+                node = GetNode(op['node'])
+                if node is not None:
+                    used[node].append(rs._ResolveParameter(node, op['param']))
+
+            elif kind == 'expose' or kind == 'unexpose':
+                if op['portType'] not in PORT_TYPES:
+                    raise ValueError('unknown port type {0}'.format(op['portType']))
+                if GetNode(op['node']) is not None:
+                    nodePorts = GetPorts(op['node'], PORT_TYPES[op['portType']])
+                    if kind == 'expose':
+                        nodePorts.add(op['port'])
+                    else:
+                        nodePorts.discard(op['port'])
+
+            else:
+                GetNode(op['node'])
+
+        return used
+
+    def Apply(self, patch, force=False):
+        """Apply a patch returned by :meth:`.Diff` to the material, in one :class:`.Transaction`.
+        If the patch can't be applied, the material is left as it was.
+
+        :param patch: The patch or its JSON string.
+        :type patch: dict or str
+        :param force: True to apply the patch even if the material changed since the patch was computed.
+        :type force: Bool
+        :return: Patch key => Node, for all nodes of the material after the patch.
+        :rtype: dict of :class:`.Node`
+        :raises: TypeError, ValueError
+        """
+        rs = self._rs
+        if isinstance(patch, str):
+            patch = json.loads(patch)
+        if not isinstance(patch, dict) or not isinstance(patch.get('ops'), list):
+            raise TypeError('patch is not a patch')
+        if not force and patch.get('dirty') != rs._mat.GetDirty(c4d.DIRTYFLAGS_ALL):
+            raise ValueError('material changed since the patch was computed')
+
+        # Same keys as ExportGraph
+        nodes = dict(('n{0}'.format(index), node) for index, node in enumerate(rs.IterNodes(depth=0)))
+        used = self._CheckOps(patch['ops'], nodes)
+
+        snapshot = NodeSnapshot(rs)
+        for node, descIDs in used.items():
+            snapshot.Add(node, descIDs)
+
+        createdNodes = list()
+        removedNodes = list()
+        with Transaction(rs.doUndo):
+            Transaction.AddUndo(rs._gvMaster, rs.doUndo)
+            try:
+                for op in patch['ops']:
+                    kind = op['op']
+                    if kind == 'disconnect':
+                        Node._DisconnectGvPort(self._GetPort(nodes, op['dst'], op['dstPort'], c4d.GV_PORT_INPUT))
+
+                    elif kind == 'removeNode':
+                        removedNodes.append(nodes.pop(op['node']))
+
+                    elif kind == 'addNode':
+                        node = rs.CreateShader(op['type'], op.get('x', -1), op.get('y', -1))
+                        if not node:
+                            raise ValueError('node {0} can\'t be created'.format(op['node']))
+                        createdNodes.append(node)
+                        if 'name' in op:
+                            node.SetName(op['name'])
+                        nodes[op['node']] = node
+
+                    elif kind == 'setName':
+                        nodes[op['node']].SetName(op['name'])
+
+                    elif kind == 'setColor':
+                        nodes[op['node']].SetColor(rs._ConvertValue(op['color']))
+
+                    elif kind == 'setParam':
+                        node = nodes[op['node']]
+                        descID = rs._ResolveParameter(node, op['param'])
+                        value = op['value']
+                        if value is None:
+                            value = rs._GetParamDefault(node, descID)
+                            if value is None:
+                                continue
+                        node[descID] = rs._ConvertValue(value)
+
+                    elif kind == 'expose':
+                        node = nodes[op['node']]
+                        if node.GetPortByMainID(op['port'], PORT_TYPES[op['portType']]) is None:
+                            if not node.ExposeParameter(op['port'], PORT_TYPES[op['portType']]):
+                                raise ValueError('node {0} port {1} can\'t be exposed'.format(op['node'], op['port']))
+
+                    elif kind == 'unexpose':
+                        node = nodes[op['node']]
+                        gvPort = node.GetPortByMainID(op['port'], PORT_TYPES[op['portType']])
+                        if gvPort is not None:
+                            node._RemoveGvPort(gvPort)
+
+                    elif kind == 'connect':
+                        gvPortSrc = self._GetPort(nodes, op['src'], op['srcPort'], c4d.GV_PORT_OUTPUT)
+                        gvPortDest = self._GetPort(nodes, op['dst'], op['dstPort'], c4d.GV_PORT_INPUT)
+                        if not Node._ConnectGvPorts(gvPortSrc, gvPortDest):
+                            raise ValueError('can\'t connect {0}:{1} to {2}:{3}'.format(op['src'], op['srcPort'], op['dst'], op['dstPort']))
+
+                # Removed nodes can't be restored, so they are removed once everything else succeeded
+                for node in removedNodes:
+                    node._RemoveGvNode()
+
+            except Exception:
+                # Leave the material as it was
+                for node in createdNodes:
+                    node._RemoveGvNode()
+                rs._nodeIndex = None
+                snapshot.Restore()
+                raise
+
+            finally:
+                rs._nodeIndex = None
+
+        return nodes
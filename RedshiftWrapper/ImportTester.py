@@ -1,39 +1,70 @@
-import imp
- 
+import sys
+import importlib
+import importlib.util
+
+
 class ImportTester(type):
-    _HaveBeenCalled = False
-    _CanImport = False
- 
+    """Metaclass returning False instead of an instance when the redshift module is not available.
+
+    Detection is done once per module name with importlib.util.find_spec, without importing the module,
+    and modules are only imported by :meth:`.GetModule` when they are used.
+
+    :member _CanImport: (dict) Module name => True if the module can be imported.
+    :member _Modules: (dict) Module name => the imported module, or None if it can't be imported.
+    """
+    _CanImport = dict()
+    _Modules = dict()
+
     @classmethod
-    def _CheckImport(cls, clsName):
-        # If we already test, we return the cached value
-        if cls._HaveBeenCalled:
-            return cls._CanImport
-       
-        # Check if module is already pressent
+    def _CheckImport(cls, moduleName):
+        """Check if a module can be imported, the result is cached.
+
+        :param moduleName: The name of the module.
+        :type moduleName: str
+        :return: True if the module can be imported otherwise False.
+        :rtype: Bool
+        """
+        canImport = cls._CanImport.get(moduleName)
+        if canImport is not None:
+            return canImport
+
+        if moduleName in sys.modules:
+            canImport = sys.modules[moduleName] is not None
+        else:
+            try:
+                canImport = importlib.util.find_spec(moduleName) is not None
+            except (ImportError, ValueError):
+                canImport = False
+
+        cls._CanImport[moduleName] = canImport
+        return canImport
+
+    @classmethod
+    def GetModule(cls, moduleName):
+        """Import a module the first time it's needed, the result is cached.
+
+        :param moduleName: The name of the module.
+        :type moduleName: str
+        :return: The module, or None if it can't be imported.
+        :rtype: module or None
+        """
         try:
-            imp.find_module(clsName)
-            cls._CanImport = True
-            return True
-            
-        # If module is not already loaded we try to laod it
-        except ImportError:
+            return cls._Modules[moduleName]
+        except KeyError:
+            pass
+
+        module = None
+        if cls._CheckImport(moduleName):
             try:
-                __import__(clsName)
-                cls._CanImport = True
-                return True
-           
+                module = importlib.import_module(moduleName)
             except ImportError:
-                print(__import__(clsName))
-                cls._CanImport = False
-                return False
- 
+                cls._CanImport[moduleName] = False
+
+        cls._Modules[moduleName] = module
+        return module
+
     def __call__(cls, *args, **kwargs):
-        if not cls._HaveBeenCalled:
-            cls._CheckImport("redshift")
-            cls._HaveBeenCalled = True
-           
-        if cls._CanImport:
+        if cls._CheckImport("redshift"):
             return super(ImportTester, cls).__call__(*args, **kwargs)
         else:
             return False
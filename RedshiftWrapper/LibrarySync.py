@@ -0,0 +1,279 @@
+import os
+import json
+import time
+import collections
+import c4d
+
+from .ImportTester import ImportTester
+from .Transaction import Transaction
+
+
+class LibrarySync(object):
+    """Keep Redshift materials of a document in sync with a directory of material definitions,
+    files written by :meth:`.Redshift.ExportGraph` (one JSON graph per file).
+
+    The directory is polled with os.stat, a file is read again only when its modification time or size changed,
+    and the material with the same name is updated with :meth:`.Redshift.Diff` / :meth:`.Redshift.ApplyPatch`,
+    so unchanged nodes (and their layout) are kept. Missing materials are created.
+
+    A file is applied entirely or not at all: a patch that fails leaves the material as it was, and a missing material
+    is only inserted in the document once its graph is built. A file that failed is processed again by the next polls,
+    after the other changed files, until it succeeds.
+
+    Changed files wait in a bounded queue processed by :meth:`.Tick` within a time budget, so a bulk checkout
+    is spread over many calls (e.g from a timer or a message plugin) instead of freezing the UI. Once the queue is full,
+    the other changed files are found again by the next :meth:`.Poll`.
+
+    Example::
+
+        sync = LibrarySync(rs, "/library/materials")
+        # In a timer
+        sync.Poll()
+        sync.Tick(0.01)
+
+    :member _rs: (:class:`.Redshift`) The wrapper used to update materials, the material it's set on is kept.
+    :member _directory: (str) The watched directory.
+    :member _doc: (c4d.BaseDocument) The document of the materials, None for the active document.
+    :member _extension: (str) Extension of the definition files.
+    :member _maxQueue: (int) Maximum number of files waiting in the queue.
+    :member _stats: (dict) Path => (modification time, size) of the last version of each file processed successfully.
+    :member _queue: (collections.deque) Paths of changed files waiting to be processed.
+    :member _queued: (set) Paths in :member:`._queue`.
+    :member _errors: (dict) Path => exception raised by the last processing of the file, only for files that failed.
+    :member _failed: (dict) Path => (modification time, size) of the version of each file that failed.
+    :member _materials: (dict) Name => Redshift material of the document while :meth:`.Sync` runs, otherwise None.
+    """
+
+    def __init__(self, rs, directory, doc=None, extension='.json', maxQueue=64):
+        """Initialization of the sync, nothing is read before the first :meth:`.Poll`.
+
+        :param rs: The wrapper used to update materials.
+        :type rs: :class:`.Redshift`
+        :param directory: The directory of the definition files.
+        :type directory: str
+        :param doc: The document of the materials, None for the active document.
+        :type doc: c4d.BaseDocument
+        :param extension: Extension of the definition files.
+        :type extension: str
+        :param maxQueue: Maximum number of files waiting to be processed.
+        :type maxQueue: int
+        """
+        if not isinstance(directory, str):
+            raise TypeError('directory is not a str')
+        if not isinstance(doc, c4d.BaseDocument) and doc is not None:
+            raise TypeError('doc is not a BaseDocument')
+        if not isinstance(maxQueue, int) or maxQueue < 1:
+            raise TypeError('maxQueue is not a positive int')
+
+        self._rs = rs
+        self._directory = directory
+        self._doc = doc
+        self._extension = extension
+        self._maxQueue = maxQueue
+        self._stats = dict()
+        self._queue = collections.deque()
+        self._queued = set()
+        self._errors = dict()
+        self._failed = dict()
+        self._materials = None
+
+    def Poll(self):
+        """Look for new or changed files and queue them, a file is queued once however many times it changed.
+        Files that failed and didn't change since are queued again after the other ones.
+
+        :return: Number of files added to the queue.
+        :rtype: int
+        """
+        return self._Poll(())
+
+    def _Poll(self, exclude):
+        """Look for new or changed files and queue them, see :meth:`.Poll`.
+
+        :param exclude: Paths to not queue.
+        :type exclude: set or dict
+        :return: Number of files added to the queue.
+        :rtype: int
+        """
+        try:
+            entries = os.scandir(self._directory)
+        except OSError:
+            return 0
+
+        changed = list()
+        retries = list()
+        with entries:
+            for entry in entries:
+                if not entry.name.endswith(self._extension) or entry.path in self._queued or entry.path in exclude:
+                    continue
+
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+
+                stat = (stat.st_mtime, stat.st_size)
+                if self._stats.get(entry.path) == stat:
+                    continue
+                if self._failed.get(entry.path) == stat:
+                    retries.append(entry.path)
+                else:
+                    changed.append(entry.path)
+                    if len(self._queue) + len(changed) >= self._maxQueue:
+                        break
+
+        count = 0
+        for path in changed + retries:
+            if len(self._queue) >= self._maxQueue:
+                break
+            self._queue.append(path)
+            self._queued.add(path)
+            count += 1
+        return count
+
+    def GetPending(self):
+        """Get the paths waiting to be processed.
+
+        :return: The paths, in processing order.
+        :rtype: list of str
+        """
+        return list(self._queue)
+
+    def GetErrors(self):
+        """Get the errors of the files that failed the last time they were processed.
+
+        :return: Path => exception.
+        :rtype: dict
+        """
+        return dict(self._errors)
+
+    def _GetDoc(self):
+        """Get the document of the materials.
+
+        :rtype: c4d.BaseDocument
+        """
+        return self._doc if self._doc is not None else c4d.documents.GetActiveDocument()
+
+    def _GetMaterials(self, doc):
+        """Get the Redshift materials of a document by name, the first one for a name used several times.
+
+        :param doc: The document of the materials.
+        :type doc: c4d.BaseDocument
+        :return: Name => material.
+        :rtype: dict
+        """
+        materials = dict()
+        for mat in self._rs.IterMaterials(doc):
+            materials.setdefault(mat.GetName(), mat)
+        return materials
+
+    @staticmethod
+    def _Apply(rs, graph):
+        """Turn the graph of the material of rs into a graph, see :meth:`.Redshift.ApplyPatch`.
+
+        :return: Number of operations applied.
+        :rtype: int
+        """
+        patch = rs.Diff(graph)
+        if patch['ops']:
+            rs.ApplyPatch(patch)
+        return len(patch['ops'])
+
+    def _Process(self, path, doc, materials):
+        """Update or create the material of a definition file, the file is marked processed only if it succeeds.
+
+        :param path: The definition file.
+        :type path: str
+        :param doc: The document of the materials.
+        :type doc: c4d.BaseDocument
+        :param materials: Name => Redshift material of the document, a created material is added.
+        :type materials: dict
+        :return: Number of operations applied.
+        :rtype: int
+        """
+        stat = os.stat(path)
+
+        with open(path, 'r', encoding='utf-8') as definition:
+            graph = json.load(definition)
+
+        if not isinstance(graph, dict):
+            raise TypeError('{0} is not a graph description'.format(path))
+
+        name = graph.get('material') or os.path.splitext(os.path.basename(path))[0]
+        rs = self._rs
+
+        mat = materials.get(name)
+        if mat is None:
+            # Built outside of the document, so a graph that can't be built creates nothing. Its insertion is the undo.
+            redshift = ImportTester.GetModule("redshift")
+            mat = c4d.BaseMaterial(redshift.Mrsmaterial)
+            mat.SetName(name)
+            builder = rs.__class__()
+            builder.doUndo = False
+            builder._BindMat(mat)
+            Transaction.MarkChanged([builder._gvMaster])
+            count = self._Apply(builder, graph)
+            rs._InsertMaterials(doc, [mat])
+            materials[name] = mat
+        else:
+            previousMat, previousGvMaster, previousNodeIndex = rs._mat, rs._gvMaster, rs._nodeIndex
+            try:
+                rs.SetMat(mat)
+                count = self._Apply(rs, graph)
+            finally:
+                rs._mat, rs._gvMaster, rs._nodeIndex = previousMat, previousGvMaster, previousNodeIndex
+
+        self._stats[path] = (stat.st_mtime, stat.st_size)
+        return count
+
+    def Tick(self, budget=0.01):
+        """Process queued files until the time budget is spent, at least one file is processed if any.
+        All changes of a tick are in one :class:`.Transaction`.
+
+        :param budget: Time budget in seconds.
+        :type budget: float
+        :return: Path => number of operations applied (or None if it failed, see :meth:`.GetErrors`) for each processed file.
+        :rtype: dict
+        """
+        processed = dict()
+        if not self._queue:
+            return processed
+
+        end = time.perf_counter() + budget
+        doc = self._GetDoc()
+        materials = self._materials if self._materials is not None else self._GetMaterials(doc)
+        with Transaction(self._rs.doUndo):
+            while self._queue:
+                path = self._queue.popleft()
+                self._queued.discard(path)
+                try:
+                    processed[path] = self._Process(path, doc, materials)
+                    self._errors.pop(path, None)
+                    self._failed.pop(path, None)
+                except Exception as error:
+                    processed[path] = None
+                    self._errors[path] = error
+                    try:
+                        stat = os.stat(path)
+                        self._failed[path] = (stat.st_mtime, stat.st_size)
+                    except OSError:
+                        self._failed.pop(path, None)
+
+                if time.perf_counter() >= end:
+                    break
+        return processed
+
+    def Sync(self):
+        """Poll and process all changed files now, whatever the time it takes.
+        Each file is processed at most once, files that failed before are tried again.
+
+        :return: Path => number of operations applied (or None if it failed) for each processed file.
+        :rtype: dict
+        """
+        processed = dict()
+        self._materials = self._GetMaterials(self._GetDoc())
+        try:
+            while self._Poll(processed) or self._queue:
+                processed.update(self.Tick(float('inf')))
+        finally:
+            self._materials = None
+        return processed
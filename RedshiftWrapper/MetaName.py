@@ -1,6 +1,10 @@
 import c4d
 
+from .Profiler import Profiler
+
 class MetaMat(object):
+    __slots__ = ()
+
     NodeColor = c4d.Vector(0.8, 0.4, 0.4)
 
     # Materials
@@ -16,6 +20,8 @@ class MetaMat(object):
     MatSSS = "SubSurfaceScatter"
   
 class MetaTex(object):
+    __slots__ = ()
+
     NodeColor = c4d.Vector(0.98, 0.635, 0.008)
 
     # Textures
@@ -28,6 +34,8 @@ class MetaTex(object):
     TexWire = "WireFrame"
   
 class MetaUtils(object):
+    __slots__ = ()
+
     NodeColor = c4d.Vector(0.349, 0.514, 1)
 
     # utility
@@ -55,6 +63,8 @@ class MetaUtils(object):
     UtVertexAttr = "VertexAttributeLookup"
     
 class MetaEnv(object):
+    __slots__ = ()
+
     NodeColor = c4d.Vector(0.537, 0.443, 0.984)
 
     # Environment
@@ -62,6 +72,8 @@ class MetaEnv(object):
     EnvSky = "PhysicalSky"
 
 class MetaLight(object):
+    __slots__ = ()
+
     NodeColor = c4d.Vector(0.8, 0.8, 0.8)
 
     # Light
@@ -72,12 +84,16 @@ class MetaLight(object):
     LightSun = "PhysicalSun"
     
 class MetaVolume(object):
+    __slots__ = ()
+
     NodeColor = c4d.Vector(0.361, 0.8, 0.8)
 
     # Volume
     Volume = "Volume"
     
 class MetaMath(object):
+    __slots__ = ()
+
     NodeColor = c4d.Vector(0.333, 1, 0.635)
 
     #Math
@@ -143,6 +159,8 @@ class MetaMath(object):
     MathRSVectorToScalars = "RSVectorToScalars"
     
 class MetaColor(object):
+    __slots__ = ()
+
     NodeColor = c4d.Vector(0.094, 0.776, 0.278)
 
     # Color
@@ -164,6 +182,8 @@ class MetaColor(object):
     ColorBiasColor = "RSMathBiasColor"
    
 class MetaOut(object):
+    __slots__ = ()
+
     NodeColor = c4d.Vector(0.204, 0.443, 0.682)
 
     # Output
@@ -172,6 +192,7 @@ class MetaOut(object):
 class MetaName(MetaMat, MetaTex, MetaUtils, MetaEnv, MetaLight, MetaVolume, MetaMath, MetaColor, MetaOut):
     """Class for storing all possibles metaname.
     """
+    __slots__ = ()
 
     def _TestProperty(self, valueToTest, classToTest=None):
         """Test if any properties of :class:`MetaclassName` have a specific value, This function is used to test if a string is under MetaName.
@@ -183,17 +204,31 @@ class MetaName(MetaMat, MetaTex, MetaUtils, MetaEnv, MetaLight, MetaVolume, Meta
         :return: True if it's on MetaName overtwise False.
         :rtype: Bool
         """
-        obj = None
         if classToTest is None:
-            obj = MetaName()
-        else:
-            obj = classToTest
-        for attr in dir(obj):
-            if getattr(type(obj), attr, None) == valueToTest:
-                return True
+            return _IsMetaName(valueToTest)
+
+        cls = classToTest if isinstance(classToTest, type) else type(classToTest)
+
+        # Classes outside of the Meta hierarchy are not indexed, walk them as before
+        if not any(issubclass(cls, category) for category in _CATEGORIES):
+            for attr in dir(cls):
+                if getattr(cls, attr, None) == valueToTest:
+                    return True
+            return False
+
+        category = _GetCategory(valueToTest)
+        return category is not None and issubclass(cls, category)
+
+    def GetCategory(self, nodeType):
+        """Get the Meta category a node type belongs to.
+
+        :param nodeType: The MetaName type to look for.
+        :type nodeType: str
+        :return: The category class (:class:`MetaMat`, :class:`MetaTex`, ...) or None if nodeType is not a MetaName.
+        :rtype: class or None
+        """
+        return _GetCategory(nodeType)
 
-        return False
-    
     def GetDefaultColorNode(self, nodeType):
         """Get the Default color for a node given it's type.
 
@@ -202,21 +237,44 @@ class MetaName(MetaMat, MetaTex, MetaUtils, MetaEnv, MetaLight, MetaVolume, Meta
         :return: Default color.
         :rtype: c4d.Vector
         """
-        classToTest = list()
-        classToTest.append(MetaMat())
-        classToTest.append(MetaTex())
-        classToTest.append(MetaUtils())
-        classToTest.append(MetaEnv())
-        classToTest.append(MetaLight())
-        classToTest.append(MetaVolume())
-        classToTest.append(MetaMath())
-        classToTest.append(MetaColor())
-        classToTest.append(MetaOut())
-        
-        color = c4d.Vector(0.38, 0.384, 0.392)
-        
-        for cls in classToTest:
-            if self._TestProperty(nodeType, cls):
-                color = cls.NodeColor
-        return color
-    
+        category = _GetCategory(nodeType)
+        if category is None:
+            return c4d.Vector(0.38, 0.384, 0.392)
+        return category.NodeColor
+
+
+# ==============================================
+#                   Index
+# ==============================================
+
+_CATEGORIES = (MetaMat, MetaTex, MetaUtils, MetaEnv, MetaLight, MetaVolume, MetaMath, MetaColor, MetaOut)
+
+# Build once on import: metaclass name => category class
+_CATEGORY_BY_NAME = dict()
+for _category in _CATEGORIES:
+    for _attr, _value in vars(_category).items():
+        if _attr.startswith('_') or _attr == 'NodeColor' or not isinstance(_value, str):
+            continue
+        _CATEGORY_BY_NAME[_value] = _category
+del _category, _attr, _value
+
+_META_NAMES = frozenset(_CATEGORY_BY_NAME)
+
+
+def _GetCategory(nodeType):
+    """Return the category class of nodeType or None, nodeType can be any type."""
+    try:
+        return _CATEGORY_BY_NAME.get(nodeType)
+    except TypeError:
+        return None
+
+
+def _IsMetaName(nodeType):
+    """Return True if nodeType is a metaclass name known by :class:`MetaName`."""
+    try:
+        return nodeType in _META_NAMES
+    except TypeError:
+        return False
+
+
+Profiler.Register(MetaName, methods=('_TestProperty',))
@@ -1,48 +1,73 @@
-import os
-import sys
+import weakref
 import c4d
-try:
-    import redshift
-except:
-    pass
 
-if os.path.dirname(__file__) not in sys.path:
-    sys.path.append(os.path.dirname(__file__))
+from .MetaName import MetaName
+from .ImportTester import ImportTester
+from .NodeDescriptor import NodeDescriptor
+from .Transaction import Transaction
+from .Profiler import Profiler
 
-from MetaName import MetaName
-from ImportTester import ImportTester
+# Container of the GvNode position, GvNode.GetDataInstance()[ID_GV_VIEW_DATA][ID_GV_VIEW_POSITION][X / Y]
+ID_GV_VIEW_DATA = 1001
+ID_GV_VIEW_POSITION = 1000
+ID_GV_VIEW_POSITION_X = 100
+ID_GV_VIEW_POSITION_Y = 101
 
 
 class Node(MetaName):
     __metaclass__ = ImportTester
     """Represent a Node that already exist in a Material.
+    There is only one Node per GvNode, creating a Node for a GvNode that already have one return the existing Node.
 
+    :member _nodes: (weakref.WeakValueDictionary) GvNode => Node, shared by all nodes.
     :member _GvNode: (c4d.modules.graphview.GvNode) - The GvNode linked to this Node. READ-ONLY DO NOT EDIT !!! 
-    :member _NodeType: (Int or Str) - Int (a Cinema 4D Node look at https://developers.maxon.net/docs/Cinema4DPythonSDK/html/types/gvnodes.html) or a Redshift Node member loot at :class:`MetaclassName`.
-    :member __DoUndo: (Bool) DEFINE BY :class:`.Redshift`,  True if the wrapper have to call GvMaster.AddUndo() before any change otherwise False
+    :member _NodeType: (Int or Str) - Int (a Cinema 4D Node look at https://developers.maxon.net/docs/Cinema4DPythonSDK/html/types/gvnodes.html) or a Redshift Node member loot at :class:`MetaclassName`. None until the first :meth:`.GetType`.
+    :member __DoUndo: (Bool) DEFINE BY :class:`.Redshift` each time it hands out the Node, True if the wrapper have to call GvMaster.AddUndo() before any change otherwise False. The Node is shared so the undo of the wrapper that handed it out last is used.
     """
+    __slots__ = ('_GvNode', '_NodeType', '__DoUndo', '__weakref__')
 
-    _GvNode = None
-    _NodeType = None  # string if redshift int if xpresso
-    __DoUndo = True
+    _nodes = weakref.WeakValueDictionary()
 
-    def __init__(self, gvNode, undo=True):
-        """Initialization of the node
+    def __new__(cls, gvNode, undo=True):
+        """Get the Node of the GvNode, created only if the GvNode doesn't have one yet.
 
         :param gvNode: The GvNode linked to this Node.
         :type gvNode: c4d.modules.graphview.GvNode
-        :param undo: If undo need to be done.
+        :param undo: If undo need to be done, set by :meth:`.__init__`.
         :type undo: Bool
         """
         if not isinstance(gvNode, c4d.modules.graphview.GvNode):
             raise TypeError('gvNode is not a c4d.modules.graphview.GvNode')
 
+        node = Node._nodes.get(gvNode)
+        if node is None or type(node) is not cls or not node._GvNode.IsAlive():
+            node = super(Node, cls).__new__(cls)
+            node._GvNode = gvNode
+            node._NodeType = None
+            Node._nodes[gvNode] = node
+        return node
+
+    def __init__(self, gvNode, undo=True):
+        """Initialization of the node, the GvNode is set by :meth:`.__new__` only when the Node is created.
+        Also called when an existing Node is returned, so its undo is the one of the last caller.
+
+        :param gvNode: The GvNode linked to this Node.
+        :type gvNode: c4d.modules.graphview.GvNode
+        :param undo: If undo need to be done.
+        :type undo: Bool
+        """
+        self.__DoUndo = undo
+
+    def _SetUndo(self, undo):
+        """Set if undo need to be done, used by :class:`.Redshift` when it hands out a Node it already holds.
+
+        :param undo: If undo need to be done.
+        :type undo: Bool
+        """
         self.__DoUndo = undo
-        self._GvNode = gvNode
-        self._SetNodeType()
 
     def __getitem__(self, key):
-        return self.GvNode[key]
+        return self._GvNode[key]
 
     def __setitem__(self, key, value):
         self._GvNode[key] = value
@@ -56,7 +81,7 @@ class Node(MetaName):
             Int => a Cinema 4D Node look at https://developers.maxon.net/docs/Cinema4DPythonSDK/html/types/gvnodes.html 
             Str => a Redshift Node look at ::class:: MetaclassName 
         """
-        global redshift
+        redshift = ImportTester.GetModule("redshift")
         if self._GvNode.IsInstanceOf(redshift.GVrsshader):
             self._NodeType = self._GvNode[c4d.GV_REDSHIFT_SHADER_META_CLASSNAME]
         elif self._GvNode.GetOperatorID() == 1036746:
@@ -66,6 +91,30 @@ class Node(MetaName):
         else:
             self._NodeType = self._GvNode.GetOperatorID()
 
+    def IsAlive(self):
+        """Check if the GvNode still exist in its material.
+
+        :return: False if the GvNode was removed (or freed) otherwise True.
+        :rtype: Bool
+        """
+        gvNode = self._GvNode
+        if not gvNode.IsAlive():
+            return False
+        if gvNode.GetUp() is not None:
+            return True
+
+        # Only the root of a GvNodeMaster doesn't have a parent
+        gvMaster = gvNode.GetNodeMaster()
+        return gvMaster is not None and gvMaster.GetRoot() == gvNode
+
+    def _CheckAlive(self):
+        """Check the GvNode still exist before acting on it.
+
+        :raises: ReferenceError
+        """
+        if not self.IsAlive():
+            raise ReferenceError('the GvNode of this Node was removed')
+
     def GetNode(self):
         """Get the GvNode linked.
 
@@ -80,8 +129,19 @@ class Node(MetaName):
         :return: Int (a Cinema 4D Node look at https://developers.maxon.net/docs/Cinema4DPythonSDK/html/types/gvnodes.html) or a Redshift Node member loot at :class:`MetaclassName`
         :rtype: Int or Str
         """
+        if self._NodeType is None:
+            self._CheckAlive()
+            self._SetNodeType()
         return self._NodeType
 
+    def GetDescriptor(self):
+        """Get the parameter and port layout shared by all nodes of the same type.
+
+        :return: The descriptor of the node type.
+        :rtype: :class:`.NodeDescriptor`
+        """
+        return NodeDescriptor.Get(self._GvNode, self.GetType())
+
     def GetColor(self):
         """Get the color of a GvNode Type.
 
@@ -98,22 +158,67 @@ class Node(MetaName):
         """
         if not isinstance(color, c4d.Vector) and color is not None:
             raise TypeError('color is not a valid color')
+        self._CheckAlive()
             
         if color is None:
             color = self.GetDefaultColorNode(self.GetType())
         
-        if self.__DoUndo:
-            self._GvNode.GetNodeMaster().AddUndo()
+        Transaction.AddUndo(self._GvNode.GetNodeMaster(), self.__DoUndo)
         self[c4d.ID_GVBASE_COLOR] = color
         
+    def _GetPositionContainer(self):
+        """Get the container that hold the position of the GvNode in the Xpresso windows.
+
+        :return: The position container or None.
+        :rtype: c4d.BaseContainer or None
+        """
+        bc = self._GvNode.GetDataInstance()
+        if bc is None:
+            return None
+        bc = bc.GetContainerInstance(ID_GV_VIEW_DATA)
+        if bc is None:
+            return None
+        return bc.GetContainerInstance(ID_GV_VIEW_POSITION)
+
+    def GetPosition(self):
+        """Get the position of the GvNode in the Xpresso windows.
+
+        :return: (x, y) position.
+        :rtype: tuple of float
+        """
+        bc = self._GetPositionContainer()
+        if bc is None:
+            return -1.0, -1.0
+        return bc.GetFloat(ID_GV_VIEW_POSITION_X), bc.GetFloat(ID_GV_VIEW_POSITION_Y)
+
+    def SetPosition(self, x, y):
+        """Set the position of the GvNode in the Xpresso windows.
+
+        :param x: X position in the Xpresso windows.
+        :type x: int or float
+        :param y: Y position in the Xpresso windows.
+        :type y: int or float
+        """
+        if not isinstance(x, (int, float)) or not isinstance(y, (int, float)):
+            raise TypeError('position is not valid type')
+        self._CheckAlive()
+
+        bc = self._GetPositionContainer()
+        if bc is None:
+            return
+
+        Transaction.AddUndo(self._GvNode.GetNodeMaster(), self.__DoUndo)
+        bc[ID_GV_VIEW_POSITION_X] = float(x)
+        bc[ID_GV_VIEW_POSITION_Y] = float(y)
+
     def SetName(self, newName):
         """Set the name of the GvNode.
 
         :param newName: New name of the GvNode.
         :type newName: str
         """
-        if self.__DoUndo:
-            self._GvNode.GetNodeMaster().AddUndo()
+        self._CheckAlive()
+        Transaction.AddUndo(self._GvNode.GetNodeMaster(), self.__DoUndo)
         self._GvNode.SetName(newName)
 
     def GetName(self):
@@ -138,54 +243,180 @@ class Node(MetaName):
 
         # Search by Name
         if isinstance(portToSearch, str):
-            # Set the list of gvPort to check
-            gvPortList = list()
+            # Set the list of gvPort type to check
             if searchType is None:
-                gvPortList += self._GvNode.GetOutPorts()
-                gvPortList += self._GvNode.GetInPorts()
-            elif searchType == c4d.GV_PORT_OUTPUT:
-                gvPortList += self._GvNode.GetOutPorts()
-            elif searchType == c4d.GV_PORT_INPUT:
-                gvPortList += self._GvNode.GetInPorts()
+                portTypes = (c4d.GV_PORT_OUTPUT, c4d.GV_PORT_INPUT)
+            elif searchType == c4d.GV_PORT_OUTPUT or searchType == c4d.GV_PORT_INPUT:
+                portTypes = (searchType,)
             else:
                 raise TypeError('SearchType Unknow')
 
-            for gvPort in gvPortList:
-                if gvPort.GetName(self._GvNode) == portToSearch:
+            # Use the main ID already known for this node type
+            descriptor = self.GetDescriptor()
+            for portType in portTypes:
+                mainID = descriptor.GetPortID(portToSearch, portType)
+                if mainID is None:
+                    continue
+
+                gvPort = self.GetPortByMainID(mainID, portType)
+                if gvPort and gvPort.GetName(self._GvNode) == portToSearch:
                     return gvPort
 
+            # Otherwise check all ports and remember them for next nodes of this type
+            for portType in portTypes:
+                for gvPort in self._GetGvPorts(portType):
+                    name = gvPort.GetName(self._GvNode)
+                    descriptor.SetPortID(name, portType, gvPort.GetMainID())
+                    if name == portToSearch:
+                        return gvPort
+
         # Get port ID
         if isinstance(portToSearch, int):
             if searchType is None:
                 raise TypeError('Cant search int without SearchType')
-            elif searchType == c4d.GV_PORT_OUTPUT:
-                return self._GvNode.GetOutPort(portToSearch)
-            elif searchType == c4d.GV_PORT_INPUT:
-                return self._GvNode.GetInPort(portToSearch)
+            elif searchType == c4d.GV_PORT_OUTPUT or searchType == c4d.GV_PORT_INPUT:
+                return self._GetGvPortByIndex(portToSearch, searchType)
 
         return None
 
+    def _GetGvPorts(self, portType):
+        """Get all GvPort of a type, the whole wrapper get ports through it so GetInPorts / GetOutPorts calls can be counted by :class:`.Profiler`.
+
+        :param portType: GV_PORT_INPUT or GV_PORT_OUTPUT.
+        :type portType: int
+        :return: All GvPort of this type.
+        :rtype: List of c4d.modules.graphview.GvPort
+        """
+        if portType == c4d.GV_PORT_OUTPUT:
+            return self._GvNode.GetOutPorts()
+        return self._GvNode.GetInPorts()
+
+    def _GetGvPortByIndex(self, index, portType):
+        """Get a GvPort by its index, only place where GetInPort / GetOutPort are called so they can be counted by :class:`.Profiler`.
+
+        :param index: Index of the GvPort.
+        :type index: int
+        :param portType: GV_PORT_INPUT or GV_PORT_OUTPUT.
+        :type portType: int
+        :return: The GvPort or None.
+        :rtype: c4d.modules.graphview.GvPort or None
+        """
+        if portType == c4d.GV_PORT_OUTPUT:
+            return self._GvNode.GetOutPort(index)
+        return self._GvNode.GetInPort(index)
+
+    def _GetGvPortByMainID(self, mainID, portType):
+        """Get the first GvPort with a main ID, only place where GetInPortFirstMainID / GetOutPortFirstMainID are called so they can be counted by :class:`.Profiler`.
+
+        :param mainID: The main ID of the GvPort.
+        :type mainID: int
+        :param portType: GV_PORT_INPUT or GV_PORT_OUTPUT.
+        :type portType: int
+        :return: The GvPort or None.
+        :rtype: c4d.modules.graphview.GvPort or None
+        """
+        if portType == c4d.GV_PORT_OUTPUT:
+            return self._GvNode.GetOutPortFirstMainID(mainID)
+        return self._GvNode.GetInPortFirstMainID(mainID)
+
+    def _RemoveGvPort(self, gvPort):
+        """Remove a GvPort of the GvNode, the whole wrapper remove ports through it so RemovePort can be counted by :class:`.Profiler`.
+
+        :param gvPort: The GvPort to remove.
+        :type gvPort: c4d.modules.graphview.GvPort
+        :return: The result of GvNode.RemovePort().
+        """
+        return self._GvNode.RemovePort(gvPort)
+
+    def _RemoveGvNode(self):
+        """Remove the GvNode, the whole wrapper remove GvNodes through it so it can be counted by :class:`.Profiler`.
+
+        :return: The result of GvNode.Remove().
+        """
+        return self._GvNode.Remove()
+
+    @staticmethod
+    def _ConnectGvPorts(gvPortSrc, gvPortDest):
+        """Connect two GvPort, the whole wrapper connect ports through it so it can be counted by :class:`.Profiler`.
+
+        :param gvPortSrc: The output GvPort.
+        :type gvPortSrc: c4d.modules.graphview.GvPort
+        :param gvPortDest: The input GvPort.
+        :type gvPortDest: c4d.modules.graphview.GvPort
+        :return: True if success otherwise False.
+        :rtype: Bool
+        """
+        return gvPortSrc.Connect(gvPortDest)
+
+    @staticmethod
+    def _DisconnectGvPort(gvPort):
+        """Remove all connections of a GvPort, the whole wrapper disconnect ports through it so it can be counted by :class:`.Profiler`.
+
+        :param gvPort: The GvPort to disconnect.
+        :type gvPort: c4d.modules.graphview.GvPort
+        :return: The result of GvPort.Remove().
+        """
+        return gvPort.Remove()
+
+    def _AddGvPort(self, portType, descID):
+        """Add a GvPort, only place where AddPort is called so it can be counted by :class:`.Profiler`.
+
+        :param portType: GV_PORT_INPUT or GV_PORT_OUTPUT.
+        :type portType: int
+        :param descID: The DescID of the parameter to expose.
+        :type descID: c4d.DescID
+        :return: The created GvPort or None.
+        :rtype: c4d.modules.graphview.GvPort or None
+        """
+        return self._GvNode.AddPort(portType, descID, message=True)
+
+    def GetPortByMainID(self, mainID, portType):
+        """Get the first GvPort of the Node with a given main ID (for an exposed parameter, the ID of the parameter).
+
+        :param mainID: The main ID of the GvPort.
+        :type mainID: int
+        :param portType: GV_PORT_INPUT or GV_PORT_OUTPUT.
+        :type portType: int
+        :return: GvPort that match the search.
+        :rtype: c4d.modules.graphview.GvPort or None
+        """
+        if portType == c4d.GV_PORT_OUTPUT or portType == c4d.GV_PORT_INPUT:
+            return self._GetGvPortByMainID(mainID, portType)
+        raise TypeError('portType Unknow')
+
     def ExposeParameter(self, parameterID, portType):
         """Expose a parameter in a GvNode.
 
-        :param parameterID: The ID of the parameter or the full c4d.DescID.
-        :type paramaterID: int or c4d.DescID
+        :param parameterID: The ID of the parameter, the full c4d.DescID or the identifier / name of the parameter (e.g "REDSHIFT_SHADER_MATERIAL_DIFFUSE_WEIGHT").
+        :type paramaterID: int, c4d.DescID or str
         :param portType: c4d.GV_PORT_INPUT or c4d.GV_PORT_OUTPUT.
         :type portType: int
         :return: True if success otherwise False.
         :rtype: Bool
         """
-        if not isinstance(parameterID, int) and not isinstance(parameterID, c4d.DescID):
+        if not isinstance(parameterID, int) and not isinstance(parameterID, c4d.DescID) and not isinstance(parameterID, str):
             raise TypeError('parameterID is not valid')
+        self._CheckAlive()
+
+        if isinstance(parameterID, str):
+            descID = self.GetDescriptor().GetParameterID(parameterID)
+            if descID is None:
+                raise ValueError('parameterID is not a parameter of this node')
+            parameterID = descID
 
         if isinstance(parameterID, int):
             if self._GvNode.AddPortIsOK(portType, parameterID):
-                if self.__DoUndo:
-                    self._GvNode.GetNodeMaster().AddUndo()
-                return self._GvNode.AddPort(portType, c4d.DescID(c4d.DescLevel(parameterID)), message=True)
+                Transaction.AddUndo(self._GvNode.GetNodeMaster(), self.__DoUndo)
+                return self._AddGvPort(portType, c4d.DescID(c4d.DescLevel(parameterID)))
         else:
-            if self.__DoUndo:
-                self._GvNode.GetNodeMaster().AddUndo()
-            return self._GvNode.AddPort(portType, parameterID, message=True)
+            Transaction.AddUndo(self._GvNode.GetNodeMaster(), self.__DoUndo)
+            return self._AddGvPort(portType, parameterID)
 
         return False
+
+
+Profiler.Register(Node, api={'_GetGvPorts': 'GvNode.GetInPorts/GetOutPorts', '_AddGvPort': 'GvNode.AddPort',
+                             '_GetGvPortByIndex': 'GvNode.GetInPort/GetOutPort',
+                             '_GetGvPortByMainID': 'GvNode.GetInPortFirstMainID/GetOutPortFirstMainID',
+                             '_RemoveGvPort': 'GvNode.RemovePort', '_RemoveGvNode': 'GvNode.Remove',
+                             '_ConnectGvPorts': 'GvPort.Connect', '_DisconnectGvPort': 'GvPort.Remove'})
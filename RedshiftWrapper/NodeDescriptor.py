@@ -0,0 +1,125 @@
+import c4d
+
+
+class NodeDescriptor(object):
+    """Parameter and port layout shared by all nodes of the same type.
+    Every RSMathAdd or TextureSampler have the same description, so it's read once and then used for all of them.
+
+    :member _descriptors: (dict) Node type => :class:`.NodeDescriptor`, shared by all nodes.
+    :member _nodeType: (Int or Str) The node type this descriptor is for.
+    :member _parameters: (dict) Parameter identifier or name => c4d.DescID.
+    :member _ports: (dict) (GV_PORT_INPUT or GV_PORT_OUTPUT, port name) => GvPort main ID.
+    :member _defaults: (list) (c4d.DescID, default value or None if unknown) for each parameter, in description order.
+    """
+    _descriptors = dict()
+
+    def __init__(self, nodeType):
+        """Initialization of the descriptor
+
+        :param nodeType: Int (a Cinema 4D Node) or a Redshift Node member loot at :class:`MetaclassName`.
+        :type nodeType: Int or Str
+        """
+        self._nodeType = nodeType
+        self._parameters = dict()
+        self._ports = dict()
+        self._defaults = list()
+
+    @classmethod
+    def Get(cls, gvNode, nodeType):
+        """Get the descriptor of a node type, read it from gvNode if it's the first node of this type.
+
+        :param gvNode: A GvNode of type nodeType.
+        :type gvNode: c4d.modules.graphview.GvNode
+        :param nodeType: Int (a Cinema 4D Node) or a Redshift Node member loot at :class:`MetaclassName`.
+        :type nodeType: Int or Str
+        :return: The descriptor shared by all nodes of nodeType.
+        :rtype: :class:`.NodeDescriptor`
+        """
+        descriptor = cls._descriptors.get(nodeType)
+        if descriptor is None:
+            descriptor = cls(nodeType)
+            descriptor._ReadDescription(gvNode)
+            cls._descriptors[nodeType] = descriptor
+        return descriptor
+
+    @classmethod
+    def Clear(cls):
+        """Forget all descriptors, they will be read again on next use (e.g after a Redshift update)."""
+        cls._descriptors.clear()
+
+    def _ReadDescription(self, gvNode):
+        """Fill parameters and ports from the description of gvNode.
+
+        :param gvNode: A GvNode of type self._nodeType.
+        :type gvNode: c4d.modules.graphview.GvNode
+        """
+        description = gvNode.GetDescription(c4d.DESCFLAGS_DESC_0)
+        if not description:
+            return
+
+        for bc, paramId, groupId in description:
+            if paramId.GetDepth() < 1:
+                continue
+
+            self._defaults.append((paramId, bc.GetData(c4d.DESC_DEFAULT)))
+
+            identifier = bc.GetString(c4d.DESC_IDENT)
+            name = bc.GetString(c4d.DESC_NAME)
+            if identifier:
+                self._parameters.setdefault(identifier, paramId)
+            if name:
+                self._parameters.setdefault(name, paramId)
+
+                # An exposed parameter get a port named like the parameter and with its ID as main ID
+                self._ports.setdefault((c4d.GV_PORT_INPUT, name), paramId[0].id)
+                self._ports.setdefault((c4d.GV_PORT_OUTPUT, name), paramId[0].id)
+
+    def GetNodeType(self):
+        """Get the node type this descriptor is for.
+
+        :return: Int (a Cinema 4D Node) or a Redshift Node member loot at :class:`MetaclassName`.
+        :rtype: Int or Str
+        """
+        return self._nodeType
+
+    def GetParameterID(self, name):
+        """Get the DescID of a parameter from its identifier (e.g REDSHIFT_SHADER_MATERIAL_DIFFUSE_WEIGHT) or its name.
+
+        :param name: Identifier or name of the parameter.
+        :type name: str
+        :return: DescID of the parameter or None if not found.
+        :rtype: c4d.DescID or None
+        """
+        return self._parameters.get(name)
+
+    def GetParameters(self):
+        """Get all parameters of the node type with their default value.
+
+        :return: (c4d.DescID, default value or None if unknown) for each parameter, in description order.
+        :rtype: List of tuple
+        """
+        return list(self._defaults)
+
+    def GetPortID(self, name, portType):
+        """Get the main ID of a port from its name.
+
+        :param name: Name of the port.
+        :type name: str
+        :param portType: GV_PORT_INPUT or GV_PORT_OUTPUT.
+        :type portType: int
+        :return: Main ID of the port or None if not known.
+        :rtype: int or None
+        """
+        return self._ports.get((portType, name))
+
+    def SetPortID(self, name, portType, mainID):
+        """Store the main ID of a port found on a node of this type.
+
+        :param name: Name of the port.
+        :type name: str
+        :param portType: GV_PORT_INPUT or GV_PORT_OUTPUT.
+        :type portType: int
+        :param mainID: Main ID of the port.
+        :type mainID: int
+        """
+        self._ports[(portType, name)] = mainID
@@ -0,0 +1,134 @@
+import c4d
+
+from .Node import Node
+
+
+class NodeSnapshot(object):
+    """State of existing nodes recorded before they are changed, to put them back if the change fail.
+    Undo is only for the user, so code that roll back a failed change (:meth:`.Redshift.BuildGraph`, :class:`.CommandQueue`)
+    removes the nodes it created and restores the existing nodes it changed with a snapshot.
+
+    Name, color, exposed ports and the given parameters of each added node are recorded. Connections of the whole material
+    are recorded when the first node is added, connections from or to an added node are restored.
+    Removed nodes can't be restored.
+
+    Example::
+
+        snapshot = NodeSnapshot(rs)
+        snapshot.Add(node, [descID])
+        try:
+            node[descID] = value
+            ...
+        except Exception:
+            snapshot.Restore()
+            raise
+
+    :member _rs: (:class:`.Redshift`) The wrapper set on the material of the nodes.
+    :member _states: (dict) Node => (name, color, {parameter key: (DescID, value)}, {port type: main IDs of its ports}).
+    :member _connections: (set) (source Node, source main ID, destination Node, destination main ID) when the first node was added, None before.
+    """
+
+    def __init__(self, rs):
+        """Initialization of the snapshot
+
+        :param rs: The wrapper, set on the material of the nodes when :meth:`.Add` and :meth:`.Restore` are called.
+        :type rs: :class:`.Redshift`
+        """
+        self._rs = rs
+        self._states = dict()
+        self._connections = None
+
+    def __len__(self):
+        return len(self._states)
+
+    def _GetConnections(self):
+        """Get all connections of the material.
+
+        :return: (source Node, source main ID, destination Node, destination main ID) for each connection.
+        :rtype: set of tuple
+        """
+        nodes = list(self._rs.IterNodes())
+        return set((srcNode, gvPortSrc.GetMainID(), destNode, gvPortDest.GetMainID())
+                   for srcNode, gvPortSrc, destNode, gvPortDest in self._rs._GetConnections(nodes))
+
+    def Add(self, node, descIDs=()):
+        """Record a node before it's changed, can be called again for the same node with other parameters.
+        What is already recorded for the node is kept.
+
+        :param node: The node that is going to be changed.
+        :type node: :class:`.Node`
+        :param descIDs: DescID of the parameters that are going to be changed.
+        :type descIDs: list of c4d.DescID
+        """
+        if self._connections is None:
+            self._connections = self._GetConnections()
+
+        state = self._states.get(node)
+        if state is None:
+            ports = dict((portType, [gvPort.GetMainID() for gvPort in node._GetGvPorts(portType)])
+                         for portType in (c4d.GV_PORT_INPUT, c4d.GV_PORT_OUTPUT))
+            state = self._states[node] = (node.GetName(), node.GetColor(), dict(), ports)
+
+        params = state[2]
+        for descID in descIDs:
+            key = self._rs._GetParamKey(descID)
+            if key in params:
+                continue
+            try:
+                params[key] = (descID, node[descID])
+            except (AttributeError, TypeError):
+                continue
+
+    def Restore(self):
+        """Put back the recorded nodes as they were when they were added. Nodes created since should be removed before.
+
+        :return: Number of nodes restored.
+        :rtype: int
+        """
+        if self._connections is None:
+            return 0
+
+        restored = 0
+        for node, (name, color, params, ports) in self._states.items():
+            if not node.IsAlive():
+                continue
+
+            if node.GetName() != name:
+                node.SetName(name)
+            if node.GetColor() != color:
+                node.SetColor(color)
+            for descID, value in params.values():
+                node[descID] = value
+
+            # Ports exposed since are removed, ports removed since are exposed again
+            for portType, mainIDs in ports.items():
+                missing = list(mainIDs)
+                for gvPort in node._GetGvPorts(portType):
+                    if gvPort.GetMainID() in missing:
+                        missing.remove(gvPort.GetMainID())
+                    else:
+                        node._RemoveGvPort(gvPort)
+                for mainID in missing:
+                    node._AddGvPort(portType, c4d.DescID(c4d.DescLevel(mainID)))
+            restored += 1
+
+        # Then connections from or to recorded nodes
+        current = self._GetConnections()
+        for srcNode, srcID, destNode, destID in current - self._connections:
+            if srcNode in self._states or destNode in self._states:
+                gvPortDest = destNode.GetPortByMainID(destID, c4d.GV_PORT_INPUT)
+                if gvPortDest is not None:
+                    Node._DisconnectGvPort(gvPortDest)
+
+        for srcNode, srcID, destNode, destID in self._connections - current:
+            if srcNode not in self._states and destNode not in self._states:
+                continue
+            if not srcNode.IsAlive() or not destNode.IsAlive():
+                continue
+            gvPortSrc = srcNode.GetPortByMainID(srcID, c4d.GV_PORT_OUTPUT)
+            gvPortDest = destNode.GetPortByMainID(destID, c4d.GV_PORT_INPUT)
+            if gvPortSrc is not None and gvPortDest is not None:
+                Node._ConnectGvPorts(gvPortSrc, gvPortDest)
+
+        self._rs._nodeIndex = None
+        return restored
@@ -0,0 +1,356 @@
+import json
+import c4d
+
+from .Node import Node
+from .MetaName import MetaName
+from .Transaction import Transaction
+from .TextureInventory import GetTexturePathID
+
+
+def _Apply(fn, *values):
+    """Apply fn on float values, or on each component if one of them is a c4d.Vector."""
+    if not any(isinstance(value, c4d.Vector) for value in values):
+        return float(fn(*values))
+
+    vectors = [value if isinstance(value, c4d.Vector) else c4d.Vector(value) for value in values]
+    return c4d.Vector(fn(*[vector.x for vector in vectors]),
+                      fn(*[vector.y for vector in vectors]),
+                      fn(*[vector.z for vector in vectors]))
+
+
+def _Div(a, b):
+    return a / b
+
+
+def _Rcp(a):
+    return 1.0 / a
+
+
+def _Saturate(a):
+    return min(max(a, 0.0), 1.0)
+
+
+# Metaclass name => (suffix of the c4d.REDSHIFT_SHADER_<METACLASS>_<SUFFIX> operand parameters, function)
+FOLDABLE_NODES = {
+    MetaName.MathAdd: (('INPUT1', 'INPUT2'), lambda a, b: a + b),
+    MetaName.MathSub: (('INPUT1', 'INPUT2'), lambda a, b: a - b),
+    MetaName.MathMul: (('INPUT1', 'INPUT2'), lambda a, b: a * b),
+    MetaName.MathDiv: (('INPUT1', 'INPUT2'), _Div),
+    MetaName.MathMin: (('INPUT1', 'INPUT2'), min),
+    MetaName.MathMax: (('INPUT1', 'INPUT2'), max),
+    MetaName.MathAbs: (('INPUT',), abs),
+    MetaName.MathNeg: (('INPUT',), lambda a: -a),
+    MetaName.MathRcp: (('INPUT',), _Rcp),
+    MetaName.MathSaturate: (('INPUT',), _Saturate),
+    MetaName.MathAddVector: (('INPUT1', 'INPUT2'), lambda a, b: a + b),
+    MetaName.MathSubVector: (('INPUT1', 'INPUT2'), lambda a, b: a - b),
+    MetaName.MathMulVector: (('INPUT1', 'INPUT2'), lambda a, b: a * b),
+    MetaName.MathDivVector: (('INPUT1', 'INPUT2'), _Div),
+    MetaName.MathMinVector: (('INPUT1', 'INPUT2'), min),
+    MetaName.MathMaxVector: (('INPUT1', 'INPUT2'), max),
+    MetaName.MathAbsVector: (('INPUT',), abs),
+    MetaName.MathNegVector: (('INPUT',), lambda a: -a),
+    MetaName.MathRcpVector: (('INPUT',), _Rcp),
+    MetaName.MathSaturateVector: (('INPUT',), _Saturate),
+    MetaName.ColorAbsColor: (('INPUT',), abs),
+    MetaName.ColorInvColor: (('INPUT',), lambda a: 1.0 - a),
+    MetaName.ColorSubColor: (('INPUT1', 'INPUT2'), lambda a, b: a - b),
+    MetaName.ColorSaturateColor: (('INPUT',), _Saturate),
+}
+
+
+class GraphOptimizer(object):
+    """Static optimizations of the graph of a material, to reduce the work of the renderer:
+
+    - Constant folding: math and color nodes (:data:`FOLDABLE_NODES`) fed only by constants (unconnected operands,
+      Xpresso constant nodes or other folded nodes) are computed once, their value is written in the inputs they were connected to and they are removed.
+    - Duplicate merging: nodes with the same type, parameters, exposed ports and inputs (e.g two TextureSampler on the same file)
+      are merged, consumers of the duplicates are connected to the one that is kept.
+
+    Use :meth:`.Redshift.Optimize` rather than this class directly.
+
+    :member _rs: (:class:`.Redshift`) The wrapper set on the material to optimize.
+    """
+
+    def __init__(self, rs):
+        """Initialization of the optimizer
+
+        :param rs: The wrapper set on the material to optimize.
+        :type rs: :class:`.Redshift`
+        """
+        self._rs = rs
+
+    @staticmethod
+    def _IsValue(value):
+        """Check if value can be folded.
+
+        :return: True for float, int (not bool) and c4d.Vector.
+        :rtype: Bool
+        """
+        return isinstance(value, (float, c4d.Vector)) or (isinstance(value, int) and not isinstance(value, bool))
+
+    def _GetOperands(self, node):
+        """Get the parameter IDs of the operands of a foldable node.
+
+        :param node: The node.
+        :type node: :class:`.Node`
+        :return: (parameter IDs, function) or None if the node can't be folded.
+        :rtype: tuple or None
+        """
+        foldable = FOLDABLE_NODES.get(node.GetType())
+        if foldable is None:
+            return None
+
+        suffixes, fn = foldable
+        paramIDs = list()
+        for suffix in suffixes:
+            paramID = getattr(c4d, 'REDSHIFT_SHADER_{0}_{1}'.format(node.GetType().upper(), suffix), None)
+            if paramID is None:
+                return None
+            paramIDs.append(paramID)
+        return paramIDs, fn
+
+    def PlanFolding(self):
+        """Find what constant folding would change.
+
+        :return: (folded Node => value, list of (folded Node, consumer Node, consumer GvPort) to write, Nodes to remove)
+        :rtype: tuple
+        """
+        rs = self._rs
+        try:
+            order = rs.TopologicalOrder()
+        except ValueError:
+            return dict(), list(), list()
+
+        connections = rs._GetConnections(order)
+        incoming = dict((node, list()) for node in order)
+        outgoing = dict((node, list()) for node in order)
+        for connection in connections:
+            incoming[connection[2]].append(connection)
+            outgoing[connection[0]].append(connection)
+
+        # Value of each constant or folded node, in topological order so producers are computed first
+        constants = dict()
+        values = dict()
+        for node in order:
+            if not outgoing[node] or len(node._GetGvPorts(c4d.GV_PORT_OUTPUT)) != 1:
+                continue
+
+            if node.GetType() == c4d.ID_OPERATOR_CONST:
+                value = node[c4d.GV_CONST_VALUE]
+                if self._IsValue(value):
+                    constants[node] = value
+                continue
+
+            operands = self._GetOperands(node)
+            if operands is None:
+                continue
+            paramIDs, fn = operands
+
+            feeds = dict()
+            for srcNode, gvPortSrc, destNode, gvPortDest in incoming[node]:
+                feeds[gvPortDest.GetMainID()] = srcNode
+            if any(mainID not in paramIDs for mainID in feeds):
+                continue
+
+            arguments = list()
+            for paramID in paramIDs:
+                srcNode = feeds.get(paramID)
+                if srcNode is None:
+                    arguments.append(node[c4d.DescID(c4d.DescLevel(paramID))])
+                elif srcNode in values:
+                    arguments.append(values[srcNode])
+                elif srcNode in constants:
+                    arguments.append(constants[srcNode])
+                else:
+                    arguments = None
+                    break
+
+            if arguments is None or not all(self._IsValue(argument) for argument in arguments):
+                continue
+
+            try:
+                values[node] = _Apply(fn, *arguments)
+            except (ArithmeticError, ValueError):
+                continue
+
+        # Folded nodes are removed only if the value can be written in all inputs they feed that are not folded
+        writes = list()
+        removed = set()
+        for node in reversed(order):
+            if node not in values and node not in constants:
+                continue
+
+            nodeWrites = list()
+            removable = True
+            for srcNode, gvPortSrc, destNode, gvPortDest in outgoing[node]:
+                if destNode in removed:
+                    continue
+                if node in constants:
+                    removable = False
+                    break
+
+                current = destNode[c4d.DescID(c4d.DescLevel(gvPortDest.GetMainID()))]
+                if isinstance(current, c4d.Vector) != isinstance(values[node], c4d.Vector) or not self._IsValue(current):
+                    removable = False
+                    break
+                nodeWrites.append((node, destNode, gvPortDest))
+
+            if removable:
+                removed.add(node)
+                writes.extend(nodeWrites)
+
+        for node in list(values):
+            if node not in removed:
+                del values[node]
+
+        return values, writes, [node for node in order if node in removed]
+
+    def _GetSignature(self, node, incoming, survivors):
+        """Get what make two nodes identical.
+
+        :param node: The node.
+        :type node: :class:`.Node`
+        :param incoming: Node => connections to its inputs.
+        :type incoming: dict
+        :param survivors: Node => Node it's merged with.
+        :type survivors: dict
+        :return: The signature, a JSON str. None if a parameter can't be compared, then the node is never merged.
+        :rtype: str or None
+        """
+        inputs = list()
+        for srcNode, gvPortSrc, destNode, gvPortDest in incoming[node]:
+            srcNode = survivors.get(srcNode, srcNode)
+            inputs.append([gvPortDest.GetMainID(), id(srcNode), gvPortSrc.GetMainID()])
+
+        # Texture paths are sub-channels, they are part of the parameters
+        try:
+            params = self._rs._GetNodeParams(node, strict=True)
+        except TypeError:
+            return None
+
+        return json.dumps([node.GetType(), params,
+                           sorted(gvPort.GetMainID() for gvPort in node._GetGvPorts(c4d.GV_PORT_INPUT)),
+                           sorted(gvPort.GetMainID() for gvPort in node._GetGvPorts(c4d.GV_PORT_OUTPUT)),
+                           sorted(inputs)], sort_keys=True)
+
+    @staticmethod
+    def _GetFiles(node):
+        """Get the file paths of a TextureSampler node.
+
+        :param node: The node.
+        :type node: :class:`.Node`
+        :return: Path of each texture of the sampler (None if it can't be read), empty for other nodes.
+        :rtype: list
+        """
+        paths = list()
+        if node.GetType() != MetaName.TexSampler:
+            return paths
+
+        for index in range(4):
+            pathID = GetTexturePathID(index)
+            if pathID is None:
+                break
+            try:
+                paths.append(node[pathID])
+            except (AttributeError, TypeError):
+                paths.append(None)
+        return paths
+
+    def PlanMerges(self, ignored=()):
+        """Find nodes that are identical to a previous one (in topological order).
+
+        :param ignored: Nodes to not merge and to not merge with (e.g because they are going to be folded).
+        :type ignored: list or set
+        :return: (duplicate Node, Node it's merged with) for each duplicate, in topological order.
+        :rtype: List of tuple
+        """
+        rs = self._rs
+        try:
+            order = rs.TopologicalOrder()
+        except ValueError:
+            return list()
+
+        ignored = set(ignored)
+        incoming = dict((node, list()) for node in order)
+        for connection in rs._GetConnections(order):
+            incoming[connection[2]].append(connection)
+
+        survivors = dict()
+        merges = list()
+        nodesBySignature = dict()
+        for node in order:
+            if node in ignored or node.GetType() == rs.Output or node.GetNode().GetDown():
+                continue
+
+            signature = self._GetSignature(node, incoming, survivors)
+            if signature is None:
+                continue
+            survivor = nodesBySignature.get(signature)
+            if survivor is None:
+                nodesBySignature[signature] = node
+                continue
+
+            # Nodes using different files are never merged, whatever the signature says
+            if self._GetFiles(node) != self._GetFiles(survivor):
+                continue
+
+            survivors[node] = survivor
+            merges.append((node, survivor))
+        return merges
+
+    @staticmethod
+    def _Describe(node):
+        """Get a JSON compatible description of a node for reports."""
+        return {'name': node.GetName(), 'type': node.GetType()}
+
+    def Optimize(self, dryRun=False, fold=True, merge=True):
+        """Optimize the graph of the material, with one undo.
+
+        :param dryRun: True to only report what would change. Merges reported by a dry run ignore changes done by folding.
+        :type dryRun: Bool
+        :param fold: True to fold constant nodes.
+        :type fold: Bool
+        :param merge: True to merge duplicate nodes.
+        :type merge: Bool
+        :return: One dict per change with the key action ("fold", "remove" or "merge") and details.
+        :rtype: List of dict
+        """
+        rs = self._rs
+        report = list()
+
+        with Transaction(rs.doUndo):
+            folded = list()
+            if fold:
+                values, writes, removed = self.PlanFolding()
+                folded = removed
+                for node, destNode, gvPortDest in writes:
+                    value = values[node]
+                    report.append({'action': 'fold', 'node': self._Describe(node), 'into': self._Describe(destNode),
+                                   'parameter': gvPortDest.GetMainID(), 'value': rs._SerializeValue(value)})
+                    if not dryRun:
+                        Transaction.AddUndo(destNode.GetNode().GetNodeMaster(), rs.doUndo)
+                        Node._DisconnectGvPort(gvPortDest)
+                        destNode[c4d.DescID(c4d.DescLevel(gvPortDest.GetMainID()))] = value
+
+                for node in removed:
+                    report.append({'action': 'remove', 'node': self._Describe(node)})
+                    if not dryRun:
+                        rs.RemoveShader(node)
+
+            if merge:
+                for node, survivor in self.PlanMerges(folded if dryRun else ()):
+                    report.append({'action': 'merge', 'node': self._Describe(node), 'into': self._Describe(survivor)})
+                    if dryRun:
+                        continue
+
+                    # Connect consumers of the duplicate to the same output of the survivor
+                    for gvPortSrc in node._GetGvPorts(c4d.GV_PORT_OUTPUT):
+                        gvPortSurvivor = survivor.GetPortByMainID(gvPortSrc.GetMainID(), c4d.GV_PORT_OUTPUT)
+                        for gvPortDest in gvPortSrc.GetDestination():
+                            Transaction.AddUndo(rs._gvMaster, rs.doUndo)
+                            Node._DisconnectGvPort(gvPortDest)
+                            Node._ConnectGvPorts(gvPortSurvivor, gvPortDest)
+                    rs.RemoveShader(node)
+
+        return report
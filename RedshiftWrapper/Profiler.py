@@ -0,0 +1,199 @@
+import json
+import time
+import inspect
+import functools
+
+
+class Profiler(object):
+    """Opt-in profiling of the wrapper, count calls and measure total and max time of each public method,
+    and count calls made to the Cinema 4D API (GvNodeMaster.CreateNode, GvNodeMaster.AddUndo, GvNode.AddPort, GvNode.RemovePort, GvNode.Remove, GvPort.Connect, GvPort.Remove, ...).
+
+    Methods are only replaced by timed ones while profiling is enabled, so there is no cost when it's disabled.
+
+    Example::
+
+        Profiler.Enable()
+        rs.BuildGraph(spec)
+        print(Profiler.ToJson(indent=4))
+        Profiler.Disable()
+
+    :member _classes: (list) (class, private methods to time, private method => Cinema 4D call counted, excluded methods) registered by :meth:`.Register`.
+    :member _enabled: (Bool) True if profiling is enabled.
+    :member _originals: (list) (class, method name, original attribute) replaced while profiling is enabled.
+    :member _stats: (dict) Stat name => [calls, total time, max time].
+    """
+    _classes = list()
+    _enabled = False
+    _originals = list()
+    _stats = dict()
+
+    @classmethod
+    def Register(cls, target, methods=(), api=None, exclude=()):
+        """Register a class whose methods are profiled while profiling is enabled.
+        All public methods defined in the class are timed under "Class.Method".
+
+        :param target: The class to profile.
+        :type target: class
+        :param methods: Private methods to time too.
+        :type methods: tuple of str
+        :param api: Private method => name of the Cinema 4D call it does (e.g "GvNodeMaster.CreateNode"), counted under this name.
+        :type api: dict or None
+        :param exclude: Public methods to not time.
+        :type exclude: tuple of str
+        """
+        entry = (target, tuple(methods), dict(api or dict()), tuple(exclude))
+        cls._classes.append(entry)
+        if cls._enabled:
+            cls._Patch(*entry)
+
+    @classmethod
+    def Enable(cls):
+        """Enable profiling, stats are kept from previous profiling until :meth:`.Reset`."""
+        if cls._enabled:
+            return
+
+        cls._enabled = True
+        for entry in cls._classes:
+            cls._Patch(*entry)
+
+    @classmethod
+    def Disable(cls):
+        """Disable profiling and put back original methods, stats are kept."""
+        if not cls._enabled:
+            return
+
+        cls._enabled = False
+        for target, name, original in reversed(cls._originals):
+            setattr(target, name, original)
+        del cls._originals[:]
+
+    @classmethod
+    def IsEnabled(cls):
+        """Check if profiling is enabled.
+
+        :return: True if profiling is enabled otherwise False.
+        :rtype: Bool
+        """
+        return cls._enabled
+
+    @classmethod
+    def Reset(cls):
+        """Remove all stats."""
+        cls._stats.clear()
+
+    @classmethod
+    def GetStats(cls):
+        """Get the stats recorded since the last :meth:`.Reset`.
+
+        :return: {"methods": {name: stat}, "api": {name: stat}} where stat is {"calls": int, "total": seconds, "max": seconds}.
+        :rtype: dict
+        """
+        stats = {'methods': dict(), 'api': dict()}
+        for name, (calls, total, maximum) in cls._stats.items():
+            kind, name = name.split(':', 1)
+            stats[kind][name] = {'calls': calls, 'total': total, 'max': maximum}
+        return stats
+
+    @classmethod
+    def ToJson(cls, indent=None):
+        """Get the stats as JSON, see :meth:`.GetStats`.
+
+        :param indent: Indent given to json.dumps.
+        :type indent: int or None
+        :return: The stats as JSON.
+        :rtype: str
+        """
+        return json.dumps(cls.GetStats(), indent=indent, sort_keys=True)
+
+    @classmethod
+    def _Record(cls, name, elapsed):
+        """Add a call to a stat.
+
+        :param name: Name of the stat, "methods:..." or "api:...".
+        :type name: str
+        :param elapsed: Time of the call in seconds.
+        :type elapsed: float
+        """
+        stat = cls._stats.get(name)
+        if stat is None:
+            stat = cls._stats[name] = [0, 0.0, 0.0]
+        stat[0] += 1
+        stat[1] += elapsed
+        if elapsed > stat[2]:
+            stat[2] = elapsed
+
+    @classmethod
+    def _Patch(cls, target, methods, api, exclude):
+        """Replace the methods of target by timed ones.
+
+        :param target: The class to profile.
+        :type target: class
+        :param methods: Private methods to time too.
+        :type methods: tuple of str
+        :param api: Private method => name of the Cinema 4D call it does.
+        :type api: dict
+        :param exclude: Public methods to not time.
+        :type exclude: tuple of str
+        """
+        for name, attribute in list(vars(target).items()):
+            if name in api:
+                statName = 'api:' + api[name]
+            elif (name.startswith('_') and name not in methods) or name in exclude:
+                continue
+            else:
+                statName = 'methods:{0}.{1}'.format(target.__name__, name)
+
+            if isinstance(attribute, staticmethod):
+                timed = staticmethod(cls._Timed(attribute.__func__, statName))
+            elif isinstance(attribute, classmethod):
+                timed = classmethod(cls._Timed(attribute.__func__, statName))
+            elif inspect.isfunction(attribute):
+                timed = cls._Timed(attribute, statName)
+            else:
+                continue
+
+            cls._originals.append((target, name, attribute))
+            setattr(target, name, timed)
+
+    @classmethod
+    def _Timed(cls, func, statName):
+        """Get a function that record its calls under statName. For a generator, time spent in the generator is recorded when it ends.
+
+        :param func: The function to time.
+        :type func: function
+        :param statName: Name of the stat.
+        :type statName: str
+        :return: The timed function.
+        :rtype: function
+        """
+        record = cls._Record
+        clock = time.perf_counter
+
+        if inspect.isgeneratorfunction(func):
+            @functools.wraps(func)
+            def timedGenerator(*args, **kwargs):
+                elapsed = 0.0
+                generator = func(*args, **kwargs)
+                try:
+                    while True:
+                        start = clock()
+                        try:
+                            item = next(generator)
+                        except StopIteration:
+                            elapsed += clock() - start
+                            return
+                        elapsed += clock() - start
+                        yield item
+                finally:
+                    generator.close()
+                    record(statName, elapsed)
+            return timedGenerator
+
+        @functools.wraps(func)
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(statName, clock() - start)
+        return timed
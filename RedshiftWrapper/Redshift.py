@@ -2,20 +2,34 @@
 #                   Import
 # ==============================================
 import os
-import sys
+import json
+import time
+import hashlib
+import logging
 import c4d
 
-try:
-    import redshift
-except:
-    pass
-
-if os.path.dirname(__file__) not in sys.path:
-    sys.path.append(os.path.dirname(__file__))
-
-from ImportTester import ImportTester
-from Node import Node
-from MetaName import MetaName
+from .ImportTester import ImportTester
+from .Node import Node
+from .NodeSnapshot import NodeSnapshot
+from .MetaName import MetaName
+from .Transaction import Transaction
+from .Serializer import GraphWriter
+from .Profiler import Profiler
+from .Optimizer import GraphOptimizer
+from .GraphDiff import GraphDiff
+from .LibrarySync import LibrarySync
+from .TextureInventory import TextureInventory, GetTexturePathID
+
+logger = logging.getLogger(__name__)
+
+# Sub-channels of Redshift file parameters (e.g Tex0 of a TextureSampler) => default value, None if unknown.
+# The file parameter itself can't be read from Python, only these sub-channels through a DescID of two levels.
+FILE_CHANNELS = (('REDSHIFT_FILE_PATH', ''), ('REDSHIFT_FILE_LAYER', 0), ('REDSHIFT_FILE_COLORSPACE', None))
+
+# Graph hashing, number of times the label of a node in a cycle is refined from its neighbours,
+# and number of node matches tried per node and connection before two graphs are reported different.
+GRAPH_CYCLE_ROUNDS = 3
+GRAPH_MATCH_ATTEMPTS = 8
 
 # ==============================================
 #                   Import
@@ -32,16 +46,59 @@ class Redshift(MetaName, metaclass=ImportTester):
         :member doUndo: (Bool) True if the wrapper have to call GvMaster.AddUndo() before any change otherwise False.
         :member _mat: (c4d.BaseMaterial) The redshift material we act on.
         :member _gvMaster: (c4d.modules.graphview.GvNodeMaster) The Node master of self.mat.
-        :member _gvMaster: (c4d.modules.graphview.GvNodeMaster) The Node master of self.mat.
+        :member _nodeIndex: (tuple) Cached (checksum, nodes, nodes by type, nodes by name) of self.mat, see :meth:`._GetNodeIndex`.
+        :member _templates: (dict) Template name => material registered by :meth:`.RegisterTemplate`, shared by all wrappers.
+        :member _matPrototypes: (dict) Material type => material cloned by :meth:`.CreateMaterials`, shared by all wrappers.
     """
     doUndo = True
     _mat = None
     _gvMaster = None
+    _nodeIndex = None
+    _templates = dict()
+    _matPrototypes = dict()
 
     @staticmethod
     def RedhisftIsInstalled():
         return ImportTester._CheckImport("redshift")
 
+    @staticmethod
+    def EnableProfiling(enable=True):
+        """Enable or disable the profiling of the wrapper, see :class:`.Profiler`.
+
+        :param enable: True to enable profiling, False to disable it.
+        :type enable: Bool
+        """
+        if enable:
+            Profiler.Enable()
+        else:
+            Profiler.Disable()
+
+    @staticmethod
+    def GetProfilingStats(asJson=False, reset=False):
+        """Get the stats recorded while profiling was enabled, see :meth:`.Profiler.GetStats`.
+
+        :param asJson: True to get the stats as a JSON str.
+        :type asJson: Bool
+        :param reset: True to remove all stats after getting them.
+        :type reset: Bool
+        :return: The stats.
+        :rtype: dict or str
+        """
+        stats = Profiler.ToJson() if asJson else Profiler.GetStats()
+        if reset:
+            Profiler.Reset()
+        return stats
+
+    def Transaction(self, eventAdd=True):
+        """Get a :class:`.Transaction` to group many edits under one undo per GvNodeMaster and one c4d.EventAdd().
+
+        :param eventAdd: True to call c4d.EventAdd() on exit if something was changed.
+        :type eventAdd: Bool
+        :return: The transaction to use in a with statement.
+        :rtype: :class:`.Transaction`
+        """
+        return Transaction(self.doUndo, eventAdd)
+
     def SetMat(self, mat):
         """Set the mat to act on.
 
@@ -49,12 +106,25 @@ class Redshift(MetaName, metaclass=ImportTester):
         :type mat: c4d.BaseMaterial.
         :raises: TypeError
         """
-        global redshift
+        redshift = ImportTester.GetModule("redshift")
         if not isinstance(mat, c4d.BaseMaterial):
             raise TypeError('material is not a c4d.BaseMaterial')
         if not mat.IsInstanceOf(redshift.Mrsmaterial):
             raise TypeError('material is not a redshift material')
 
+        self._BindMat(mat)
+
+    def _BindMat(self, mat):
+        """Set the mat to act on without checking its type, mat should be a Redshift Material.
+
+        :param mat: The material to act on.
+        :type mat: c4d.BaseMaterial.
+        :raises: TypeError
+        """
+        redshift = ImportTester.GetModule("redshift")
+        if self._mat is None or self._mat != mat:
+            self._nodeIndex = None
+
         self._mat = mat
         self._gvMaster = redshift.GetRSMaterialNodeMaster(mat)
         if not self._gvMaster:
@@ -63,7 +133,7 @@ class Redshift(MetaName, metaclass=ImportTester):
     def _CheckMatIsValid(self):
         """Check if :member:`._self.mat` is currently set and valid
         """
-        global redshift
+        redshift = ImportTester.GetModule("redshift")
         if self._mat is None:
             raise TypeError('Mat is not define')
         if not isinstance(self._mat, c4d.BaseMaterial):
@@ -71,6 +141,50 @@ class Redshift(MetaName, metaclass=ImportTester):
         if not self._mat.IsInstanceOf(redshift.Mrsmaterial):
             raise TypeError('material is not a redshift material')
 
+    def _WalkGvNodes(self, gvNode, depth=None):
+        """Iterate over gvNode, its next siblings and all their children without recursion.
+        Nodes are returned in the same order than GetAllNodes (a node, then its children, then its next sibling).
+
+        :param gvNode: The first GvNode to walk from.
+        :type gvNode: c4d.modules.graphview.GvNode
+        :param depth: Maximum number of group levels to descend into, None for no limit.
+        :type depth: int or None
+        :return: Generator of (GvNode, level) where level is the number of groups between gvNode and the returned GvNode.
+        :rtype: Generator of tuple
+        """
+        stack = [(gvNode, 0)]
+        while stack:
+            gvNode, level = stack.pop()
+            if not gvNode:
+                continue
+
+            yield gvNode, level
+
+            # Sibling is pushed first so children are processed before it
+            stack.append((gvNode.GetNext(), level))
+            if depth is None or level < depth:
+                stack.append((gvNode.GetDown(), level + 1))
+
+    def IterNodes(self, predicate=None, depth=None):
+        """Lazily iterate over all nodes inside the material, the Shader Group that hold all other Node is skipped.
+
+        :param predicate: Function called with each :class:`.Node`, only Node where it returns True are yielded. None to yield all Nodes.
+        :type predicate: function or None
+        :param depth: Maximum number of group levels to descend into, 0 only yields Nodes directly inside the Shader Group. None for no limit.
+        :type depth: int or None
+        :return: Generator of Nodes inside the material.
+        :rtype: Generator of :class:`.Node`
+        """
+        self._CheckMatIsValid()
+
+        if depth is not None and not isinstance(depth, int):
+            raise TypeError('depth is not valid type')
+
+        for gvNode, level in self._WalkGvNodes(self._gvMaster.GetRoot().GetDown(), depth):
+            node = Node(gvNode, self.doUndo)
+            if predicate is None or predicate(node):
+                yield node
+
     def GetAllNodes(self, removeMasterGroup=True, gvNode=None, nodeList=None):
         """Get all nodes inside the material. 
         Use redshift.GatAllNodes(), only removeMasterGroup is needed other parameters are for internal use.
@@ -86,15 +200,99 @@ class Redshift(MetaName, metaclass=ImportTester):
             nodeList = list()
             gvNode = self._gvMaster.GetRoot()
 
-        while gvNode:
-            nodeList.append(Node(gvNode, self.doUndo))
-            self.GetAllNodes(False, gvNode.GetDown(), nodeList)
-            gvNode = gvNode.GetNext()
+        nodeList.extend(Node(gvNode, self.doUndo) for gvNode, level in self._WalkGvNodes(gvNode))
 
         if len(nodeList) > 1 and removeMasterGroup:
-            nodeList = nodeList[1:]
+            del nodeList[0]
         return nodeList
 
+    def _GetNodeIndex(self):
+        """Get the index of all nodes inside the material, rebuilt only if the material changed since the last call.
+
+        :return: (checksum, all Nodes, dict of type => Nodes, dict of name => Nodes)
+        :rtype: tuple
+        """
+        self._CheckMatIsValid()
+
+        checksum = self._mat.GetDirty(c4d.DIRTYFLAGS_ALL)
+        if self._nodeIndex is not None and self._nodeIndex[0] == checksum:
+            return self._nodeIndex
+
+        nodes = list()
+        nodesByType = dict()
+        nodesByName = dict()
+        for node in self.IterNodes():
+            nodes.append(node)
+            nodesByType.setdefault(node.GetType(), list()).append(node)
+            nodesByName.setdefault(node.GetName(), list()).append(node)
+
+        self._nodeIndex = (checksum, nodes, nodesByType, nodesByName)
+        return self._nodeIndex
+
+    def FindNodes(self, type=None, name=None):
+        """Find nodes inside the material by type and/or name.
+        Use an index of the material, only rebuilt when the material is changed.
+        Nodes are shared, their undo is set to the doUndo of this wrapper when they are returned.
+
+        :param type: Int (a Cinema 4D Node look at https://developers.maxon.net/docs/Cinema4DPythonSDK/html/types/gvnodes.html) or a Redshift Node member loot at :class:`MetaclassName`. None to not filter by type.
+        :type type: Int or Str or None
+        :param name: Name of the node. None to not filter by name.
+        :type name: Str or None
+        :return: All Nodes that match, in GetAllNodes order.
+        :rtype: List of :class:`.Node`
+        """
+        if type is not None and not isinstance(type, str) and not isinstance(type, int):
+            raise TypeError('type is not valid type')
+
+        if name is not None and not isinstance(name, str):
+            raise TypeError('name is not valid type')
+
+        checksum, nodes, nodesByType, nodesByName = self._GetNodeIndex()
+
+        if type is None and name is None:
+            found = list(nodes)
+        elif name is None:
+            found = list(nodesByType.get(type, ()))
+        elif type is None:
+            found = list(nodesByName.get(name, ()))
+        else:
+            found = [node for node in nodesByName.get(name, ()) if node.GetType() == type]
+
+        for node in found:
+            node._SetUndo(self.doUndo)
+        return found
+
+    def FindFirst(self, type=None, name=None):
+        """Find the first node inside the material matching a type and/or name, see :meth:`.FindNodes`.
+
+        :param type: Int or a Redshift Node member loot at :class:`MetaclassName`. None to not filter by type.
+        :type type: Int or Str or None
+        :param name: Name of the node. None to not filter by name.
+        :type name: Str or None
+        :return: The first Node that match or None.
+        :rtype: :class:`.Node` or None
+        """
+        nodes = self.FindNodes(type, name)
+        if not nodes:
+            return None
+        return nodes[0]
+
+    def _CreateGvNode(self, operatorID, NodeBefore, x, y):
+        """Create a GvNode in the Shader Group, only place where CreateNode is called so it can be counted by :class:`.Profiler`.
+
+        :param operatorID: The operator ID of the GvNode.
+        :type operatorID: int
+        :param NodeBefore: The GvNode to insert before or None.
+        :type NodeBefore: c4d.modules.graphview.GvNode or None
+        :param x: X position in the Xpresso windows.
+        :type x: int
+        :param y: Y position in the Xpresso windows.
+        :type y: int
+        :return: The created GvNode.
+        :rtype: c4d.modules.graphview.GvNode
+        """
+        return self._gvMaster.CreateNode(self._gvMaster.GetRoot(), operatorID, NodeBefore, x, y)
+
     def CreateShader(self, shaderType, x=-1, y=-1, NodeBefore=None):
         """Create a shader inside the material.
 
@@ -126,8 +324,7 @@ class Redshift(MetaName, metaclass=ImportTester):
 
         # Create redshift node
         if isinstance(shaderType, str):
-            if self.doUndo:
-                self._gvMaster.AddUndo()
+            Transaction.AddUndo(self._gvMaster, self.doUndo)
 
             # Check if we accept this meta class
             if not self._TestProperty(shaderType):
@@ -139,34 +336,33 @@ class Redshift(MetaName, metaclass=ImportTester):
 
             # Check if it' a C4D Baked
             if shaderType == self.UtBaker:
-                node = Node(self._gvMaster.CreateNode(self._gvMaster.GetRoot(), 1036762, NodeBefore, x, y), self.doUndo)
+                node = Node(self._CreateGvNode(1036762, NodeBefore, x, y), self.doUndo)
 
             # Check Output
             elif shaderType == self.Output:
                 # Check if there is already an output node
-                nodeList = self.GetAllNodes()
-                for node in nodeList:
-                    if node.GetType() == self.Output:
-                        return None
+                if self.FindFirst(self.Output) is not None:
+                    return None
 
-                node = Node(self._gvMaster.CreateNode(self._gvMaster.GetRoot(), 1036746, NodeBefore, x, y), self.doUndo)
+                node = Node(self._CreateGvNode(1036746, NodeBefore, x, y), self.doUndo)
 
             # Other
             else:
-                node = self._gvMaster.CreateNode(self._gvMaster.GetRoot(), 1036227, NodeBefore, x, y)
+                node = self._CreateGvNode(1036227, NodeBefore, x, y)
                 node[c4d.GV_REDSHIFT_SHADER_META_CLASSNAME] = shaderType
                 node = Node(node, self.doUndo)
 
+            self._nodeIndex = None
             if node:
                 node.SetColor()
             return node
 
         # Create c4d node
         else:
-            if self.doUndo:
-                self._gvMaster.AddUndo()
+            Transaction.AddUndo(self._gvMaster, self.doUndo)
 
-            return Node(self._gvMaster.CreateNode(self._gvMaster.GetRoot(), shaderType, NodeBefore, x, y), self.doUndo)
+            self._nodeIndex = None
+            return Node(self._CreateGvNode(shaderType, NodeBefore, x, y), self.doUndo)
 
         return None
 
@@ -184,9 +380,9 @@ class Redshift(MetaName, metaclass=ImportTester):
         if not isinstance(node, Node):
             raise TypeError('node is not valid Node Object')
 
-        if self.doUndo:
-            self._gvMaster.AddUndo()
-        return node.GetNode().Remove()
+        Transaction.AddUndo(self._gvMaster, self.doUndo)
+        self._nodeIndex = None
+        return node._RemoveGvNode()
 
     def CreateConnection(self, SrcNode, DestNode, SrcParameter=None, DestParameter=None):
         """Connect two Nodes together.
@@ -242,40 +438,221 @@ class Redshift(MetaName, metaclass=ImportTester):
         if gvNodeSrc.GetNodeMaster() != gvNodeDest.GetNodeMaster(): return False
         if gvPortDest.IsIncomingConnected(): return False
 
-        if self.doUndo:
-            self._gvMaster.AddUndo()
-        return gvPortSrc.Connect(gvPortDest)
+        Transaction.AddUndo(self._gvMaster, self.doUndo)
+        return Node._ConnectGvPorts(gvPortSrc, gvPortDest)
+
+    def CreateConnections(self, connections):
+        """Connect many Nodes together, with one check of the material and one undo.
+        Ports are searched only once per node for all connections, and all connections are checked before the first one is created:
+        connections to an input that is already connected, or that several connections use, are not created.
+
+        :param connections: (SrcNode, SrcParameter, DestNode, DestParameter) for each connection, like :meth:`.CreateConnection`.
+        :type connections: List of tuple
+        :return: (True, None) for each created connection otherwise (False, reason), in connections order.
+        :rtype: List of tuple
+        :raises: TypeError
+        """
+        self._CheckMatIsValid()
+
+        if not isinstance(connections, (list, tuple)):
+            raise TypeError('connections is not a list')
+
+        gvPorts = dict()
+
+        def GetGvPort(node, parameter, portType):
+            if isinstance(node, c4d.modules.graphview.GvPort):
+                return node
+            key = (node.GetNode(), parameter, portType)
+            if key not in gvPorts:
+                gvPorts[key] = node.SearchPort(parameter, portType)
+            return gvPorts[key]
+
+        # Check types and get ports
+        resolved = list()
+        for connection in connections:
+            if not isinstance(connection, (list, tuple)) or len(connection) != 4:
+                raise TypeError('connection is not (SrcNode, SrcParameter, DestNode, DestParameter)')
+
+            SrcNode, SrcParameter, DestNode, DestParameter = connection
+            for node, parameter in ((SrcNode, SrcParameter), (DestNode, DestParameter)):
+                if not isinstance(node, Node) and not isinstance(node, c4d.modules.graphview.GvPort):
+                    raise TypeError('node is not valid Node Object or gvPort')
+                if not isinstance(node, c4d.modules.graphview.GvPort):
+                    if not isinstance(parameter, int) and not isinstance(parameter, str):
+                        raise TypeError('parameter is not parameter or not name of a parameter')
+
+            resolved.append((GetGvPort(SrcNode, SrcParameter, c4d.GV_PORT_OUTPUT),
+                             GetGvPort(DestNode, DestParameter, c4d.GV_PORT_INPUT)))
+
+        # Check each connection and find inputs used more than once
+        results = list()
+        destCount = dict()
+        for gvPortSrc, gvPortDest in resolved:
+            error = None
+            if not gvPortSrc or not gvPortDest:
+                error = 'port not found'
+            elif gvPortSrc.GetNode().GetNodeMaster() != gvPortDest.GetNode().GetNodeMaster():
+                error = 'nodes are not in the same material'
+            elif gvPortDest.IsIncomingConnected():
+                error = 'input already connected'
+            else:
+                destKey = (gvPortDest.GetNode(), gvPortDest.GetMainID(), gvPortDest.GetSubID())
+                destCount[destKey] = destCount.get(destKey, 0) + 1
+            results.append(error)
+
+        for index, (gvPortSrc, gvPortDest) in enumerate(resolved):
+            if results[index] is None:
+                if destCount[(gvPortDest.GetNode(), gvPortDest.GetMainID(), gvPortDest.GetSubID())] > 1:
+                    results[index] = 'input used by several connections'
+
+        # Connect
+        with Transaction(self.doUndo, eventAdd=False):
+            for index, (gvPortSrc, gvPortDest) in enumerate(resolved):
+                if results[index] is not None:
+                    results[index] = (False, results[index])
+                    continue
+
+                Transaction.AddUndo(self._gvMaster, self.doUndo)
+                if Node._ConnectGvPorts(gvPortSrc, gvPortDest):
+                    results[index] = (True, None)
+                else:
+                    results[index] = (False, 'connection refused')
+
+        return results
 
     def CreateMaterial(self, MatType=1000, doc=None):
-        """Create a new redshift material.
+        """Create a new redshift material, see :meth:`.CreateMaterials`.
 
         :param MatType: The type of the Redshift shader (from 1001, Material to 1010 Volume)
         :type MatType: int
-        :type doc: c4d.BaseDocument the document to insert material
+        :type doc: c4d.BaseDocument the document to insert material, None for the active document.
         :return: Created material or None if it's fail
         :rtype: c4d.Material or None.
         """
+        materials = self.CreateMaterials(1, MatType, doc)
+        if not materials:
+            return None
+
+        return materials[0]
+
+    def _GetMatPrototype(self, MatType):
+        """Get a material of a type, to clone.
+        The first time for a type, the material is created with the Redshift command in a temporary document made active
+        for the command, so the documents of the user get no material and no undo. The command only acts on the active document,
+        so the active document changes for the time of the command (Cinema 4D may send document change messages),
+        the previous one is made active again even if the command fails. Only call it from the main thread.
+
+        :param MatType: The type of the Redshift shader (from 1001, Material to 1010 Volume)
+        :type MatType: int
+        :return: The material.
+        :rtype: c4d.BaseMaterial
+        :raises: ValueError
+        """
+        prototype = self._matPrototypes.get(MatType)
+        if prototype is not None:
+            return prototype
+
+        activeDoc = c4d.documents.GetActiveDocument()
+        doc = c4d.documents.BaseDocument()
+        c4d.documents.InsertBaseDocument(doc)
+        c4d.documents.SetActiveDocument(doc)
+        try:
+            c4d.CallCommand(1036759, MatType)
+            mat = doc.GetFirstMaterial()
+            if not mat or not self.IsRedshiftMaterial(mat):
+                raise ValueError('can\'t create a material of type {0}'.format(MatType))
+
+            prototype = mat.GetClone()
+            if not prototype:
+                raise ValueError('can\'t clone a material of type {0}'.format(MatType))
+        finally:
+            c4d.documents.SetActiveDocument(activeDoc)
+            c4d.documents.KillDocument(doc)
+
+        self._matPrototypes[MatType] = prototype
+        return prototype
+
+    def _InsertMaterials(self, doc, materials):
+        """Insert materials in order at the top of the material list of a document, with one undo.
+
+        :param doc: The document to insert materials.
+        :type doc: c4d.BaseDocument
+        :param materials: The materials to insert.
+        :type materials: List of c4d.BaseMaterial
+        """
+        doc.StartUndo()
+        try:
+            pred = None
+            for mat in materials:
+                doc.InsertMaterial(mat, pred)
+                doc.AddUndo(c4d.UNDOTYPE_NEW, mat)
+                pred = mat
+        finally:
+            doc.EndUndo()
+
+        c4d.EventAdd()
+
+    def CreateMaterials(self, count, MatType=1000, doc=None, names=None):
+        """Create many redshift materials, inserted in order at the top of the material list of the document with one undo.
+        Materials are created directly (1000) or cloned from a material created once per type with the Redshift command,
+        so there is no command call, and no guess about which material is the new one, for each material.
+        The first material of a type other than 1000 briefly makes a temporary document active for the command,
+        the previous active document is made active again, so call it from the main thread.
+
+        :param count: Number of materials to create.
+        :type count: int
+        :param MatType: The type of the Redshift shader (from 1001, Material to 1010 Volume)
+        :type MatType: int
+        :param doc: The document to insert materials, None for the active document.
+        :type doc: c4d.BaseDocument
+        :param names: Name of each material, None to keep the default name.
+        :type names: List of str or None
+        :return: Created materials.
+        :rtype: List of c4d.BaseMaterial
+        :raises: TypeError, ValueError
+        """
+        redshift = ImportTester.GetModule("redshift")
+        # bool is an int, CreateMaterials(True) is a mistake
+        if not isinstance(count, int) or isinstance(count, bool):
+            raise TypeError('count is not an Integer')
+
+        if count < 0:
+            raise ValueError('count must be positive')
+
         if not isinstance(MatType, int):
             raise TypeError('MatType is not an Integer')
 
         if not isinstance(doc, c4d.BaseDocument) and doc is not None:
             raise TypeError('doc is not a BaseDocument')
 
+        if MatType < 1000 or MatType > 1010:
+            raise ValueError('Invalid value for matType, must be from 1000 to 1010')
+
+        if names is not None and len(names) != count:
+            raise ValueError('names and count don\'t match')
+
         if doc is None:
             doc = c4d.documents.GetActiveDocument()
 
-        if MatType < 1000 or MatType > 1010:
-            raise ValueError('Invalid value for matType, must be from 1000 to 1010')
+        materials = list()
+        for index in range(count):
+            if MatType == 1000:
+                mat = c4d.BaseMaterial(redshift.Mrsmaterial)
+            else:
+                mat = self._GetMatPrototype(MatType).GetClone()
+            if not mat:
+                raise ValueError('can\'t create a material of type {0}'.format(MatType))
 
-        c4d.CallCommand(1036759, MatType)
-        mat = doc.GetFirstMaterial()
-        if not mat:
-            return None
+            if names is not None:
+                mat.SetName(names[index])
+            materials.append(mat)
 
-        return mat
+        if materials:
+            self._InsertMaterials(doc, materials)
+        return materials
 
     def IsRedshiftMaterial(self, mat):
-        global redshift
+        redshift = ImportTester.GetModule("redshift")
         if mat is None:
             return False
         if not isinstance(mat, c4d.BaseMaterial):
@@ -285,6 +662,67 @@ class Redshift(MetaName, metaclass=ImportTester):
 
         return True
 
+    def IterMaterials(self, doc=None, filter=None):
+        """Lazily iterate over all Redshift materials of a document.
+
+        :param doc: The document to get materials from, None for the active document.
+        :type doc: c4d.BaseDocument
+        :param filter: Function called with each Redshift material, only materials where it returns True are yielded. None to yield all.
+        :type filter: function or None
+        :return: Generator of Redshift materials.
+        :rtype: Generator of c4d.BaseMaterial
+        """
+        if not isinstance(doc, c4d.BaseDocument) and doc is not None:
+            raise TypeError('doc is not a BaseDocument')
+
+        if doc is None:
+            doc = c4d.documents.GetActiveDocument()
+
+        mat = doc.GetFirstMaterial()
+        while mat:
+            # Get the next one first, so the caller can remove mat
+            nextMat = mat.GetNext()
+            if self.IsRedshiftMaterial(mat) and (filter is None or filter(mat)):
+                yield mat
+            mat = nextMat
+
+    def ForEachMaterial(self, doc, fn, filter=None):
+        """Call a function for each Redshift material of a document, with this wrapper set on the material.
+        An exception raised by fn is reported and doesn't stop the other materials.
+        The material set before the call is set back at the end.
+
+        :param doc: The document to get materials from, None for the active document.
+        :type doc: c4d.BaseDocument
+        :param fn: Function called with (this wrapper, material) for each material.
+        :type fn: function
+        :param filter: Function called with each Redshift material, only materials where it returns True are processed. None to process all.
+        :type filter: function or None
+        :return: One dict per material with the keys material, name, time (in seconds), result (returned by fn) and error (the exception or None).
+        :rtype: List of dict
+        """
+        if not callable(fn):
+            raise TypeError('fn is not callable')
+
+        previousMat, previousGvMaster, previousNodeIndex = self._mat, self._gvMaster, self._nodeIndex
+
+        reports = list()
+        try:
+            for mat in self.IterMaterials(doc, filter):
+                report = {'material': mat, 'name': mat.GetName(), 'time': 0.0, 'result': None, 'error': None}
+                start = time.perf_counter()
+                try:
+                    self._BindMat(mat)
+                    report['result'] = fn(self, mat)
+                except Exception as error:
+                    report['error'] = error
+                report['time'] = time.perf_counter() - start
+                reports.append(report)
+
+        finally:
+            self._mat, self._gvMaster, self._nodeIndex = previousMat, previousGvMaster, previousNodeIndex
+
+        return reports
+
     def RemoveConnection(self, port, node=None, portType=None):
         """Disconnect all connection from a given port of Nodes.
 
@@ -316,8 +754,1504 @@ class Redshift(MetaName, metaclass=ImportTester):
             gvPort = node.SearchPort(port, portType)
 
         # Undo if needed
-        if self.doUndo:
-            self._gvMaster.AddUndo()
+        Transaction.AddUndo(self._gvMaster, self.doUndo)
 
         # Remove connection
-        return gvPort.Remove()
+        return Node._DisconnectGvPort(gvPort)
+
+    def _CheckGraphSpec(self, spec):
+        """Check a graph description given to :meth:`.BuildGraph` before anything is created.
+
+        :param spec: The graph description.
+        :type spec: dict or str
+        :return: (list of (key, node description), list of (src key, src port, dest key, dest port))
+        :rtype: tuple
+        :raises: TypeError, ValueError
+        """
+        if isinstance(spec, str):
+            spec = json.loads(spec)
+
+        if not isinstance(spec, dict):
+            raise TypeError('spec is not a dict')
+
+        nodesSpec = spec.get('nodes', dict())
+        if not isinstance(nodesSpec, dict):
+            raise TypeError('spec nodes is not a dict')
+
+        nodes = list()
+        for key, nodeSpec in nodesSpec.items():
+            if not isinstance(nodeSpec, dict):
+                raise TypeError('node {0} is not a dict'.format(key))
+
+            shaderType = nodeSpec.get('type')
+            if not isinstance(shaderType, str) and not isinstance(shaderType, int):
+                raise TypeError('node {0} type is not valid type'.format(key))
+            if isinstance(shaderType, str) and not self._TestProperty(shaderType):
+                raise ValueError('node {0} type is not a valid metaclassname'.format(key))
+
+            for coord in ('x', 'y'):
+                if not isinstance(nodeSpec.get(coord, -1), int):
+                    raise TypeError('node {0} {1} is not valid type'.format(key, coord))
+
+            if not isinstance(nodeSpec.get('name', ''), str):
+                raise TypeError('node {0} name is not valid type'.format(key))
+
+            if not isinstance(nodeSpec.get('params', dict()), dict):
+                raise TypeError('node {0} params is not a dict'.format(key))
+
+            for portKey in ('inputs', 'outputs'):
+                if not isinstance(nodeSpec.get(portKey, list()), (list, tuple)):
+                    raise TypeError('node {0} {1} is not a list'.format(key, portKey))
+
+            nodes.append((key, nodeSpec))
+
+        connections = list()
+        for connection in spec.get('connections', list()):
+            if isinstance(connection, dict):
+                connection = (connection.get('src'), connection.get('srcPort'),
+                              connection.get('dst'), connection.get('dstPort'))
+
+            if not isinstance(connection, (list, tuple)) or len(connection) != 4:
+                raise TypeError('connection {0} is not (src, srcPort, dst, dstPort)'.format(connection))
+
+            srcKey, srcPort, dstKey, dstPort = connection
+            for nodeKey in (srcKey, dstKey):
+                if nodeKey not in nodesSpec:
+                    raise ValueError('connection {0} use an unknown node {1}'.format(connection, nodeKey))
+            for port in (srcPort, dstPort):
+                if isinstance(port, dict):
+                    if not isinstance(port.get('id'), int):
+                        raise TypeError('connection {0} port id is not an int'.format(connection))
+                elif not isinstance(port, int) and not isinstance(port, str):
+                    raise TypeError('connection {0} port is not parameter or not name of a parameter'.format(connection))
+
+            connections.append((srcKey, srcPort, dstKey, dstPort))
+
+        return nodes, connections
+
+    @staticmethod
+    def _ConvertValue(value):
+        """Convert a value coming from a graph description (e.g JSON) to a value for a parameter.
+
+        :param value: The value, list or tuple of 3 numbers are converted to c4d.Vector.
+        :return: The converted value.
+        """
+        if isinstance(value, (list, tuple)) and len(value) == 3:
+            return c4d.Vector(*value)
+        return value
+
+    def _ResolveParameter(self, node, parameterID):
+        """Get the DescID of a parameter of a node from an ID, a DescID or a parameter identifier / name.
+
+        :param node: The node that own the parameter.
+        :type node: :class:`.Node`
+        :param parameterID: ID, DescID, identifier / name of the parameter. A str of digits is read as an ID and
+            IDs joined by dots (e.g "1234.5678") as a DescID of many levels (JSON keys, see :meth:`._GetParamKey`).
+        :type parameterID: int, c4d.DescID or str
+        :return: The DescID of the parameter.
+        :rtype: c4d.DescID
+        :raises: TypeError, ValueError
+        """
+        if isinstance(parameterID, c4d.DescID):
+            return parameterID
+
+        if isinstance(parameterID, str) and self._IsParamKey(parameterID):
+            return c4d.DescID(*[c4d.DescLevel(int(levelID)) for levelID in parameterID.split('.')])
+
+        if isinstance(parameterID, int):
+            return c4d.DescID(c4d.DescLevel(parameterID))
+
+        if not isinstance(parameterID, str):
+            raise TypeError('parameterID is not valid')
+
+        descID = node.GetDescriptor().GetParameterID(parameterID)
+        if descID is None:
+            raise ValueError('{0} is not a parameter of {1}'.format(parameterID, node.GetType()))
+        return descID
+
+    @staticmethod
+    def _ResolveSpecPort(node, port, portType):
+        """Get what to give to :meth:`.CreateConnection` for a port of a graph description.
+
+        :param node: The node that own the port.
+        :type node: :class:`.Node`
+        :param port: Id or name of the GvPort, or {"id": main ID}.
+        :type port: int, str or dict
+        :param portType: GV_PORT_INPUT or GV_PORT_OUTPUT.
+        :type portType: int
+        :return: (GvPort, None) for a main ID otherwise (node, port). GvPort is None if not found.
+        :rtype: tuple
+        """
+        if isinstance(port, dict):
+            return node.GetPortByMainID(port['id'], portType), None
+        return node, port
+
+    def BuildGraph(self, spec, replace=False):
+        """Build a whole shader network from a description, in one pass and with only one undo.
+        The whole description is checked before any node is created, if building fails created nodes are removed
+        and existing nodes (e.g the Material node) get back their name, color, parameters, ports and connections.
+
+        Description is a dict (or its JSON string) such as::
+
+            {
+                "nodes": {
+                    "fresnel": {"type": "Fresnel", "x": 200, "y": 500, "name": "My Fresnel",
+                                "params": {"REDSHIFT_SHADER_FRESNEL_USER_CURVE": 0.5},
+                                "inputs": ["REDSHIFT_SHADER_FRESNEL_USER_CURVE"], "outputs": []},
+                    "mat": {"type": "Material", "existing": true}
+                },
+                "connections": [["fresnel", 0, "mat", "Diffuse Color"]]
+            }
+
+        - type: Int (a Cinema 4D Node) or a Redshift Node member loot at :class:`MetaclassName`.
+        - existing: True to use the first node of this type (and name) already in the material if any. Always True for Output, found by type only.
+        - params: Parameter ID, identifier or name => value, list of 3 numbers are set as c4d.Vector.
+        - inputs / outputs: Parameters to expose, see :meth:`.Node.ExposeParameter`.
+        - color: list of 3 numbers, otherwise the default color of the node type.
+        - connections: (src, srcPort, dst, dstPort) or a dict with these keys, ports are the Id or name of the GvPort like :meth:`.CreateConnection`,
+          or {"id": main ID} for the port with this main ID (for an exposed parameter, the ID of the parameter).
+
+        :param spec: The graph description.
+        :type spec: dict or str
+        :param replace: True to replace the connection of an input already connected (e.g Surface of the Output), otherwise it's an error.
+        :type replace: Bool
+        :return: node key => Node
+        :rtype: dict of :class:`.Node`
+        :raises: TypeError, ValueError
+        """
+        self._CheckMatIsValid()
+        nodesSpec, connections = self._CheckGraphSpec(spec)
+
+        nodes = dict()
+        createdNodes = list()
+        snapshot = NodeSnapshot(self)
+        with Transaction(self.doUndo, eventAdd=False):
+            # Parameters are set directly on GvNode, so the undo is recorded here
+            Transaction.AddUndo(self._gvMaster, self.doUndo)
+            try:
+                # Create or find all nodes
+                for key, nodeSpec in nodesSpec:
+                    shaderType = nodeSpec['type']
+                    node = None
+                    if shaderType == self.Output:
+                        # There is only one Output, its name may differ from the description
+                        node = self.FindFirst(shaderType)
+                    elif nodeSpec.get('existing', False):
+                        node = self.FindFirst(shaderType, nodeSpec.get('name'))
+
+                    if node is None:
+                        node = self.CreateShader(shaderType, nodeSpec.get('x', -1), nodeSpec.get('y', -1))
+                        if not node:
+                            raise ValueError('node {0} can\'t be created'.format(key))
+                        createdNodes.append(node)
+
+                    nodes[key] = node
+
+                # Resolve everything before the first change on the nodes
+                edits = list()
+                for key, nodeSpec in nodesSpec:
+                    node = nodes[key]
+                    params = [(self._ResolveParameter(node, paramID), self._ConvertValue(value))
+                              for paramID, value in nodeSpec.get('params', dict()).items()]
+                    ports = [(self._ResolveParameter(node, paramID), c4d.GV_PORT_INPUT) for paramID in nodeSpec.get('inputs', ())]
+                    ports += [(self._ResolveParameter(node, paramID), c4d.GV_PORT_OUTPUT) for paramID in nodeSpec.get('outputs', ())]
+                    edits.append((node, nodeSpec, params, ports))
+
+                    if node not in createdNodes:
+                        snapshot.Add(node, [descID for descID, value in params])
+
+                # Apply names, colors, parameters and exposed ports
+                for node, nodeSpec, params, ports in edits:
+                    if 'name' in nodeSpec:
+                        node.SetName(nodeSpec['name'])
+                    if 'color' in nodeSpec:
+                        node.SetColor(self._ConvertValue(nodeSpec['color']))
+                    for descID, value in params:
+                        node[descID] = value
+                    for descID, portType in ports:
+                        if node.GetPortByMainID(descID[0].id, portType) is None:
+                            node.ExposeParameter(descID, portType)
+
+                # Connect
+                edges = list()
+                for srcKey, srcPort, dstKey, dstPort in connections:
+                    src, resolvedSrcPort = self._ResolveSpecPort(nodes[srcKey], srcPort, c4d.GV_PORT_OUTPUT)
+                    dst, resolvedDstPort = self._ResolveSpecPort(nodes[dstKey], dstPort, c4d.GV_PORT_INPUT)
+                    if not src or not dst:
+                        raise ValueError('can\'t connect {0}:{1} to {2}:{3}, port not found'.format(srcKey, srcPort, dstKey, dstPort))
+                    edges.append((src, resolvedSrcPort, dst, resolvedDstPort))
+
+                if replace:
+                    # Existing nodes are in the snapshot, so removed connections are restored if building fails
+                    for src, resolvedSrcPort, dst, resolvedDstPort in edges:
+                        gvPortDest = dst if resolvedDstPort is None else dst.SearchPort(resolvedDstPort, c4d.GV_PORT_INPUT)
+                        if gvPortDest is not None and gvPortDest.IsIncomingConnected():
+                            Node._DisconnectGvPort(gvPortDest)
+
+                for (srcKey, srcPort, dstKey, dstPort), (success, error) in zip(connections, self.CreateConnections(edges)):
+                    if not success:
+                        raise ValueError('can\'t connect {0}:{1} to {2}:{3}, {4}'.format(srcKey, srcPort, dstKey, dstPort, error))
+
+            except Exception:
+                # Leave the material as it was
+                for node in createdNodes:
+                    node._RemoveGvNode()
+                self._nodeIndex = None
+                snapshot.Restore()
+                raise
+
+        return nodes
+
+    def _GetConnections(self, nodes):
+        """Get all connections between nodes.
+
+        :param nodes: Nodes to get connections from, connections to a node outside of nodes are ignored.
+        :type nodes: List of :class:`.Node`
+        :return: (source Node, source GvPort, destination Node, destination GvPort) for each connection.
+        :rtype: List of tuple
+        """
+        nodesByGvNode = dict((node.GetNode(), node) for node in nodes)
+
+        connections = list()
+        for node in nodes:
+            for gvPortSrc in node._GetGvPorts(c4d.GV_PORT_OUTPUT):
+                for gvPortDest in gvPortSrc.GetDestination():
+                    destNode = nodesByGvNode.get(gvPortDest.GetNode())
+                    if destNode is not None:
+                        connections.append((node, gvPortSrc, destNode, gvPortDest))
+        return connections
+
+    @staticmethod
+    def _GetParamKey(descID):
+        """Get the key of a parameter in a graph description, IDs of the levels of its DescID joined by dots.
+
+        :param descID: The DescID of the parameter.
+        :type descID: c4d.DescID
+        :return: The key, e.g "1234" or "1234.5678" for the sub-channel of a parameter.
+        :rtype: str
+        """
+        return '.'.join(str(descID[level].id) for level in range(descID.GetDepth()))
+
+    @staticmethod
+    def _IsParamKey(key):
+        """Check if a str is a parameter key made by :meth:`._GetParamKey`.
+
+        :param key: The str to check.
+        :type key: str
+        :return: True if key is IDs joined by dots.
+        :rtype: Bool
+        """
+        return all(levelID.isdigit() for levelID in key.split('.'))
+
+    def _GetParamDefault(self, node, descID):
+        """Get the default value of a parameter, also for sub-channels of file parameters.
+
+        :param node: The node that own the parameter.
+        :type node: :class:`.Node`
+        :param descID: The DescID of the parameter.
+        :type descID: c4d.DescID
+        :return: The default value, None if unknown.
+        """
+        key = self._GetParamKey(descID)
+        for paramID, default in node.GetDescriptor().GetParameters():
+            if self._GetParamKey(paramID) == key:
+                return default
+
+        if descID.GetDepth() == 2:
+            for channel, default in FILE_CHANNELS:
+                if getattr(c4d, channel, None) == descID[1].id:
+                    return default
+        return None
+
+    @staticmethod
+    def _SerializeValue(value):
+        """Convert a parameter value to a JSON value.
+
+        :param value: The parameter value.
+        :return: The JSON value, c4d.Vector as a list of 3 floats. None if the value type is not supported.
+        :rtype: bool, int, float, str, list or None
+        """
+        if isinstance(value, (bool, int, float, str)):
+            return value
+        if isinstance(value, c4d.Vector):
+            return [value.x, value.y, value.z]
+        return None
+
+    def _GetNodeParams(self, node, strict=False):
+        """Get parameters of a node that differ from their default value, except the ones for type, name and color.
+        Parameters that can't be read directly (e.g Tex0 of a TextureSampler) are read through their file sub-channels
+        (path, layer, colorspace) and stored under "ID.subID".
+
+        :param node: The node to get parameters from.
+        :type node: :class:`.Node`
+        :param strict: True to raise on a value that can't be serialized, otherwise a warning is logged and the parameter is not exported.
+        :type strict: Bool
+        :return: Key of the parameter (see :meth:`._GetParamKey`) => JSON value, see :meth:`._SerializeValue`.
+        :rtype: dict
+        :raises: TypeError if strict
+        """
+        skippedIDs = (c4d.GV_REDSHIFT_SHADER_META_CLASSNAME, c4d.ID_GVBASE_COLOR, c4d.ID_GVBASE_NAME)
+
+        params = dict()
+        for descID, default in node.GetDescriptor().GetParameters():
+            if descID[0].id in skippedIDs:
+                continue
+
+            try:
+                values = [(descID, node[descID], default)]
+            except (AttributeError, TypeError):
+                values = list()
+                for channel, channelDefault in FILE_CHANNELS:
+                    channelID = getattr(c4d, channel, None)
+                    if channelID is None or descID.GetDepth() != 1:
+                        continue
+                    subDescID = c4d.DescID(descID[0], c4d.DescLevel(channelID))
+                    try:
+                        values.append((subDescID, node[subDescID], channelDefault))
+                    except (AttributeError, TypeError):
+                        continue
+
+                if not values:
+                    self._ReportUnsupported(node, descID, 'can\'t be read', strict)
+                    continue
+
+            for paramID, value, paramDefault in values:
+                serialized = self._SerializeValue(value)
+                if serialized is None:
+                    if value is not None:
+                        self._ReportUnsupported(node, paramID, 'is a {0}'.format(type(value).__name__), strict)
+                    continue
+
+                if paramDefault is not None and serialized == self._SerializeValue(paramDefault):
+                    continue
+                if paramID.GetDepth() > 1 and paramDefault is None and serialized == '':
+                    continue
+                params[self._GetParamKey(paramID)] = serialized
+        return params
+
+    def _ReportUnsupported(self, node, descID, reason, strict):
+        """Report a parameter :meth:`._GetNodeParams` can't export.
+
+        :param node: The node that own the parameter.
+        :type node: :class:`.Node`
+        :param descID: The DescID of the parameter.
+        :type descID: c4d.DescID
+        :param reason: Why it can't be exported.
+        :type reason: str
+        :param strict: True to raise, otherwise a warning is logged.
+        :type strict: Bool
+        :raises: TypeError if strict
+        """
+        message = 'parameter {0} of {1} ({2}) {3}, it\'s not exported'.format(self._GetParamKey(descID), node.GetName(), node.GetType(), reason)
+        if strict:
+            raise TypeError(message)
+        logger.warning(message)
+
+    def ExportGraph(self, strict=False):
+        """Export the graph of the material as a description :meth:`.BuildGraph` and :meth:`.ImportGraph` can build back.
+        Nodes directly inside the Shader Group are exported, with their parameters that differ from the default value,
+        their exposed ports and their connections. Nodes are stored under n0, n1, ... in GetAllNodes order.
+        Groups can't be described, so a material with nodes inside a group is not exported.
+
+        :param strict: True to raise on a parameter value that can't be exported (e.g a gradient), otherwise a warning is logged.
+        :type strict: Bool
+        :return: The graph description, JSON compatible.
+        :rtype: dict
+        :raises: TypeError if strict, ValueError if a node is a group
+        """
+        self._CheckMatIsValid()
+
+        nodes = list(self.IterNodes(depth=0))
+        for node in nodes:
+            if node.GetNode().GetDown():
+                raise ValueError('{0} is a group, nodes inside groups can\'t be exported'.format(node.GetName()))
+
+        keys = dict()
+        nodesSpec = dict()
+        for node in nodes:
+            key = 'n{0}'.format(len(keys))
+            keys[node.GetNode()] = key
+
+            x, y = node.GetPosition()
+            nodeSpec = {'type': node.GetType(), 'name': node.GetName(), 'x': int(x), 'y': int(y),
+                        'color': self._SerializeValue(node.GetColor())}
+
+            params = self._GetNodeParams(node, strict)
+            if params:
+                nodeSpec['params'] = params
+
+            inputs = [gvPort.GetMainID() for gvPort in node._GetGvPorts(c4d.GV_PORT_INPUT)]
+            outputs = [gvPort.GetMainID() for gvPort in node._GetGvPorts(c4d.GV_PORT_OUTPUT)]
+            if inputs:
+                nodeSpec['inputs'] = inputs
+            if outputs:
+                nodeSpec['outputs'] = outputs
+
+            nodesSpec[key] = nodeSpec
+
+        connections = list()
+        for srcNode, gvPortSrc, destNode, gvPortDest in self._GetConnections(nodes):
+            connections.append([keys[srcNode.GetNode()], {'id': gvPortSrc.GetMainID()},
+                                keys[destNode.GetNode()], {'id': gvPortDest.GetMainID()}])
+
+        return {'version': 1, 'material': self._mat.GetName(), 'nodes': nodesSpec, 'connections': connections}
+
+    def ImportGraph(self, graph, clear=True):
+        """Build a graph returned by :meth:`.ExportGraph` in the material, with only one undo.
+
+        :param graph: The graph description or its JSON string.
+        :type graph: dict or str
+        :param clear: True to remove all nodes of the material before, otherwise nodes are added: the existing Output is used
+            and a connection to an input already connected replaces the existing one.
+            The graph is first built on a copy of the material, so a graph that can't be built leaves the material untouched.
+        :type clear: Bool
+        :return: node key => Node
+        :rtype: dict of :class:`.Node`
+        :raises: TypeError, ValueError
+        """
+        self._CheckMatIsValid()
+
+        if isinstance(graph, str):
+            graph = json.loads(graph)
+
+        # Check before removing anything
+        self._CheckGraphSpec(graph)
+
+        if clear:
+            # Parameters and ports are only checked while building, the copy raise before the material lose its nodes
+            trial = self.__class__()
+            trial.doUndo = False
+            trial._BindMat(self._mat.GetClone())
+            trial._RemoveAllNodes()
+            trial.BuildGraph(graph)
+
+        with Transaction(self.doUndo, eventAdd=False):
+            if clear:
+                Transaction.AddUndo(self._gvMaster, self.doUndo)
+                self._RemoveAllNodes()
+
+            return self.BuildGraph(graph, replace=not clear)
+
+    def _RemoveAllNodes(self):
+        """Remove all nodes directly inside the Shader Group, without undo."""
+        for node in list(self.IterNodes(depth=0)):
+            node._RemoveGvNode()
+        self._nodeIndex = None
+
+    def ExportScene(self, doc, fileOrPath, filter=None):
+        """Export the graph of each Redshift material of a document to a JSON lines file, see :class:`.GraphWriter`.
+        Graphs are written one by one, so they are never all hold in memory.
+
+        :param doc: The document to export, None for the active document.
+        :type doc: c4d.BaseDocument
+        :param fileOrPath: Path of the file to write, or a file object opened in text mode.
+        :type fileOrPath: str or file
+        :param filter: Function called with each Redshift material, only materials where it returns True are exported. None to export all.
+        :type filter: function or None
+        :return: The report of :meth:`.ForEachMaterial`.
+        :rtype: List of dict
+        """
+        with GraphWriter(fileOrPath) as writer:
+            return self.ForEachMaterial(doc, lambda rs, mat: writer.Write(rs.ExportGraph()), filter)
+
+    @staticmethod
+    def _HashString(value):
+        """Get the sha1 of a str as an int.
+
+        :param value: The str to hash.
+        :type value: str
+        :return: The sha1 as an int.
+        :rtype: int
+        """
+        return int(hashlib.sha1(value.encode('utf-8')).hexdigest(), 16)
+
+    def GetGraphHash(self, strict=False):
+        """Get a hash of the material graph, two materials with the same node types, parameters (texture paths included),
+        exposed ports and connections get the same hash whatever the order, names, positions and colors of their nodes.
+        Different graphs can get the same hash, :meth:`.FindDuplicateMaterials` compares graphs with the same hash.
+
+        :param strict: True to raise if a parameter can't be exported, see :meth:`.ExportGraph`.
+        :type strict: Bool
+        :return: The hash as an hexadecimal str.
+        :rtype: str
+        :raises: TypeError if strict
+        """
+        return self._HashGraph(self.ExportGraph(strict))
+
+    @classmethod
+    def _GetNodeContent(cls, nodeSpec):
+        """Get what a node of a graph exported by :meth:`.ExportGraph` is, without its name, position and color.
+
+        :param nodeSpec: The description of the node.
+        :type nodeSpec: dict
+        :return: The content as a JSON str.
+        :rtype: str
+        """
+        return json.dumps([nodeSpec['type'], nodeSpec.get('params', dict()),
+                           sorted(nodeSpec.get('inputs', ())), sorted(nodeSpec.get('outputs', ()))],
+                          sort_keys=True, separators=(',', ':'))
+
+    @classmethod
+    def _GetFlowLabels(cls, contents, inputs, outputs):
+        """Label each node from its content and the labels of the nodes connected to its inputs, in topological order,
+        so everything upstream of a node is part of its label. Nodes in or after a cycle have no topological order,
+        their label is refined from their neighbours :data:`GRAPH_CYCLE_ROUNDS` times.
+
+        :param contents: node key => hash of the content of the node.
+        :type contents: dict
+        :param inputs: node key => (port, other key, other port) of the connections the label is made from.
+        :type inputs: dict
+        :param outputs: node key => (port, other key, other port) of the connections in the other direction.
+        :type outputs: dict
+        :return: node key => label
+        :rtype: dict
+        """
+        labels = dict()
+
+        def GetLabel(key):
+            return cls._HashString('{0}:{1}'.format(contents[key], sorted(
+                (port, labels.get(other, contents[other]), otherPort) for port, other, otherPort in inputs[key])))
+
+        pending = dict((key, len(connections)) for key, connections in inputs.items())
+        ready = [key for key, count in pending.items() if not count]
+        while ready:
+            key = ready.pop()
+            labels[key] = GetLabel(key)
+            for port, other, otherPort in outputs[key]:
+                pending[other] -= 1
+                if not pending[other]:
+                    ready.append(other)
+
+        cyclic = [key for key in inputs if key not in labels]
+        for _ in range(GRAPH_CYCLE_ROUNDS if cyclic else 0):
+            labels.update([(key, GetLabel(key)) for key in cyclic])
+        return labels
+
+    @classmethod
+    def _GetGraphLabels(cls, graph):
+        """Get a label for each node of a graph exported by :meth:`.ExportGraph`, from what the node is, what is upstream
+        and what is downstream of it (see :meth:`._GetFlowLabels`), in time linear with the size of the graph.
+
+        :param graph: The graph description.
+        :type graph: dict
+        :return: node key => label
+        :rtype: dict
+        """
+        nodesSpec = graph['nodes']
+
+        inputs = dict((key, list()) for key in nodesSpec)
+        outputs = dict((key, list()) for key in nodesSpec)
+        for srcKey, srcPort, destKey, destPort in graph['connections']:
+            outputs[srcKey].append((srcPort['id'], destKey, destPort['id']))
+            inputs[destKey].append((destPort['id'], srcKey, srcPort['id']))
+
+        contents = dict((key, cls._HashString(cls._GetNodeContent(nodeSpec))) for key, nodeSpec in nodesSpec.items())
+        upstream = cls._GetFlowLabels(contents, inputs, outputs)
+        downstream = cls._GetFlowLabels(contents, outputs, inputs)
+        return dict((key, cls._HashString('{0}:{1}'.format(upstream[key], downstream[key]))) for key in nodesSpec)
+
+    @classmethod
+    def _HashGraph(cls, graph):
+        """Get the hash of a graph exported by :meth:`.ExportGraph`, see :meth:`.GetGraphHash`.
+
+        :param graph: The graph description.
+        :type graph: dict
+        :return: The hash as an hexadecimal str.
+        :rtype: str
+        """
+        labels = cls._GetGraphLabels(graph)
+
+        # Sum of labels is the same whatever the order of nodes and connections
+        total = 0
+        for label in labels.values():
+            total += cls._HashString('node:{0}'.format(label))
+        for srcKey, srcPort, destKey, destPort in graph['connections']:
+            total += cls._HashString('connection:{0}:{1}:{2}:{3}'.format(
+                labels[srcKey], srcPort['id'], labels[destKey], destPort['id']))
+
+        return '{0:040x}'.format(total % (1 << 160))
+
+    @classmethod
+    def _IsSameGraph(cls, graph, other):
+        """Check if two graphs exported by :meth:`.ExportGraph` are the same, whatever the keys, names, positions and colors of their nodes.
+        Nodes are matched by label (see :meth:`._GetGraphLabels`), nodes sharing a label are tried in turn.
+        Only :data:`GRAPH_MATCH_ATTEMPTS` matches per node and connection are tried, so graphs with many nodes that are
+        only told apart by trying them all are reported different rather than compared for an exponential time.
+
+        :param graph: The first graph description.
+        :type graph: dict
+        :param other: The second graph description.
+        :type other: dict
+        :return: True if a node of other was found for each node of graph with the same content and the same connections.
+        :rtype: Bool
+        """
+        labels = cls._GetGraphLabels(graph)
+        otherLabels = cls._GetGraphLabels(other)
+        if sorted(labels.values()) != sorted(otherLabels.values()):
+            return False
+
+        edges = set((srcKey, srcPort['id'], destKey, destPort['id']) for srcKey, srcPort, destKey, destPort in graph['connections'])
+        otherEdges = set((srcKey, srcPort['id'], destKey, destPort['id']) for srcKey, srcPort, destKey, destPort in other['connections'])
+        if len(edges) != len(other['connections']) or len(edges) != len(otherEdges):
+            return False
+
+        edgesByKey = dict((key, list()) for key in labels)
+        for edge in edges:
+            edgesByKey[edge[0]].append(edge)
+            if edge[2] != edge[0]:
+                edgesByKey[edge[2]].append(edge)
+        otherEdgesByKey = dict((key, list()) for key in otherLabels)
+        for edge in otherEdges:
+            otherEdgesByKey[edge[0]].append(edge)
+            if edge[2] != edge[0]:
+                otherEdgesByKey[edge[2]].append(edge)
+
+        candidates = dict()
+        for key, label in otherLabels.items():
+            candidates.setdefault(label, list()).append(key)
+
+        # Nodes are matched in breadth first order from the ones with the fewest candidates,
+        # so most nodes are connected to an already matched node and get their candidates from it
+        keys = list()
+        seen = set()
+        for start in sorted(labels, key=lambda key: (len(candidates[labels[key]]), key)):
+            if start in seen:
+                continue
+            seen.add(start)
+            keys.append(start)
+            done = len(keys) - 1
+            while done < len(keys):
+                for srcKey, srcPort, destKey, destPort in edgesByKey[keys[done]]:
+                    for neighbour in (srcKey, destKey):
+                        if neighbour not in seen:
+                            seen.add(neighbour)
+                            keys.append(neighbour)
+                done += 1
+
+        contents = dict()
+        otherContents = dict()
+        mapping = dict()
+        used = set()
+
+        def GetOptions(key):
+            for srcKey, srcPort, destKey, destPort in edgesByKey[key]:
+                if srcKey == key and destKey in mapping:
+                    return [edge[0] for edge in otherEdgesByKey[mapping[destKey]] if edge[1:] == (srcPort, mapping[destKey], destPort)]
+                if destKey == key and srcKey in mapping:
+                    return [edge[2] for edge in otherEdgesByKey[mapping[srcKey]] if edge[:2] + edge[3:] == (mapping[srcKey], srcPort, destPort)]
+            return candidates[labels[key]]
+
+        def IsMatch(key, otherKey):
+            if otherKey in used or labels[key] != otherLabels[otherKey]:
+                return False
+            if key not in contents:
+                contents[key] = cls._GetNodeContent(graph['nodes'][key])
+            if otherKey not in otherContents:
+                otherContents[otherKey] = cls._GetNodeContent(other['nodes'][otherKey])
+            if contents[key] != otherContents[otherKey]:
+                return False
+
+            mapping[key] = otherKey
+            for srcKey, srcPort, destKey, destPort in edgesByKey[key]:
+                if srcKey in mapping and destKey in mapping and (mapping[srcKey], srcPort, mapping[destKey], destPort) not in otherEdges:
+                    del mapping[key]
+                    return False
+            return True
+
+        # Depth first search without recursion, options[index] are the candidates of keys[index] and tried[index] how many were tried
+        options = [None] * len(keys)
+        tried = [0] * len(keys)
+        attempts = GRAPH_MATCH_ATTEMPTS * (len(keys) + len(edges))
+        index = 0
+        while 0 <= index < len(keys):
+            key = keys[index]
+            if key in mapping:
+                used.discard(mapping.pop(key))
+            if options[index] is None:
+                options[index] = GetOptions(key)
+
+            while tried[index] < len(options[index]):
+                otherKey = options[index][tried[index]]
+                tried[index] += 1
+                attempts -= 1
+                if attempts < 0:
+                    return False
+                if IsMatch(key, otherKey):
+                    used.add(otherKey)
+                    break
+            else:
+                options[index] = None
+                tried[index] = 0
+                index -= 1
+                continue
+            index += 1
+
+        # Each edge was checked when its last node was matched, and both graphs have the same number of edges
+        return index == len(keys)
+
+    def FindDuplicateMaterials(self, doc=None, filter=None):
+        """Find Redshift materials of a document that have the same graph, see :meth:`.GetGraphHash`.
+        Materials with the same hash are compared node by node, so they really are the same.
+        Materials with a parameter that can't be exported are never reported.
+
+        :param doc: The document to search in, None for the active document.
+        :type doc: c4d.BaseDocument
+        :param filter: Function called with each Redshift material, only materials where it returns True are compared. None to compare all.
+        :type filter: function or None
+        :return: Groups of materials with the same graph (at least 2 materials each), in document order.
+        :rtype: List of list of c4d.BaseMaterial
+        """
+        graphsByHash = dict()
+        for report in self.ForEachMaterial(doc, lambda rs, mat: rs.ExportGraph(strict=True), filter):
+            if report['error'] is None:
+                graph = report['result']
+                graphsByHash.setdefault(self._HashGraph(graph), list()).append((report['material'], graph))
+
+        groups = list()
+        for materials in graphsByHash.values():
+            sameGraphs = list()
+            for mat, graph in materials:
+                for group in sameGraphs:
+                    if self._IsSameGraph(group[0][1], graph):
+                        group.append((mat, graph))
+                        break
+                else:
+                    sameGraphs.append([(mat, graph)])
+            groups.extend([mat for mat, graph in group] for group in sameGraphs if len(group) > 1)
+
+        return groups
+
+    def DeduplicateMaterials(self, doc=None, relink=True, filter=None):
+        """Find Redshift materials that have the same graph and link texture tags using a duplicate to the first material of its group.
+        Duplicates are not deleted.
+
+        :param doc: The document to search in, None for the active document.
+        :type doc: c4d.BaseDocument
+        :param relink: True to change texture tags using a duplicate to use the first material of the group, otherwise only report.
+        :type relink: Bool
+        :param filter: Function called with each Redshift material, only materials where it returns True are compared. None to compare all.
+        :type filter: function or None
+        :return: (Groups of materials with the same graph, first one is the one kept. Number of changed texture tags)
+        :rtype: tuple
+        """
+        if doc is None:
+            doc = c4d.documents.GetActiveDocument()
+
+        groups = self.FindDuplicateMaterials(doc, filter)
+        if not relink or not groups:
+            return groups, 0
+
+        survivors = dict()
+        for materials in groups:
+            for mat in materials[1:]:
+                survivors[mat] = materials[0]
+
+        changedTags = 0
+        doc.StartUndo()
+        try:
+            stack = [doc.GetFirstObject()]
+            while stack:
+                obj = stack.pop()
+                if not obj:
+                    continue
+                stack.append(obj.GetNext())
+                stack.append(obj.GetDown())
+
+                for tag in obj.GetTags():
+                    if not tag.IsInstanceOf(c4d.Ttexture):
+                        continue
+                    survivor = survivors.get(tag[c4d.TEXTURETAG_MATERIAL])
+                    if survivor is None:
+                        continue
+                    doc.AddUndo(c4d.UNDOTYPE_CHANGE_SMALL, tag)
+                    tag[c4d.TEXTURETAG_MATERIAL] = survivor
+                    changedTags += 1
+        finally:
+            doc.EndUndo()
+
+        if changedTags:
+            c4d.EventAdd()
+        return groups, changedTags
+
+    def RegisterTemplate(self, name, mat=None):
+        """Register a copy of a Redshift material as a template for :meth:`.Instantiate`.
+        Later changes on mat don't change the template.
+
+        :param name: Name of the template, replace a previous template with the same name.
+        :type name: str
+        :param mat: The material to use as template, None for the material currently set.
+        :type mat: c4d.BaseMaterial
+        :return: The template material (not inserted in any document).
+        :rtype: c4d.BaseMaterial
+        """
+        if not isinstance(name, str):
+            raise TypeError('name is not a str')
+
+        if mat is None:
+            self._CheckMatIsValid()
+            mat = self._mat
+        elif not self.IsRedshiftMaterial(mat):
+            raise TypeError('material is not a redshift material')
+
+        template = mat.GetClone()
+        if not template:
+            raise TypeError('can\'t clone material')
+
+        Redshift._templates[name] = template
+        return template
+
+    def GetTemplate(self, name):
+        """Get a template registered by :meth:`.RegisterTemplate`.
+
+        :param name: Name of the template.
+        :type name: str
+        :return: The template material or None if there is no template with this name.
+        :rtype: c4d.BaseMaterial or None
+        """
+        return Redshift._templates.get(name)
+
+    def Instantiate(self, template, overrides=None, doc=None, names=None):
+        """Create variants of a template by cloning it and only changing some parameters, inserted in the document with one undo.
+
+        Each override is a dict of node name => {parameter ID, identifier or name => value}, for example::
+
+            rs.Instantiate("wood", [{"Diffuse": {"REDSHIFT_SHADER_MATERIAL_DIFFUSE_COLOR": [1, 0, 0]}},
+                                    {"Diffuse": {"REDSHIFT_SHADER_MATERIAL_DIFFUSE_COLOR": [0, 1, 0]}}])
+
+        All variants are created and checked before the first one is inserted.
+
+        :param template: Name of a template registered by :meth:`.RegisterTemplate` or a Redshift material.
+        :type template: str or c4d.BaseMaterial
+        :param overrides: One dict per variant to create, None to create one variant without override.
+        :type overrides: List of dict or None
+        :param doc: The document to insert materials, None for the active document.
+        :type doc: c4d.BaseDocument
+        :param names: Name of each variant, None to keep the name of the template.
+        :type names: List of str or None
+        :return: Created materials, in overrides order.
+        :rtype: List of c4d.BaseMaterial
+        :raises: TypeError, ValueError
+        """
+        if isinstance(template, str):
+            templateName = template
+            template = self.GetTemplate(templateName)
+            if template is None:
+                raise ValueError('{0} is not a registered template'.format(templateName))
+        elif not self.IsRedshiftMaterial(template):
+            raise TypeError('template is not a template name or a redshift material')
+
+        if overrides is None:
+            overrides = [dict()]
+        if not isinstance(overrides, (list, tuple)):
+            raise TypeError('overrides is not a list')
+
+        if names is not None and len(names) != len(overrides):
+            raise ValueError('names and overrides don\'t have the same length')
+
+        if not isinstance(doc, c4d.BaseDocument) and doc is not None:
+            raise TypeError('doc is not a BaseDocument')
+
+        if doc is None:
+            doc = c4d.documents.GetActiveDocument()
+
+        previousMat, previousGvMaster, previousNodeIndex = self._mat, self._gvMaster, self._nodeIndex
+
+        # Clone and change all variants before inserting them
+        materials = list()
+        try:
+            for index, override in enumerate(overrides):
+                if not isinstance(override, dict):
+                    raise TypeError('override {0} is not a dict'.format(index))
+
+                mat = template.GetClone()
+                if not mat:
+                    raise TypeError('can\'t clone template')
+                if names is not None:
+                    mat.SetName(names[index])
+
+                self._BindMat(mat)
+                for nodeName, params in override.items():
+                    nodes = self.FindNodes(name=nodeName)
+                    if not nodes:
+                        raise ValueError('variant {0}: there is no node named {1}'.format(index, nodeName))
+
+                    for node in nodes:
+                        for paramID, value in params.items():
+                            node[self._ResolveParameter(node, paramID)] = self._ConvertValue(value)
+
+                materials.append(mat)
+
+        finally:
+            self._mat, self._gvMaster, self._nodeIndex = previousMat, previousGvMaster, previousNodeIndex
+
+        self._InsertMaterials(doc, materials)
+        return materials
+
+    def _RecolorNodes(self, colors, onlyChanged=True):
+        """Set the default color of each node of the material.
+
+        :param colors: Node type => default color, filled with types not yet in it.
+        :type colors: dict
+        :param onlyChanged: True to only write nodes that don't already have their default color.
+        :type onlyChanged: Bool
+        :return: Number of recolored nodes.
+        :rtype: int
+        """
+        count = 0
+        for node in self.IterNodes():
+            nodeType = node.GetType()
+            color = colors.get(nodeType)
+            if color is None:
+                color = colors[nodeType] = self.GetDefaultColorNode(nodeType)
+
+            if onlyChanged and node.GetColor() == color:
+                continue
+
+            node.SetColor(color)
+            count += 1
+        return count
+
+    def RecolorAll(self, docOrMat=None, onlyChanged=True):
+        """Set the default color of each node of a material or of all Redshift materials of a document.
+        The default color is computed once per node type, and nodes that already have it are not changed,
+        so there is no undo and no redraw if nothing changed.
+
+        :param docOrMat: A Redshift material, a document for all its Redshift materials, None for the active document.
+        :type docOrMat: c4d.BaseMaterial or c4d.BaseDocument
+        :param onlyChanged: True to only write nodes that don't already have their default color.
+        :type onlyChanged: Bool
+        :return: Number of recolored nodes.
+        :rtype: int
+        """
+        colors = dict()
+        return self._SumOverMaterials(docOrMat, lambda rs, mat: rs._RecolorNodes(colors, onlyChanged))
+
+    def _SumOverMaterials(self, docOrMat, fn):
+        """Call fn for a material or for all Redshift materials of a document, inside one :class:`.Transaction`.
+        The material set before the call is set back at the end.
+
+        :param docOrMat: A Redshift material, a document for all its Redshift materials, None for the active document.
+        :type docOrMat: c4d.BaseMaterial or c4d.BaseDocument
+        :param fn: Function called with (this wrapper, material), returning a number.
+        :type fn: function
+        :return: Sum of the values returned by fn.
+        :rtype: int
+        :raises: The first exception raised by fn, once all materials are done.
+        """
+        with Transaction(self.doUndo):
+            if isinstance(docOrMat, c4d.BaseMaterial):
+                previousMat, previousGvMaster, previousNodeIndex = self._mat, self._gvMaster, self._nodeIndex
+                try:
+                    self.SetMat(docOrMat)
+                    return fn(self, docOrMat)
+                finally:
+                    self._mat, self._gvMaster, self._nodeIndex = previousMat, previousGvMaster, previousNodeIndex
+
+            reports = self.ForEachMaterial(docOrMat, fn)
+
+        for report in reports:
+            if report['error'] is not None:
+                raise report['error']
+        return sum(report['result'] for report in reports)
+
+    def AutoLayout(self, x=0, y=0, spacingX=200, spacingY=100):
+        """Place all nodes of the material in columns according their longest distance to the Output node, from the Output node on the right
+        to the first nodes of the network on the left, so each node is on the left of all the nodes it's connected to.
+        Nodes that don't lead to the Output node (or are in a cycle) are placed in a last column on the left.
+        Nodes of a column are ordered according the nodes they are connected to.
+        Linear in the number of nodes and connections (plus sorting each column), all positions are set with one undo.
+
+        :param x: X position of the right column (Output node) in the Xpresso windows.
+        :type x: int
+        :param y: Y position of the middle of columns in the Xpresso windows.
+        :type y: int
+        :param spacingX: Space between columns.
+        :type spacingX: int
+        :param spacingY: Space between nodes of a column.
+        :type spacingY: int
+        :return: Node => (x, y) new position.
+        :rtype: dict
+        """
+        self._CheckMatIsValid()
+
+        for value in (x, y, spacingX, spacingY):
+            if not isinstance(value, int):
+                raise TypeError('position or spacing is not valid type')
+
+        nodes = list(self.IterNodes(depth=0))
+        indexes = dict((node, index) for index, node in enumerate(nodes))
+
+        # Producers of each node
+        producers = [list() for node in nodes]
+        for srcNode, gvPortSrc, destNode, gvPortDest in self._GetConnections(nodes):
+            producers[indexes[destNode]].append(indexes[srcNode])
+
+        # Nodes that lead to the Output node, breadth first over incoming connections
+        reached = [False] * len(nodes)
+        queue = [index for index, node in enumerate(nodes) if node.GetType() == self.Output]
+        for index in queue:
+            reached[index] = True
+        done = 0
+        while done < len(queue):
+            index = queue[done]
+            done += 1
+            for producer in producers[index]:
+                if not reached[producer]:
+                    reached[producer] = True
+                    queue.append(producer)
+
+        # Column = longest distance to the Output node, a node is placed once all the nodes it's connected to are placed
+        pending = [0] * len(nodes)
+        for index in queue:
+            for producer in producers[index]:
+                pending[producer] += 1
+
+        columns = [None] * len(nodes)
+        placed = [index for index in queue if not pending[index]]
+        for index in placed:
+            columns[index] = 0
+        done = 0
+        while done < len(placed):
+            index = placed[done]
+            done += 1
+            for producer in producers[index]:
+                columns[producer] = max(columns[producer] or 0, columns[index] + 1)
+                pending[producer] -= 1
+                if not pending[producer]:
+                    placed.append(producer)
+
+        # Nodes that don't lead to the Output node, and nodes in a cycle, are put in a last column
+        if len(placed) < len(nodes):
+            lastColumn = max(columns[index] for index in placed) + 1 if placed else 0
+            for index in range(len(nodes)):
+                if pending[index] or not reached[index]:
+                    columns[index] = lastColumn
+
+        # Order each column by the mean row of the nodes it's connected to in the previous columns
+        consumers = [list() for node in nodes]
+        for index, indexProducers in enumerate(producers):
+            for producer in indexProducers:
+                consumers[producer].append(index)
+
+        nodesByColumn = dict()
+        for index in range(len(nodes)):
+            nodesByColumn.setdefault(columns[index], list()).append(index)
+
+        rows = [0] * len(nodes)
+        positions = dict()
+        for column in sorted(nodesByColumn):
+            def SortKey(index):
+                if nodes[index].GetType() == self.Output:
+                    return -1.0, index
+                placed = [rows[consumer] for consumer in consumers[index] if columns[consumer] < column]
+                if not placed:
+                    return float(len(nodes)), index
+                return float(sum(placed)) / len(placed), index
+
+            columnNodes = sorted(nodesByColumn[column], key=SortKey)
+            top = y - (len(columnNodes) - 1) * spacingY // 2
+            for row, index in enumerate(columnNodes):
+                rows[index] = row
+                positions[nodes[index]] = (x - column * spacingX, top + row * spacingY)
+
+        # Set all positions at once
+        with Transaction(self.doUndo):
+            for node, position in positions.items():
+                if node.GetPosition() != (float(position[0]), float(position[1])):
+                    node.SetPosition(*position)
+
+        return positions
+
+    def _GetAdjacency(self):
+        """Get nodes directly inside the Shader Group and how they are connected.
+
+        :return: (Nodes, Node => Nodes connected to its inputs, Node => Nodes connected to its outputs). Each Node is listed once per connection.
+        :rtype: tuple
+        """
+        nodes = list(self.IterNodes(depth=0))
+        producers = dict((node, list()) for node in nodes)
+        consumers = dict((node, list()) for node in nodes)
+        for srcNode, gvPortSrc, destNode, gvPortDest in self._GetConnections(nodes):
+            producers[destNode].append(srcNode)
+            consumers[srcNode].append(destNode)
+        return nodes, producers, consumers
+
+    @staticmethod
+    def _Walk(node, neighbours, recursive):
+        """Get nodes that can be reached from node, in breadth first order.
+
+        :param node: The node to start from, not returned.
+        :type node: :class:`.Node`
+        :param neighbours: Node => Nodes directly reachable from it.
+        :type neighbours: dict
+        :param recursive: False to only get nodes directly reachable from node.
+        :type recursive: Bool
+        :return: Reachable Nodes, each one once.
+        :rtype: List of :class:`.Node`
+        """
+        if node not in neighbours:
+            raise ValueError('node is not directly inside the Shader Group of the material')
+
+        seen = set([node])
+        found = list()
+        current = node
+        done = 0
+        while current is not None:
+            for neighbour in neighbours[current]:
+                if neighbour not in seen:
+                    seen.add(neighbour)
+                    found.append(neighbour)
+
+            # Found nodes are also the queue of nodes to walk from
+            current = None
+            if recursive and done < len(found):
+                current = found[done]
+                done += 1
+        return found
+
+    def Upstream(self, node, recursive=True):
+        """Get nodes that feed a node, through its input ports.
+
+        :param node: The node to start from.
+        :type node: :class:`.Node`
+        :param recursive: False to only get nodes directly connected to the inputs of node.
+        :type recursive: Bool
+        :return: Nodes that feed node, each one once.
+        :rtype: List of :class:`.Node`
+        """
+        self._CheckMatIsValid()
+        if not isinstance(node, Node):
+            raise TypeError('node is not valid Node Object')
+
+        nodes, producers, consumers = self._GetAdjacency()
+        return self._Walk(node, producers, recursive)
+
+    def Downstream(self, node, recursive=True):
+        """Get nodes fed by a node, through its output ports.
+
+        :param node: The node to start from.
+        :type node: :class:`.Node`
+        :param recursive: False to only get nodes directly connected to the outputs of node.
+        :type recursive: Bool
+        :return: Nodes fed by node, each one once.
+        :rtype: List of :class:`.Node`
+        """
+        self._CheckMatIsValid()
+        if not isinstance(node, Node):
+            raise TypeError('node is not valid Node Object')
+
+        nodes, producers, consumers = self._GetAdjacency()
+        return self._Walk(node, consumers, recursive)
+
+    def TopologicalOrder(self):
+        """Get nodes directly inside the Shader Group ordered so a node always come after the nodes that feed it.
+
+        :return: Nodes in topological order, for nodes without dependency between them GetAllNodes order is kept.
+        :rtype: List of :class:`.Node`
+        :raises: ValueError if nodes are connected in a cycle.
+        """
+        self._CheckMatIsValid()
+
+        nodes, producers, consumers = self._GetAdjacency()
+        inCount = dict((node, len(producers[node])) for node in nodes)
+
+        order = [node for node in nodes if not inCount[node]]
+        done = 0
+        while done < len(order):
+            node = order[done]
+            done += 1
+            for consumer in consumers[node]:
+                inCount[consumer] -= 1
+                if not inCount[consumer]:
+                    order.append(consumer)
+
+        if len(order) != len(nodes):
+            raise ValueError('nodes are connected in a cycle')
+        return order
+
+    def FindUnreachable(self):
+        """Get nodes that don't feed the Output node, directly or not. Nodes that hold other nodes (groups) are never returned.
+
+        :return: Nodes that don't feed the Output node, empty if there is no Output node.
+        :rtype: List of :class:`.Node`
+        """
+        self._CheckMatIsValid()
+
+        nodes, producers, consumers = self._GetAdjacency()
+        output = None
+        for node in nodes:
+            if node.GetType() == self.Output:
+                output = node
+                break
+        if output is None:
+            return list()
+
+        reachable = set(self._Walk(output, producers, True))
+        reachable.add(output)
+        return [node for node in nodes if node not in reachable and not node.GetNode().GetDown()]
+
+    def PruneUnreachable(self, docOrMat=None):
+        """Remove nodes that don't feed the Output node of a material or of all Redshift materials of a document, with one undo.
+        See :meth:`.FindUnreachable`.
+
+        :param docOrMat: A Redshift material, a document for all its Redshift materials, None for the active document.
+        :type docOrMat: c4d.BaseMaterial or c4d.BaseDocument
+        :return: Number of removed nodes.
+        :rtype: int
+        """
+        def Prune(rs, mat):
+            nodes = rs.FindUnreachable()
+            for node in nodes:
+                rs.RemoveShader(node)
+            return len(nodes)
+
+        return self._SumOverMaterials(docOrMat, Prune)
+
+    def Optimize(self, dryRun=False, fold=True, merge=True):
+        """Optimize the graph of the material with one undo: fold math and color nodes fed only by constants,
+        and merge identical nodes. See :class:`.GraphOptimizer`.
+
+        :param dryRun: True to only report what would change.
+        :type dryRun: Bool
+        :param fold: True to fold constant nodes.
+        :type fold: Bool
+        :param merge: True to merge duplicate nodes.
+        :type merge: Bool
+        :return: One dict per change with the key action ("fold", "remove" or "merge") and details.
+        :rtype: List of dict
+        """
+        self._CheckMatIsValid()
+        return GraphOptimizer(self).Optimize(dryRun, fold, merge)
+
+    def IterTextures(self, doc=None, filter=None):
+        """Lazily iterate over the file paths used by TextureSampler nodes of all Redshift materials of a document.
+        This wrapper is not changed, each material is read with its own wrapper.
+
+        :param doc: The document to get materials from, None for the active document.
+        :type doc: c4d.BaseDocument
+        :param filter: Function called with each Redshift material, only materials where it returns True are read. None to read all.
+        :type filter: function or None
+        :return: Generator of (material, TextureSampler :class:`.Node`, path), empty paths are skipped.
+        :rtype: Generator of tuple
+        """
+        pathID = GetTexturePathID()
+        if pathID is None:
+            return
+
+        for mat in self.IterMaterials(doc, filter):
+            rs = Redshift()
+            rs.doUndo = self.doUndo
+            rs._BindMat(mat)
+            for node in rs.FindNodes(MetaName.TexSampler):
+                path = node[pathID]
+                if path:
+                    yield mat, node, path
+
+    def GetTextureInventory(self, doc=None, filter=None, check=True, maxWorkers=8):
+        """Get the file paths used by TextureSampler nodes of all Redshift materials of a document, see :class:`.TextureInventory`.
+
+        :param doc: The document to get materials from, None for the active document.
+        :type doc: c4d.BaseDocument
+        :param filter: Function called with each Redshift material, only materials where it returns True are read. None to read all.
+        :type filter: function or None
+        :param check: True to check existence, size and modification time of each file.
+        :type check: Bool
+        :param maxWorkers: Maximum number of threads used to check files.
+        :type maxWorkers: int
+        :return: The inventory, relative paths are resolved from the document path and its tex folder.
+        :rtype: :class:`.TextureInventory`
+        """
+        if doc is None:
+            doc = c4d.documents.GetActiveDocument()
+
+        docPath = doc.GetDocumentPath() if isinstance(doc, c4d.BaseDocument) else None
+        searchPaths = [docPath, os.path.join(docPath, 'tex')] if docPath else list()
+
+        inventory = TextureInventory(self.IterTextures(doc, filter), searchPaths)
+        if check:
+            inventory.Check(maxWorkers)
+        return inventory
+
+    def Diff(self, target):
+        """Compute the edits that turn the graph of the material into a target, see :class:`.GraphDiff`.
+
+        :param target: A Redshift material, or a description returned by :meth:`.ExportGraph` or its JSON string.
+        :type target: c4d.BaseMaterial, dict or str
+        :return: The patch to give to :meth:`.ApplyPatch`, JSON compatible.
+        :rtype: dict
+        :raises: TypeError, ValueError
+        """
+        self._CheckMatIsValid()
+        return GraphDiff(self).Diff(target)
+
+    def ApplyPatch(self, patch, force=False):
+        """Apply a patch returned by :meth:`.Diff` to the material, with only one undo.
+        Only nodes, parameters, ports and connections in the patch are changed.
+
+        :param patch: The patch or its JSON string.
+        :type patch: dict or str
+        :param force: True to apply the patch even if the material changed since the patch was computed.
+        :type force: Bool
+        :return: Patch key => Node, for all nodes of the material after the patch.
+        :rtype: dict of :class:`.Node`
+        :raises: TypeError, ValueError
+        """
+        self._CheckMatIsValid()
+        return GraphDiff(self).Apply(patch, force)
+
+    def WatchLibrary(self, directory, doc=None, extension='.json', maxQueue=64):
+        """Get a :class:`.LibrarySync` keeping Redshift materials of a document in sync with a directory of files written by :meth:`.ExportGraph`.
+
+        :param directory: The directory of the definition files.
+        :type directory: str
+        :param doc: The document of the materials, None for the active document.
+        :type doc: c4d.BaseDocument
+        :param extension: Extension of the definition files.
+        :type extension: str
+        :param maxQueue: Maximum number of files waiting to be processed.
+        :type maxQueue: int
+        :return: The sync, call its Poll and Tick methods (e.g from a timer).
+        :rtype: :class:`.LibrarySync`
+        """
+        return LibrarySync(self, directory, doc, extension, maxQueue)
+
+    def _GetParamNodes(self, nodes, docOrMat=None):
+        """Get the nodes given to :meth:`.GetParams` / :meth:`.SetParams` as a list.
+
+        :param nodes: Nodes, or a node type for all nodes of this type in docOrMat.
+        :type nodes: iterable of :class:`.Node`, str or int
+        :param docOrMat: Where to find nodes of a type: a Redshift material, a document for all its Redshift materials, None for the material of this wrapper.
+        :type docOrMat: c4d.BaseMaterial, c4d.BaseDocument or None
+        :return: The nodes, in document order for a document.
+        :rtype: List of :class:`.Node`
+        :raises: TypeError
+        """
+        if isinstance(nodes, (str, int)):
+            if docOrMat is None:
+                return self.FindNodes(nodes)
+            if isinstance(docOrMat, c4d.BaseMaterial):
+                materials = [docOrMat]
+            elif isinstance(docOrMat, c4d.BaseDocument):
+                materials = self.IterMaterials(docOrMat)
+            else:
+                raise TypeError('docOrMat is not a c4d.BaseMaterial or a c4d.BaseDocument')
+
+            # Each material is read with its own wrapper, this one is not changed
+            found = list()
+            for mat in materials:
+                rs = Redshift()
+                rs.doUndo = self.doUndo
+                rs.SetMat(mat)
+                found.extend(rs.FindNodes(nodes))
+            return found
+
+        nodes = list(nodes)
+        for node in nodes:
+            if not isinstance(node, Node):
+                raise TypeError('nodes is not a list of Node')
+        return nodes
+
+    def _GetParamIDs(self, nodes, paramId):
+        """Resolve a parameter for each node, once per node type.
+
+        :return: The DescID for each node.
+        :rtype: List of c4d.DescID
+        """
+        descIDs = dict()
+        result = list()
+        for node in nodes:
+            nodeType = node.GetType()
+            descID = descIDs.get(nodeType)
+            if descID is None:
+                descID = descIDs[nodeType] = self._ResolveParameter(node, paramId)
+            result.append(descID)
+        return result
+
+    def GetParams(self, nodes, paramId, asArray=None, docOrMat=None):
+        """Read a parameter of many nodes at once, nodes can be in different materials.
+        With NumPy, numbers are returned as an array of shape (N,) and c4d.Vector (e.g colors) as an array of shape (N, 3).
+
+        :param nodes: Nodes, or a node type for all nodes of this type in docOrMat.
+        :type nodes: iterable of :class:`.Node`, str or int
+        :param paramId: ID, DescID, identifier / name of the parameter.
+        :type paramId: int, c4d.DescID or str
+        :param asArray: True to get a NumPy array, False to get a list, None to get an array if NumPy is installed and values are numbers or vectors.
+        :type asArray: Bool or None
+        :param docOrMat: Where to find nodes of a type: a Redshift material, a document for all its Redshift materials, None for the material of this wrapper.
+        :type docOrMat: c4d.BaseMaterial, c4d.BaseDocument or None
+        :return: The value of each node.
+        :rtype: numpy.ndarray or list
+        :raises: TypeError, ValueError
+        """
+        nodes = self._GetParamNodes(nodes, docOrMat)
+        values = [node[descID] for node, descID in zip(nodes, self._GetParamIDs(nodes, paramId))]
+
+        numpy = ImportTester.GetModule('numpy') if asArray is not False else None
+        if numpy is None:
+            if asArray:
+                raise ValueError('NumPy is not installed')
+            return values
+
+        if values and all(isinstance(value, c4d.Vector) for value in values):
+            return numpy.array([(value.x, value.y, value.z) for value in values], dtype=float).reshape(len(values), 3)
+        if all(isinstance(value, (bool, int, float)) for value in values):
+            return numpy.array(values)
+        if asArray:
+            raise ValueError('values of {0} are not numbers or vectors'.format(paramId))
+        return values
+
+    def SetParams(self, nodes, paramId, values, docOrMat=None):
+        """Write a parameter of many nodes at once, with only one undo. Nodes can be in different materials.
+
+        Example, scale the diffuse weight of all Redshift materials of a document by 0.8 (with NumPy, weights * 0.8 also works)::
+
+            weights = rs.GetParams("Material", "REDSHIFT_SHADER_MATERIAL_DIFFUSE_WEIGHT", docOrMat=doc)
+            rs.SetParams("Material", "REDSHIFT_SHADER_MATERIAL_DIFFUSE_WEIGHT", [weight * 0.8 for weight in weights], doc)
+
+        :param nodes: Nodes, or a node type for all nodes of this type in docOrMat.
+        :type nodes: iterable of :class:`.Node`, str or int
+        :param paramId: ID, DescID, identifier / name of the parameter.
+        :type paramId: int, c4d.DescID or str
+        :param values: One value for all nodes (a NumPy scalar or 0-d array too), or one value per node: a sequence or a NumPy array,
+            rows of 3 numbers are set as c4d.Vector.
+        :type values: any, sequence or numpy.ndarray
+        :param docOrMat: Where to find nodes of a type: a Redshift material, a document for all its Redshift materials, None for the material of this wrapper.
+        :type docOrMat: c4d.BaseMaterial, c4d.BaseDocument or None
+        :return: Number of nodes written.
+        :rtype: int
+        :raises: TypeError, ValueError
+        """
+        nodes = self._GetParamNodes(nodes, docOrMat)
+        descIDs = self._GetParamIDs(nodes, paramId)
+
+        if hasattr(values, 'tolist'):
+            # NumPy array or scalar, to Python numbers. A 0-d array gives a single number
+            values = values.tolist()
+
+        if isinstance(values, (str, bytes, c4d.Vector)) or not hasattr(values, '__len__'):
+            values = [values] * len(nodes)
+        else:
+            if len(values) != len(nodes):
+                raise ValueError('{0} values for {1} nodes'.format(len(values), len(nodes)))
+
+        with Transaction(self.doUndo):
+            for node, descID, value in zip(nodes, descIDs, values):
+                Transaction.AddUndo(node.GetNode().GetNodeMaster(), self.doUndo)
+                node[descID] = self._ConvertValue(value)
+        return len(nodes)
+
+    def CreateCommandQueue(self, maxSize=0):
+        """Get a :class:`.CommandQueue` applying with this wrapper, on the main thread, :class:`.CommandBatch` recorded in other threads.
+
+        :param maxSize: Maximum number of batches waiting, 0 for no limit.
+        :type maxSize: int
+        :return: The queue, call its Drain method from the main thread (e.g in a timer).
+        :rtype: :class:`.CommandQueue`
+        """
+        # Imported here, so threading and concurrent.futures are only loaded when used
+        from .CommandQueue import CommandQueue
+        return CommandQueue(self, maxSize)
+
+
+Profiler.Register(Redshift, api={'_CreateGvNode': 'GvNodeMaster.CreateNode'},
+                  exclude=('EnableProfiling', 'GetProfilingStats'))
@@ -0,0 +1,118 @@
+import json
+
+
+class GraphWriter(object):
+    """Write material graphs returned by :meth:`.Redshift.ExportGraph` as JSON lines, one graph per line.
+    Each graph is written as soon as it's given, so a whole scene is never hold in memory.
+
+    Example::
+
+        with GraphWriter("scene.jsonl") as writer:
+            rs.ForEachMaterial(doc, lambda rs, mat: writer.Write(rs.ExportGraph()))
+
+    :member _file: (file) The file graphs are written to.
+    :member _ownFile: (Bool) True if the file was opened by the writer and have to be closed by it.
+    :member _count: (int) Number of graphs written.
+    """
+
+    def __init__(self, fileOrPath):
+        """Initialization of the writer
+
+        :param fileOrPath: Path of the file to write, or a file object opened in text mode.
+        :type fileOrPath: str or file
+        """
+        if isinstance(fileOrPath, str):
+            self._file = open(fileOrPath, 'w', encoding='utf-8')
+            self._ownFile = True
+        elif hasattr(fileOrPath, 'write'):
+            self._file = fileOrPath
+            self._ownFile = False
+        else:
+            raise TypeError('fileOrPath is not a path or a file')
+
+        self._count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self.Close()
+        return False
+
+    def Write(self, graph):
+        """Write a graph.
+
+        :param graph: The graph returned by :meth:`.Redshift.ExportGraph`.
+        :type graph: dict
+        """
+        if not isinstance(graph, dict):
+            raise TypeError('graph is not a dict')
+
+        self._file.write(json.dumps(graph, sort_keys=True, separators=(',', ':')))
+        self._file.write('\n')
+        self._count += 1
+
+    def GetCount(self):
+        """Get the number of graphs written.
+
+        :return: Number of graphs written.
+        :rtype: int
+        """
+        return self._count
+
+    def Close(self):
+        """Close the file if it was opened by the writer, otherwise only flush it."""
+        if self._file is None:
+            return
+
+        if self._ownFile:
+            self._file.close()
+        else:
+            self._file.flush()
+        self._file = None
+
+
+class GraphReader(object):
+    """Lazily read graphs written by :class:`.GraphWriter`, one graph at a time.
+
+    Example::
+
+        for graph in GraphReader("scene.jsonl"):
+            rs.ImportGraph(graph)
+
+    :member _fileOrPath: (str or file) Path of the file to read, or a file object opened in text mode.
+    """
+
+    def __init__(self, fileOrPath):
+        """Initialization of the reader
+
+        :param fileOrPath: Path of the file to read, or a file object opened in text mode.
+        :type fileOrPath: str or file
+        """
+        if not isinstance(fileOrPath, str) and not hasattr(fileOrPath, 'readline'):
+            raise TypeError('fileOrPath is not a path or a file')
+
+        self._fileOrPath = fileOrPath
+
+    def __iter__(self):
+        if isinstance(self._fileOrPath, str):
+            with open(self._fileOrPath, 'r', encoding='utf-8') as f:
+                for graph in self._ReadLines(f):
+                    yield graph
+        else:
+            for graph in self._ReadLines(self._fileOrPath):
+                yield graph
+
+    @staticmethod
+    def _ReadLines(f):
+        """Parse each non empty line of f.
+
+        :param f: File object opened in text mode.
+        :type f: file
+        :return: Generator of graphs.
+        :rtype: Generator of dict
+        """
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
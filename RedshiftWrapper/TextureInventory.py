@@ -0,0 +1,213 @@
+import os
+import c4d
+
+from .Transaction import Transaction
+
+
+def GetTexturePathID(index=0):
+    """Get the DescID of the file path of a TextureSampler node.
+
+    :param index: The texture of the sampler, 0 for the main one (Tex0).
+    :type index: int
+    :return: The DescID of the path, or None if the Redshift symbols are not available.
+    :rtype: c4d.DescID or None
+    """
+    texID = getattr(c4d, 'REDSHIFT_SHADER_TEXTURESAMPLER_TEX{0}'.format(index), None)
+    pathID = getattr(c4d, 'REDSHIFT_FILE_PATH', None)
+    if texID is None or pathID is None:
+        return None
+    return c4d.DescID(c4d.DescLevel(texID), c4d.DescLevel(pathID))
+
+
+class TextureInventory(object):
+    """Inventory of the file paths used by TextureSampler nodes, made by :meth:`.Redshift.GetTextureInventory`.
+
+    Paths are deduplicated, so each file is checked once however many nodes use it, and
+    each path keep the nodes using it, so a remap is done in one pass without walking the materials again.
+
+    :member _entries: (list) (material, :class:`.Node`, path) in the order they were found.
+    :member _nodesByPath: (dict) path => list of (material, :class:`.Node`) using it.
+    :member _files: (dict) path => dict with the keys path (resolved), exists, size and mtime, filled by :meth:`.Check`.
+    :member _searchPaths: (list) Directories used to resolve relative paths.
+    """
+
+    def __init__(self, entries=(), searchPaths=()):
+        """Initialization of the inventory
+
+        :param entries: (material, :class:`.Node`, path) to add.
+        :type entries: iterable of tuple
+        :param searchPaths: Directories used to resolve relative paths (e.g the document path), first match wins.
+        :type searchPaths: list of str
+        """
+        self._entries = list()
+        self._nodesByPath = dict()
+        self._files = dict()
+        self._searchPaths = [searchPath for searchPath in searchPaths if searchPath]
+
+        for mat, node, path in entries:
+            self.Add(mat, node, path)
+
+    def __len__(self):
+        return len(self._nodesByPath)
+
+    def __iter__(self):
+        return iter(self._entries)
+
+    def Add(self, mat, node, path):
+        """Add a path used by a node.
+
+        :param mat: The material of the node.
+        :type mat: c4d.BaseMaterial
+        :param node: The TextureSampler node.
+        :type node: :class:`.Node`
+        :param path: The path used by the node.
+        :type path: str
+        """
+        if not isinstance(path, str):
+            raise TypeError('path is not a str')
+
+        self._entries.append((mat, node, path))
+        self._nodesByPath.setdefault(path, list()).append((mat, node))
+
+    def GetPaths(self):
+        """Get the unique paths, in the order they were found.
+
+        :return: The paths.
+        :rtype: list of str
+        """
+        return list(self._nodesByPath)
+
+    def GetUsers(self, path):
+        """Get the nodes using a path.
+
+        :param path: The path.
+        :type path: str
+        :return: (material, :class:`.Node`) using the path.
+        :rtype: list of tuple
+        """
+        return list(self._nodesByPath.get(path, ()))
+
+    def GetDuplicates(self):
+        """Get paths that are not equal but point to the same file (e.g relative and absolute, different case on Windows).
+
+        :return: Normalized path => list of paths pointing to it, only for files with more than one path.
+        :rtype: dict
+        """
+        paths = dict()
+        for path in self._nodesByPath:
+            normalized = os.path.normcase(os.path.normpath(self._Resolve(path)))
+            paths.setdefault(normalized, list()).append(path)
+
+        return dict((normalized, found) for normalized, found in paths.items() if len(found) > 1)
+
+    def _Resolve(self, path):
+        """Get the path of the file to check for a path, relative paths are searched in :member:`._searchPaths`.
+
+        :param path: The path used by a node.
+        :type path: str
+        :return: The path to check.
+        :rtype: str
+        """
+        if not path or os.path.isabs(path):
+            return path
+
+        for searchPath in self._searchPaths:
+            fullPath = os.path.join(searchPath, path)
+            if os.path.exists(fullPath):
+                return fullPath
+        return path
+
+    def _CheckFile(self, path):
+        """Get the state of a file, called in a worker thread.
+
+        :param path: The path used by a node.
+        :type path: str
+        :return: dict with the keys path (resolved), exists, size (bytes, or None) and mtime (timestamp, or None).
+        :rtype: dict
+        """
+        resolved = self._Resolve(path)
+        try:
+            stat = os.stat(resolved) if resolved else None
+        except OSError:
+            stat = None
+
+        if stat is None:
+            return {'path': resolved, 'exists': False, 'size': None, 'mtime': None}
+        return {'path': resolved, 'exists': True, 'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    def Check(self, maxWorkers=8, force=False):
+        """Check if the files exist and get their size and modification time.
+        Each unique path is checked once, by a pool of threads so slow network drives are checked in parallel.
+
+        :param maxWorkers: Maximum number of threads, 1 to check in the calling thread.
+        :type maxWorkers: int
+        :param force: True to check again paths already checked.
+        :type force: Bool
+        :return: path => dict with the keys path (resolved), exists, size and mtime.
+        :rtype: dict
+        """
+        if not isinstance(maxWorkers, int) or maxWorkers < 1:
+            raise TypeError('maxWorkers is not a positive int')
+
+        # Imported here, only inventories checked with threads pay for it
+        from concurrent.futures import ThreadPoolExecutor
+
+        paths = [path for path in self._nodesByPath if force or path not in self._files]
+        if maxWorkers == 1 or len(paths) < 2:
+            results = map(self._CheckFile, paths)
+            self._files.update(zip(paths, results))
+        else:
+            with ThreadPoolExecutor(max_workers=min(maxWorkers, len(paths))) as executor:
+                self._files.update(zip(paths, executor.map(self._CheckFile, paths)))
+
+        return dict(self._files)
+
+    def GetMissing(self):
+        """Get paths of files that don't exist, :meth:`.Check` have to be called before.
+
+        :return: The missing paths.
+        :rtype: list of str
+        """
+        return [path for path in self._nodesByPath if path in self._files and not self._files[path]['exists']]
+
+    def Remap(self, mapping, doUndo=True):
+        """Change paths used by nodes, in one :class:`.Transaction`.
+
+        :param mapping: Old path => new path, or a function called with each path and returning the new path (or None to keep it).
+        :type mapping: dict or function
+        :param doUndo: True to add undos.
+        :type doUndo: Bool
+        :return: Number of changed nodes.
+        :rtype: int
+        """
+        if isinstance(mapping, dict):
+            getNewPath = mapping.get
+        elif callable(mapping):
+            getNewPath = mapping
+        else:
+            raise TypeError('mapping is not a dict or a function')
+
+        pathID = GetTexturePathID()
+        remapped = dict()
+        count = 0
+        with Transaction(doUndo):
+            for path in list(self._nodesByPath):
+                newPath = getNewPath(path)
+                if newPath is None or newPath == path:
+                    continue
+                if not isinstance(newPath, str):
+                    raise TypeError('new path of {0} is not a str'.format(path))
+
+                remapped[path] = newPath
+                users = self._nodesByPath.pop(path)
+                for mat, node in users:
+                    Transaction.AddUndo(node.GetNode().GetNodeMaster(), doUndo)
+                    node[pathID] = newPath
+                    count += 1
+
+                self._nodesByPath.setdefault(newPath, list()).extend(users)
+                self._files.pop(path, None)
+                self._files.pop(newPath, None)
+
+        self._entries = [(mat, node, remapped.get(path, path)) for mat, node, path in self._entries]
+        return count
@@ -0,0 +1,124 @@
+import c4d
+
+from .Profiler import Profiler
+
+
+class Transaction(object):
+    """Group many edits under one undo per GvNodeMaster and one c4d.EventAdd().
+    While a transaction is running, :class:`.Redshift` and :class:`.Node` don't call GvNodeMaster.AddUndo() on each change,
+    the transaction call it only the first time a GvNodeMaster is changed.
+
+    Transactions can be nested, only the outermost one is used.
+
+    Example::
+
+        with rs.Transaction():
+            for node in rs.GetAllNodes():
+                node.SetColor()
+
+    :member _current: (:class:`.Transaction`) The outermost running transaction, shared by all wrappers.
+    :member _doUndo: (Bool) True to call GvNodeMaster.AddUndo() the first time a GvNodeMaster is changed.
+    :member _eventAdd: (Bool) True to call c4d.EventAdd() on exit if something was changed.
+    :member _outermost: (Bool) True if this transaction is the outermost one.
+    :member _gvMasters: (set) GvNodeMaster already changed during the transaction.
+    """
+    _current = None
+
+    def __init__(self, doUndo=True, eventAdd=True):
+        """Initialization of the transaction
+
+        :param doUndo: True to record one undo per changed GvNodeMaster.
+        :type doUndo: Bool
+        :param eventAdd: True to call c4d.EventAdd() on exit if something was changed.
+        :type eventAdd: Bool
+        """
+        self._doUndo = doUndo
+        self._eventAdd = eventAdd
+        self._outermost = False
+        self._gvMasters = set()
+
+    def __enter__(self):
+        if Transaction._current is None:
+            Transaction._current = self
+            self._outermost = True
+            self._gvMasters = set()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        if not self._outermost:
+            return False
+
+        Transaction._current = None
+        self._outermost = False
+        if self._gvMasters and self._eventAdd:
+            c4d.EventAdd()
+        return False
+
+    @classmethod
+    def IsRunning(cls):
+        """Check if a transaction is currently running.
+
+        :return: True if a transaction is running otherwise False.
+        :rtype: Bool
+        """
+        return cls._current is not None
+
+    @classmethod
+    def GetChanged(cls):
+        """Get the GvNodeMaster already changed during the running transaction.
+
+        :return: The GvNodeMaster, empty if no transaction is running.
+        :rtype: set of c4d.modules.graphview.GvNodeMaster
+        """
+        current = cls._current
+        if current is None:
+            return set()
+        return set(current._gvMasters)
+
+    @classmethod
+    def MarkChanged(cls, gvMasters):
+        """Mark GvNodeMaster as already changed in the running transaction, so no undo is recorded for them.
+        Used to continue the undo recorded by a previous transaction (e.g a :class:`.CommandBatch` applied over many drains).
+
+        :param gvMasters: The GvNodeMaster.
+        :type gvMasters: iterable of c4d.modules.graphview.GvNodeMaster
+        """
+        current = cls._current
+        if current is not None:
+            current._gvMasters.update(gvMasters)
+
+    @classmethod
+    def AddUndo(cls, gvMaster, doUndo=True):
+        """Called before any change on a GvNodeMaster.
+        Outside of a transaction call gvMaster.AddUndo() if doUndo is True.
+        Inside a transaction doUndo is ignored, gvMaster.AddUndo() is called only for the first change of gvMaster.
+
+        :param gvMaster: The GvNodeMaster that is going to be changed.
+        :type gvMaster: c4d.modules.graphview.GvNodeMaster
+        :param doUndo: True if the caller want an undo.
+        :type doUndo: Bool
+        """
+        current = cls._current
+        if current is None:
+            if doUndo:
+                cls._AddMasterUndo(gvMaster)
+            return
+
+        if gvMaster in current._gvMasters:
+            return
+
+        current._gvMasters.add(gvMaster)
+        if current._doUndo:
+            cls._AddMasterUndo(gvMaster)
+
+    @staticmethod
+    def _AddMasterUndo(gvMaster):
+        """Call gvMaster.AddUndo(), only place where it's called so it can be counted by :class:`.Profiler`.
+
+        :param gvMaster: The GvNodeMaster that is going to be changed.
+        :type gvMaster: c4d.modules.graphview.GvNodeMaster
+        """
+        gvMaster.AddUndo()
+
+
+Profiler.Register(Transaction, api={'_AddMasterUndo': 'GvNodeMaster.AddUndo'})
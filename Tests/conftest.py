@@ -0,0 +1,23 @@
+"""Tests run against the in-memory c4d / redshift stand-in of Benchmark/StandIn, so they run without Cinema 4D."""
+import os
+import sys
+
+import pytest
+
+TESTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# The stand-in have to be found before a real c4d module, and the wrapper is imported from the repository
+sys.path.insert(0, os.path.join(os.path.dirname(TESTS_DIR), 'Benchmark', 'StandIn'))
+sys.path.insert(1, os.path.dirname(TESTS_DIR))
+
+import c4d  # noqa: E402
+import redshift  # noqa: E402
+from RedshiftWrapper.Redshift import Redshift  # noqa: E402
+
+
+@pytest.fixture
+def rs():
+    """A wrapper set on a new Redshift material, with its default Output and Material nodes."""
+    wrapper = Redshift()
+    wrapper.SetMat(c4d.BaseMaterial(redshift.Mrsmaterial))
+    return wrapper
@@ -0,0 +1,30 @@
+import c4d
+
+
+def test_EachConnectionGoesRight(rs):
+    material = rs.FindFirst('Material')
+    material.ExposeParameter('Input 1', c4d.GV_PORT_INPUT)
+    material.ExposeParameter('Input 2', c4d.GV_PORT_INPUT)
+    top = rs.CreateShader(rs.MathAdd)
+    bottom = rs.CreateShader(rs.MathAdd)
+    for node in (top, bottom):
+        node.ExposeParameter('Out Color', c4d.GV_PORT_OUTPUT)
+    bottom.ExposeParameter('Input 1', c4d.GV_PORT_INPUT)
+    rs.CreateConnections([(top, 'Out Color', material, 'Input 1'), (bottom, 'Out Color', material, 'Input 2'),
+                          (top, 'Out Color', bottom, 'Input 1')])
+
+    positions = rs.AutoLayout()
+
+    nodes = rs.GetAllNodes()
+    for srcNode, gvPortSrc, destNode, gvPortDest in rs._GetConnections(nodes):
+        assert positions[srcNode][0] < positions[destNode][0]
+    assert positions[top][0] == -600
+    assert positions[bottom][0] == -400
+
+
+def test_NodesNotLeadingToTheOutputAreOnTheLeft(rs):
+    lonely = rs.CreateShader(rs.MathAdd)
+
+    positions = rs.AutoLayout()
+
+    assert positions[lonely][0] < min(position[0] for node, position in positions.items() if node != lonely)
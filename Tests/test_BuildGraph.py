@@ -0,0 +1,58 @@
+import pytest
+
+
+def test_OutputIsFoundByTypeOnly(rs):
+    output = rs.FindFirst(rs.Output)
+    output.SetName('Renamed Output')
+
+    nodes = rs.BuildGraph({'nodes': {'out': {'type': rs.Output, 'name': 'Output'}}, 'connections': []})
+
+    assert nodes['out'] == output
+    assert len(rs.FindNodes(rs.Output)) == 1
+    assert output.GetName() == 'Output'
+
+
+def test_ImportGraphWithoutClearOfItsOwnExport(rs):
+    graph = rs.ExportGraph()
+    output = rs.FindFirst(rs.Output)
+
+    nodes = rs.ImportGraph(graph, clear=False)
+
+    # The new Material node replaces the old one on the Surface of the Output
+    assert nodes['n1'] == output
+    assert len(rs.FindNodes(rs.Output)) == 1
+    assert len(rs.FindNodes('Material')) == 2
+    gvPortDest = output.GetNode().GetInPorts()[0]
+    assert gvPortDest.IsIncomingConnected()
+    assert [nodes['n0']] == [node for node in rs.FindNodes('Material') if node.GetNode().GetOutPorts()[0].GetDestination()]
+
+
+def test_ImportGraphWithoutClearWithRenamedOutput(rs):
+    graph = rs.ExportGraph()
+    output = rs.FindFirst(rs.Output)
+    output.SetName('Renamed Output')
+
+    nodes = rs.ImportGraph(graph, clear=False)
+
+    assert nodes['n1'] == output
+    assert output.GetName() == 'Output'
+    assert len(rs.FindNodes(rs.Output)) == 1
+
+
+def test_ImportGraphWithoutClearKeepsConnectionsOnError(rs):
+    graph = rs.ExportGraph()
+    graph['connections'].append(['n0', 'Missing Port', 'n1', 'Surface'])
+    before = rs.ExportGraph()
+
+    with pytest.raises(ValueError):
+        rs.ImportGraph(graph, clear=False)
+
+    assert rs.ExportGraph() == before
+
+
+def test_ExportGraphRaisesOnGroups(rs):
+    group = rs.CreateShader(rs.MathAdd)
+    rs._gvMaster.CreateNode(group.GetNode(), 1036227)
+
+    with pytest.raises(ValueError):
+        rs.ExportGraph()
@@ -0,0 +1,23 @@
+import c4d
+import pytest
+
+from RedshiftWrapper.Redshift import Redshift
+
+
+def test_BoolCountIsRejected():
+    doc = c4d.documents.BaseDocument()
+    with pytest.raises(TypeError):
+        Redshift().CreateMaterials(True, doc=doc)
+    assert doc.GetFirstMaterial() is None
+
+
+def test_ActiveDocumentIsKept():
+    doc = c4d.documents.BaseDocument()
+    c4d.documents.InsertBaseDocument(doc)
+    c4d.documents.SetActiveDocument(doc)
+    try:
+        materials = Redshift().CreateMaterials(2, 1005, doc)
+        assert c4d.documents.GetActiveDocument() is doc
+        assert [mat for mat in Redshift().IterMaterials(doc)] == materials
+    finally:
+        c4d.documents.KillDocument(doc)
@@ -0,0 +1,51 @@
+import pytest
+
+
+def GetState(rs):
+    """Get the nodes of the material and its graph, to check a failed patch left it untouched."""
+    return rs.GetAllNodes(), rs.ExportGraph()
+
+
+def test_PatchIsCheckedBeforeAnyChange(rs):
+    before = GetState(rs)
+    patch = {'ops': [{'op': 'setName', 'node': 'n0', 'name': 'Renamed'},
+                     {'op': 'addNode', 'node': 'new:n2', 'type': rs.MathAdd, 'name': 'F'},
+                     {'op': 'connect', 'src': 'new:n2', 'srcPort': 1, 'dst': 'n1', 'dstPort': 123456}]}
+
+    with pytest.raises(ValueError):
+        rs.ApplyPatch(patch, force=True)
+    assert GetState(rs) == before
+
+
+def test_RemovedNodeIsKeptOnUnknownOperation(rs):
+    before = GetState(rs)
+    patch = {'ops': [{'op': 'removeNode', 'node': 'n0'}, {'op': 'bogus'}]}
+
+    with pytest.raises(ValueError):
+        rs.ApplyPatch(patch, force=True)
+    assert GetState(rs) == before
+
+
+def test_FailedPatchIsRolledBack(rs):
+    before = GetState(rs)
+    # The port of the added node is only known once it's created
+    patch = {'ops': [{'op': 'disconnect', 'src': 'n0', 'srcPort': before[1]['connections'][0][1]['id'],
+                      'dst': 'n1', 'dstPort': before[1]['connections'][0][3]['id']},
+                     {'op': 'removeNode', 'node': 'n0'},
+                     {'op': 'setName', 'node': 'n1', 'name': 'Renamed'},
+                     {'op': 'addNode', 'node': 'new:n2', 'type': rs.MathAdd, 'name': 'F'},
+                     {'op': 'connect', 'src': 'new:n2', 'srcPort': 123456, 'dst': 'n1', 'dstPort': before[1]['connections'][0][3]['id']}]}
+
+    with pytest.raises(ValueError):
+        rs.ApplyPatch(patch, force=True)
+    assert GetState(rs) == before
+
+
+def test_DiffIsApplied(rs):
+    target = rs.ExportGraph()
+    target['nodes']['n0']['name'] = 'Renamed'
+    target['nodes']['n2'] = {'type': rs.MathAdd, 'name': 'F'}
+
+    rs.ApplyPatch(rs.Diff(target))
+    assert rs.FindFirst(name='Renamed') is not None
+    assert rs.FindFirst(rs.MathAdd, 'F') is not None
@@ -0,0 +1,45 @@
+from RedshiftWrapper.Redshift import Redshift
+
+
+def GetChain(size, keys=None, cycle=False):
+    """Get the description of a chain of size identical nodes, keys give the key of each node in chain order."""
+    keys = keys or ['n{0}'.format(index) for index in range(size)]
+    graph = {'nodes': dict((key, {'type': 'MathAdd', 'inputs': [1], 'outputs': [2]}) for key in keys),
+             'connections': [[src, {'id': 2}, dest, {'id': 1}] for src, dest in zip(keys, keys[1:])]}
+    if cycle:
+        graph['connections'].append([keys[-1], {'id': 2}, keys[0], {'id': 1}])
+    return graph
+
+
+def GetReversedChain(size, cycle=False):
+    return GetChain(size, ['n{0}'.format(size - 1 - index) for index in range(size)], cycle)
+
+
+def test_DeepChainIsTheSameWhateverTheKeys():
+    graph = GetChain(2000)
+    other = GetReversedChain(2000)
+
+    assert Redshift._HashGraph(graph) == Redshift._HashGraph(other)
+    assert Redshift._IsSameGraph(graph, other)
+
+
+def test_DeepChainWithADifferentNode():
+    graph = GetChain(2000)
+    other = GetReversedChain(2000)
+    other['nodes']['n1000']['params'] = {'1234': 0.5}
+
+    assert Redshift._HashGraph(graph) != Redshift._HashGraph(other)
+    assert not Redshift._IsSameGraph(graph, other)
+
+
+def test_ChainIsNotTheSameAsCycle():
+    assert Redshift._HashGraph(GetChain(50)) != Redshift._HashGraph(GetChain(50, cycle=True))
+    assert not Redshift._IsSameGraph(GetChain(50), GetChain(50, cycle=True))
+
+
+def test_CycleIsTheSameWhateverTheKeys():
+    graph = GetChain(500, cycle=True)
+    other = GetReversedChain(500, cycle=True)
+
+    assert Redshift._HashGraph(graph) == Redshift._HashGraph(other)
+    assert Redshift._IsSameGraph(graph, other)
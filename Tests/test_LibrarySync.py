@@ -0,0 +1,70 @@
+import json
+
+import c4d
+import redshift
+
+from RedshiftWrapper.LibrarySync import LibrarySync
+from RedshiftWrapper.Redshift import Redshift
+
+
+def CreateDocument(names):
+    """Create a document with a default Redshift material for each name."""
+    doc = c4d.documents.BaseDocument()
+    for name in names:
+        mat = c4d.BaseMaterial(redshift.Mrsmaterial)
+        mat.SetName(name)
+        doc.InsertMaterial(mat)
+    return doc
+
+
+def WriteGraph(directory, name, graph):
+    path = directory / '{0}.json'.format(name)
+    path.write_text(json.dumps(graph), encoding='utf-8')
+    return str(path)
+
+
+def GetBrokenGraph(rs, name):
+    """Get a graph that rename a node and add one, with a connection from a port the added node doesn't have."""
+    graph = rs.ExportGraph()
+    graph['material'] = name
+    graph['nodes']['n0']['name'] = 'RenamedByBroken'
+    graph['nodes']['n2'] = {'type': rs.MathAdd, 'name': 'New'}
+    graph['connections'] = [['n2', {'id': 123456}, 'n1', graph['connections'][0][3]]]
+    return graph
+
+
+def test_BrokenFileIsNotAppliedAndIsRetried(tmp_path):
+    doc = CreateDocument(['Mat'])
+    rs = Redshift()
+    rs.SetMat(doc.GetFirstMaterial())
+    before = rs.ExportGraph()
+    path = WriteGraph(tmp_path, 'Mat', GetBrokenGraph(rs, 'Mat'))
+
+    sync = LibrarySync(Redshift(), str(tmp_path), doc)
+    assert sync.Sync() == {path: None}
+    assert rs.ExportGraph() == before
+
+    # Reported again by the next Sync, until it's fixed
+    assert sync.Sync() == {path: None}
+    assert path in sync.GetErrors()
+
+    graph = rs.ExportGraph()
+    graph['nodes']['n0']['name'] = 'Fixed'
+    WriteGraph(tmp_path, 'Mat', graph)
+    assert sync.Sync() == {path: 1}
+    assert sync.GetErrors() == dict()
+    assert sync.Sync() == dict()
+    assert rs.FindFirst(name='Fixed') is not None
+
+
+def test_BrokenFileDoesNotCreateMaterial(tmp_path):
+    doc = CreateDocument(['Mat'])
+    rs = Redshift()
+    rs.SetMat(doc.GetFirstMaterial())
+    WriteGraph(tmp_path, 'Other', GetBrokenGraph(rs, 'Other'))
+    graph = rs.ExportGraph()
+    graph['material'] = 'Created'
+    WriteGraph(tmp_path, 'Created', graph)
+
+    LibrarySync(Redshift(), str(tmp_path), doc).Sync()
+    assert sorted(mat.GetName() for mat in rs.IterMaterials(doc)) == ['Created', 'Mat']
@@ -0,0 +1,33 @@
+import c4d
+
+from RedshiftWrapper.Redshift import Redshift
+
+
+def CountUndo(rs, function):
+    """Get the number of AddUndo done on the material of rs while function is called."""
+    gvMaster = rs._gvMaster
+    count = gvMaster.undoCount
+    function()
+    return gvMaster.undoCount - count
+
+
+def test_UndoFollowsDoUndoOfTheWrapper(rs):
+    rs.FindFirst()
+    rs.doUndo = False
+
+    def SetColors():
+        for node in rs.GetAllNodes():
+            node.SetColor(c4d.Vector(1, 0, 0))
+    assert CountUndo(rs, SetColors) == 0
+
+
+def test_UndoFollowsTheWrapperThatHandedOutTheNode(rs):
+    noUndo = Redshift()
+    noUndo.doUndo = False
+    noUndo.SetMat(rs._mat)
+    noUndo.CreateShader(rs.MathAdd)
+
+    def SetColors():
+        for node in rs.FindNodes():
+            node.SetColor(c4d.Vector(0, 1, 0))
+    assert CountUndo(rs, SetColors) == len(rs.FindNodes())
@@ -0,0 +1,34 @@
+import pytest
+
+
+def CreateNodes(rs, count):
+    nodes = [rs.CreateShader(rs.MathAdd) for _ in range(count)]
+    rs.SetParams(nodes, 'Input 1', [float(index) for index in range(count)])
+    return nodes
+
+
+def test_ScaleWithoutNumPy(rs):
+    nodes = CreateNodes(rs, 3)
+
+    weights = rs.GetParams(nodes, 'Input 1', asArray=False)
+    rs.SetParams(nodes, 'Input 1', [weight * 0.5 for weight in weights])
+
+    assert rs.GetParams(nodes, 'Input 1', asArray=False) == [0.0, 0.5, 1.0]
+
+
+def test_ZeroDimensionArrayIsOneValue(rs):
+    numpy = pytest.importorskip('numpy')
+    nodes = CreateNodes(rs, 3)
+
+    assert rs.SetParams(nodes, 'Input 1', numpy.array(0.25)) == 3
+    assert rs.SetParams(nodes[:2], 'Input 1', numpy.float64(0.75)) == 2
+    assert rs.GetParams(nodes, 'Input 1', asArray=False) == [0.75, 0.75, 0.25]
+
+
+def test_ScaleWithNumPy(rs):
+    pytest.importorskip('numpy')
+    nodes = CreateNodes(rs, 3)
+
+    rs.SetParams(nodes, 'Input 1', rs.GetParams(nodes, 'Input 1', asArray=True) * 2)
+
+    assert rs.GetParams(nodes, 'Input 1', asArray=False) == [0.0, 2.0, 4.0]
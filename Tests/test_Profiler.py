@@ -0,0 +1,29 @@
+import c4d
+
+from RedshiftWrapper.Profiler import Profiler
+
+
+def test_PortCallsAreCounted(rs):
+    src = rs.CreateShader(rs.MathAdd)
+    dest = rs.CreateShader(rs.MathAdd)
+    src.ExposeParameter('Out Color', c4d.GV_PORT_OUTPUT)
+    dest.ExposeParameter('Input 1', c4d.GV_PORT_INPUT)
+    # Main IDs of the ports are known for the type after a first search
+    src.SearchPort('Out Color', c4d.GV_PORT_OUTPUT)
+
+    Profiler.Reset()
+    Profiler.Enable()
+    try:
+        gvPortSrc = src.SearchPort('Out Color', c4d.GV_PORT_OUTPUT)
+        gvPortDest = dest.SearchPort(0, c4d.GV_PORT_INPUT)
+        rs.CreateConnection(gvPortSrc, gvPortDest)
+        rs.RemoveConnection(gvPortDest)
+        api = Profiler.GetStats()['api']
+    finally:
+        Profiler.Disable()
+        Profiler.Reset()
+
+    assert api['GvNode.GetInPortFirstMainID/GetOutPortFirstMainID']['calls'] == 1
+    assert api['GvNode.GetInPort/GetOutPort']['calls'] == 1
+    assert api['GvPort.Connect']['calls'] == 1
+    assert api['GvPort.Remove']['calls'] == 1